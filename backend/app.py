@@ -4,7 +4,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-app = create_app(os.getenv('FLASK_ENV') or 'development')
+# PDF parser workers re-import the main module as __mp_main__; they must not build the app.
+if __name__ != '__mp_main__':
+    app = create_app(os.getenv('FLASK_ENV') or 'development')
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
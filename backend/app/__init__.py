@@ -1,10 +1,9 @@
 from flask import Flask, g
 from flask_cors import CORS
-from .api import api_bp
-from .api import auth_bp
 from .config.config import Config
 import logging
 from .utils.logging_config import setup_logging
+from .cli import register_commands
 from pymongo import MongoClient
 
 def get_db():
@@ -14,6 +13,10 @@ def get_db():
     return g.db
 
 def create_app(environment):
+    # The route modules build the services when imported, so they are only
+    # loaded here; importing app.services.* or app.utils.* stays side-effect free.
+    from .api import api_bp
+
     app = Flask(__name__)
     app.config.from_object(Config.get_config(environment))
 
@@ -25,6 +28,7 @@ def create_app(environment):
     app.before_request(connect_db)
     app.teardown_request(close_db)
     app.register_blueprint(api_bp, url_prefix='/api')
+    register_commands(app)
     
     return app
 
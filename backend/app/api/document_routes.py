@@ -1,6 +1,8 @@
 from flask import request, jsonify, send_from_directory
 from ..services.document_service import DocumentService
 from ..services.vector_store_service import VectorStoreService
+from ..services.ingestion_service import IngestionService
+from ..services.upload_session_service import UploadSessionService
 from ..config.config import Config
 import logging
 
@@ -13,6 +15,8 @@ document_service = DocumentService(
     }
 )
 vector_store_service = VectorStoreService(Config.DB_FOLDER, Config.CHUNK_SIZE, Config.CHUNK_OVERLAP)
+ingestion_service = IngestionService(document_service, vector_store_service)
+upload_session_service = UploadSessionService()
 
 def init_app(api_bp):
     @api_bp.route("/documentManagement")
@@ -49,6 +53,24 @@ def init_app(api_bp):
             logging.error(f"Error listing document details: {e}")
             return jsonify({"error": str(e)}), 500
 
+    @api_bp.route("/indexed_documents", methods=["GET"])
+    def list_indexed_documents():
+        limit = request.args.get("limit", type=int)
+        offset = request.args.get("offset", 0, type=int)
+        if (limit is not None and limit < 0) or offset < 0:
+            return jsonify({"error": "'limit' and 'offset' must be non-negative integers"}), 400
+        try:
+            documents = vector_store_service.list_documents(limit=limit, offset=offset)
+            return jsonify({
+                "documents": documents,
+                "offset": offset,
+                "limit": limit,
+                "chunk_count": vector_store_service.get_document_count(),
+            })
+        except Exception as e:
+            logging.error(f"Error listing indexed documents: {e}")
+            return jsonify({"error": str(e)}), 500
+
     @api_bp.route("/upload_document", methods=["POST"])
     def upload_document():
         if 'file' not in request.files:
@@ -59,7 +81,20 @@ def init_app(api_bp):
         if file.filename == '':
             return jsonify({"error": "No selected file", "status": "failed"}), 400
 
+        # mode=async persists the file, queues the rest of the pipeline and returns a job id.
+        ingest_mode = request.args.get("mode") or request.form.get("mode")
+
         try:
+            if ingest_mode == "async":
+                saved = document_service.save_upload(file)
+                job = ingestion_service.submit(saved)
+                return jsonify({
+                    "job_id": job.id,
+                    "filename": saved.filename,
+                    "file_type": saved.type,
+                    "status": job.status.value,
+                }), 202
+
             response = document_service.upload_document(file)
             vector_store_service.add_documents(response['chunks'], response['filename'])
             response["status"] = "success"
@@ -70,6 +105,155 @@ def init_app(api_bp):
             logging.error(f"Error uploading document: {e}")
             return jsonify({"error": str(e), "status": "failed"}), 500
 
+    @api_bp.route("/replace_document", methods=["POST"])
+    def replace_document():
+        if 'file' not in request.files:
+            return jsonify({"error": "No file part in the request", "status": "failed"}), 400
+
+        file = request.files['file']
+
+        if file.filename == '':
+            return jsonify({"error": "No selected file", "status": "failed"}), 400
+
+        try:
+            saved = document_service.save_replacement(file)
+            ingest_stats = {}
+            docs, is_structured = document_service.load_documents(saved, ingest_stats)
+            replace_stats = vector_store_service.replace_documents(docs, saved.filename)
+            publish_error = document_service.republish_document(saved)
+            return jsonify({
+                "filename": saved.filename,
+                "file_type": saved.type,
+                "doc_len": len(docs),
+                "is_structured": is_structured,
+                "ingest_stats": ingest_stats,
+                **replace_stats,
+                "published": publish_error is None,
+                "publish_error": publish_error,
+                "status": "success",
+            })
+        except ValueError as ve:
+            return jsonify({"error": str(ve), "status": "failed"}), 400
+        except Exception as e:
+            logging.error(f"Error replacing document: {e}")
+            return jsonify({"error": str(e), "status": "failed"}), 500
+
+    @api_bp.route("/upload_documents", methods=["POST"])
+    def upload_documents():
+        files = request.files.getlist('files')
+        if not files:
+            return jsonify({"error": "No 'files' part in the request", "status": "failed"}), 400
+
+        manifest = []
+        saved_uploads = []
+        for file in files:
+            if file.filename == '':
+                continue
+            try:
+                saved_uploads.append(document_service.save_upload(file))
+            except ValueError as ve:
+                manifest.append({"filename": file.filename, "status": "failed", "error": str(ve)})
+            except Exception as e:
+                logging.error(f"Error saving {file.filename}: {e}")
+                manifest.append({"filename": file.filename, "status": "failed", "error": str(e)})
+
+        try:
+            manifest.extend(ingestion_service.ingest_batch(saved_uploads))
+        except Exception as e:
+            logging.error(f"Error in bulk upload: {e}")
+            return jsonify({"error": str(e), "status": "failed", "files": manifest}), 500
+
+        succeeded = sum(1 for entry in manifest if entry["status"] == "success")
+        return jsonify({
+            "status": "success" if succeeded == len(manifest) else "partial" if succeeded else "failed",
+            "succeeded": succeeded,
+            "failed": len(manifest) - succeeded,
+            "files": manifest,
+        })
+
+    @api_bp.route("/uploads", methods=["POST"])
+    def init_resumable_upload():
+        json_content = request.json or {}
+        filename = json_content.get("filename")
+        size = json_content.get("size")
+        checksum = json_content.get("checksum")
+
+        if not filename or not isinstance(size, int) or not checksum:
+            return jsonify({"error": "'filename', integer 'size' and MD5 'checksum' are required"}), 400
+
+        try:
+            document_service._get_file_type(filename)
+            session = upload_session_service.init_upload(filename, size, checksum, json_content.get("chunk_size"))
+            return jsonify(session), 201
+        except ValueError as ve:
+            return jsonify({"error": str(ve)}), 400
+        except Exception as e:
+            logging.error(f"Error starting resumable upload: {e}")
+            return jsonify({"error": str(e)}), 500
+
+    @api_bp.route("/uploads/<upload_id>/chunks/<int:index>", methods=["PUT"])
+    def put_upload_chunk(upload_id, index):
+        try:
+            # Read the raw body as a stream so the chunk is never buffered whole by werkzeug.
+            return jsonify(upload_session_service.put_chunk(upload_id, index, request.stream))
+        except FileNotFoundError:
+            return jsonify({"error": "Upload session not found"}), 404
+        except ValueError as ve:
+            return jsonify({"error": str(ve)}), 400
+        except Exception as e:
+            logging.error(f"Error receiving chunk {index} for upload {upload_id}: {e}")
+            return jsonify({"error": str(e)}), 500
+
+    @api_bp.route("/uploads/<upload_id>", methods=["GET"])
+    def get_upload_status(upload_id):
+        try:
+            return jsonify(upload_session_service.get_status(upload_id))
+        except FileNotFoundError:
+            return jsonify({"error": "Upload session not found"}), 404
+
+    @api_bp.route("/uploads/<upload_id>", methods=["DELETE"])
+    def abort_upload(upload_id):
+        try:
+            upload_session_service.discard(upload_id)
+            return jsonify({"status": "success"})
+        except FileNotFoundError:
+            return jsonify({"error": "Upload session not found"}), 404
+
+    @api_bp.route("/uploads/<upload_id>/finalize", methods=["POST"])
+    def finalize_upload(upload_id):
+        try:
+            staged_path, filename, file_hash, size = upload_session_service.finalize(upload_id)
+        except FileNotFoundError:
+            return jsonify({"error": "Upload session not found"}), 404
+        except ValueError as ve:
+            return jsonify({"error": str(ve), "status": "failed"}), 400
+
+        try:
+            saved = document_service.save_staged_file(staged_path, filename, file_hash, size)
+        except ValueError as ve:
+            upload_session_service.discard(upload_id)
+            return jsonify({"error": str(ve), "status": "failed"}), 400
+        except Exception as e:
+            logging.error(f"Error finalizing upload {upload_id}: {e}")
+            return jsonify({"error": str(e), "status": "failed"}), 500
+        upload_session_service.discard(upload_id)
+
+        # Large files always go through the background ingestion pipeline.
+        job = ingestion_service.submit(saved)
+        return jsonify({
+            "job_id": job.id,
+            "filename": saved.filename,
+            "file_type": saved.type,
+            "status": job.status.value,
+        }), 202
+
+    @api_bp.route("/ingest_jobs/<job_id>", methods=["GET"])
+    def get_ingest_job(job_id):
+        job = ingestion_service.get_job(job_id)
+        if job is None:
+            return jsonify({"error": "Ingestion job not found"}), 404
+        return jsonify(job.to_dict())
+
     @api_bp.route("/delete_document", methods=["POST"])
     def delete_single_document():
         json_content = request.json
@@ -81,8 +265,9 @@ def init_app(api_bp):
             return jsonify({"error": "Both 'file_name' and 'file_type' are required in the JSON request"}), 400
 
         try:
-            document_service.delete_document(file_id, file_name, file_type)
+            # Chunks go first: if that fails the file and its record are still there to retry the delete.
             vector_store_service.delete_documents_by_source(file_name)
+            document_service.delete_document(file_id, file_name, file_type)
             return jsonify({"status": "success"})
         except FileNotFoundError:
             return jsonify({"error": "File not found"}), 404
@@ -90,6 +275,39 @@ def init_app(api_bp):
             logging.error(f"Error deleting document: {e}")
             return jsonify({"error": str(e)}), 500
 
+    @api_bp.route("/delete_documents", methods=["POST"])
+    def delete_documents():
+        documents = (request.json or {}).get("documents")
+        if not isinstance(documents, list) or not documents:
+            return jsonify({"error": "A non-empty 'documents' list is required in the JSON request"}), 400
+
+        results = []
+        deleted_names = []
+        for document in documents:
+            file_name = document.get("file_name")
+            file_type = document.get("file_type")
+            if not file_name or not file_type:
+                results.append({"file_name": file_name, "status": "failed",
+                                "error": "Both 'file_name' and 'file_type' are required"})
+                continue
+            try:
+                document_service.delete_document(document.get("file_id"), file_name, file_type)
+                results.append({"file_name": file_name, "status": "success"})
+            except FileNotFoundError:
+                results.append({"file_name": file_name, "status": "failed", "error": "File not found"})
+            except Exception as e:
+                logging.error(f"Error deleting document {file_name}: {e}")
+                results.append({"file_name": file_name, "status": "failed", "error": str(e)})
+            # Chunks are removed even if the file is already gone, so stale index entries get cleaned up.
+            deleted_names.append(file_name)
+
+        try:
+            chunks_deleted = vector_store_service.delete_documents_by_sources(deleted_names)
+        except Exception as e:
+            logging.error(f"Error deleting document chunks: {e}")
+            return jsonify({"error": str(e), "results": results}), 500
+        return jsonify({"results": results, "chunks_deleted": chunks_deleted})
+
     @api_bp.route('/documents/<file_type>/<path:filename>')
     def serve_document(file_type, filename):
         file_dir = document_service.get_document_dir(file_type)
@@ -1,11 +1,15 @@
-from flask import request, jsonify, Blueprint
+from flask import request, jsonify, Blueprint, Response, stream_with_context
 from ..services.llm_service import LLMService
 from ..services.vector_store_service import VectorStoreService
 from ..services.prompt_service import PromptService
 from ..services.stats_service import StatsService
+from ..services.chat_history_service import ChatHistoryService
 from ..config.config import Config
 from ..services.document_service import DocumentService
+from ..utils.sse import format_sse
+from ..utils.session import resolve_session_id
 import logging
+import time
 
 document_service = DocumentService(
     {
@@ -19,6 +23,9 @@ llm_service = LLMService(Config.OLLAMA_MODEL)
 vector_store_service = VectorStoreService(Config.DB_FOLDER, Config.CHUNK_SIZE, Config.CHUNK_OVERLAP, Config.SCORE_THRESHOLD, Config.SEARCH_K)
 prompt_service = PromptService()
 stats_service = StatsService()
+chat_history_service = ChatHistoryService()
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
 def init_app(api_bp): # Update parameter name to avoid shadowing
     @api_bp.route("/ai", methods=["POST"])
@@ -42,6 +49,9 @@ def init_app(api_bp): # Update parameter name to avoid shadowing
         query = json_content.get("query")
         prompt_type = json_content.get("promptType")
         selected_files = json_content.get('selected_files')  # This will be a list of filenames from the UI
+        retrieval_mode = json_content.get('retrieval_mode')  # Optional override of Config.RETRIEVAL_MODE
+        rewrite_mode = json_content.get('rewrite_mode')  # Optional override of Config.QUERY_REWRITE_MODE
+        session_id = resolve_session_id(request.headers, json_content)
 
         if not query:
             return jsonify({"error": "No 'query' found in JSON request"}), 400
@@ -51,27 +61,128 @@ def init_app(api_bp): # Update parameter name to avoid shadowing
             return jsonify({"error": "Unknown prompt type"}), 400
 
         try:
-            retrieval_result = vector_store_service.query_vector_store(query, prompt, selected_files)
+            retrieval_result = vector_store_service.answer_query(
+                query, prompt_type, selected_files, retrieval_mode, rewrite_mode,
+                chat_history_service.get(session_id),
+            )
             answer = retrieval_result['answer']
             sources = stats_service.create_context_with_metadata(retrieval_result.get("context", []))
 
             stats_service.update_usage_counts(retrieval_result.get("context", []))
             document_usage = stats_service.get_query_usage_percentage() # Note: This still refers to PDF usage
             query_usage = stats_service.get_query_usage_percentage() # Note: This still refers to PDF query usage
-            stats_service.update_chat_history(query, answer)
+            chat_history_service.append(session_id, query, answer)
 
             response_data = {
                 "answer": answer if sources else f"No relevant documents found for the query: {query}. This answer is generated without any document context.",
                 "sources": sources,
                 "document_usage": document_usage,
                 "query_usage": query_usage,
-                "disclaimer": "This answer is not based on any available documents." if not sources else None
+                "disclaimer": "This answer is not based on any available documents." if not sources else None,
+                "cached": retrieval_result.get("cached", False),
+                "context_packing": retrieval_result.get("context_packing"),
             }
             return jsonify(response_data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             logging.error(f"Error in /ask_document: {e}")
             return jsonify({"error": str(e)}), 500
     
+    @api_bp.route("/ai/stream", methods=["POST"])
+    def ask_ai_stream():
+        json_content = request.json
+        query = json_content.get("query")
+
+        if not query:
+            return jsonify({"error": "No 'query' found in JSON request"}), 400
+
+        def generate():
+            started = time.perf_counter()
+            first_token_ms = None
+            tokens = []
+            try:
+                for token in llm_service.stream(query):
+                    if first_token_ms is None:
+                        first_token_ms = (time.perf_counter() - started) * 1000
+                    tokens.append(token)
+                    yield format_sse("token", {"token": token})
+                total_ms = (time.perf_counter() - started) * 1000
+                logging.info(f"/ai/stream: first token after {first_token_ms or total_ms:.0f} ms, "
+                             f"finished after {total_ms:.0f} ms.")
+                yield format_sse("done", {
+                    "answer": "".join(tokens),
+                    "chunks": len(tokens),
+                    "time_to_first_token_ms": first_token_ms,
+                    "total_ms": total_ms,
+                })
+            except Exception as e:
+                logging.error(f"Error in /ai/stream: {e}")
+                yield format_sse("error", {"error": str(e)})
+
+        return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=SSE_HEADERS)
+
+    @api_bp.route("/ask_document/stream", methods=["POST"])
+    def ask_document_stream():
+        json_content = request.json
+        query = json_content.get("query")
+        prompt_type = json_content.get("promptType")
+        selected_files = json_content.get('selected_files')
+        retrieval_mode = json_content.get('retrieval_mode')
+        rewrite_mode = json_content.get('rewrite_mode')
+        session_id = resolve_session_id(request.headers, json_content)
+
+        if not query:
+            return jsonify({"error": "No 'query' found in JSON request"}), 400
+
+        prompt = prompt_service.get_prompt(prompt_type)
+        if not prompt:
+            return jsonify({"error": "Unknown prompt type"}), 400
+
+        def generate():
+            started = time.perf_counter()
+            first_token_ms = None
+            try:
+                for event, payload in vector_store_service.stream_answer(
+                    query, prompt_type, selected_files, retrieval_mode, rewrite_mode,
+                    chat_history_service.get(session_id),
+                ):
+                    if event == "context":
+                        yield format_sse("sources", {
+                            "sources": stats_service.create_context_with_metadata(payload.get("context", [])),
+                            "search_query": payload.get("search_query"),
+                            "context_packing": payload.get("context_packing"),
+                            "cached": payload.get("cached", False),
+                            "retrieval_ms": (time.perf_counter() - started) * 1000,
+                        })
+                    elif event == "token":
+                        if first_token_ms is None:
+                            first_token_ms = (time.perf_counter() - started) * 1000
+                        yield format_sse("token", {"token": payload})
+                    else:
+                        # History and usage are only recorded once the whole answer exists.
+                        answer = payload["answer"]
+                        context = payload.get("context", [])
+                        stats_service.update_usage_counts(context)
+                        chat_history_service.append(session_id, query, answer)
+                        total_ms = (time.perf_counter() - started) * 1000
+                        logging.info(f"/ask_document/stream: first token after {first_token_ms or total_ms:.0f} ms, "
+                                     f"finished after {total_ms:.0f} ms.")
+                        yield format_sse("done", {
+                            "answer": answer,
+                            "document_usage": stats_service.get_query_usage_percentage(),
+                            "query_usage": stats_service.get_query_usage_percentage(),
+                            "disclaimer": "This answer is not based on any available documents." if not context else None,
+                            "cached": payload.get("cached", False),
+                            "time_to_first_token_ms": first_token_ms,
+                            "total_ms": total_ms,
+                        })
+            except Exception as e:
+                logging.error(f"Error in /ask_document/stream: {e}")
+                yield format_sse("error", {"error": str(e)})
+
+        return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=SSE_HEADERS)
+
     @api_bp.route('/suggest_questions', methods=['POST'])
     def suggest_questions():
         json_content = request.get_json()
@@ -85,7 +196,7 @@ def init_app(api_bp): # Update parameter name to avoid shadowing
 
     @api_bp.route("/clear_chat_history", methods=["POST"])
     def clear_chat_history():
-        stats_service.clear_chat_history()
+        chat_history_service.clear(resolve_session_id(request.headers, request.get_json(silent=True)))
         return jsonify({"status": "Chat history cleared successfully"})
 
     @api_bp.route("/clear_db", methods=["POST"])
@@ -1,6 +1,8 @@
 from flask import jsonify
 from ..services.prompt_service import PromptService
 from ..services.stats_service import StatsService
+from ..services.chat_history_service import ChatHistoryService
+from ..services.vector_store_service import VectorStoreService
 import logging
 
 prompt_service = PromptService()
@@ -23,4 +25,61 @@ def init_app(api_bp):
             return jsonify({"document_usage": pdf_influence})
         except Exception as e:
             logging.error(f"Error getting PDF usage: {e}")
-            return jsonify({"error": str(e)}), 500
\ No newline at end of file
+            return jsonify({"error": str(e)}), 500
+
+    @api_bp.route("/embedding_cache_stats", methods=["GET"])
+    def get_embedding_cache_stats():
+        try:
+            stats = VectorStoreService().get_embedding_cache_stats()
+            if stats is None:
+                return jsonify({"enabled": False})
+            return jsonify({"enabled": True, **stats})
+        except Exception as e:
+            logging.error(f"Error getting embedding cache stats: {e}")
+            return jsonify({"error": str(e)}), 500
+
+    @api_bp.route("/embedding_stats", methods=["GET"])
+    def get_embedding_stats():
+        try:
+            return jsonify(VectorStoreService().get_embedding_stats())
+        except Exception as e:
+            logging.error(f"Error getting embedding stats: {e}")
+            return jsonify({"error": str(e)}), 500
+
+    @api_bp.route("/answer_cache_stats", methods=["GET"])
+    def get_answer_cache_stats():
+        try:
+            stats = VectorStoreService().get_answer_cache_stats()
+            if stats is None:
+                return jsonify({"enabled": False})
+            return jsonify({"enabled": True, **stats})
+        except Exception as e:
+            logging.error(f"Error getting answer cache stats: {e}")
+            return jsonify({"error": str(e)}), 500
+
+    @api_bp.route("/rerank_stats", methods=["GET"])
+    def get_rerank_stats():
+        try:
+            stats = VectorStoreService().get_rerank_stats()
+            if stats is None:
+                return jsonify({"enabled": False})
+            return jsonify({"enabled": True, **stats})
+        except Exception as e:
+            logging.error(f"Error getting rerank stats: {e}")
+            return jsonify({"error": str(e)}), 500
+
+    @api_bp.route("/query_rewrite_stats", methods=["GET"])
+    def get_query_rewrite_stats():
+        try:
+            return jsonify(VectorStoreService().get_query_rewrite_stats())
+        except Exception as e:
+            logging.error(f"Error getting query rewrite stats: {e}")
+            return jsonify({"error": str(e)}), 500
+
+    @api_bp.route("/chat_history_stats", methods=["GET"])
+    def get_chat_history_stats():
+        try:
+            return jsonify(ChatHistoryService().get_stats())
+        except Exception as e:
+            logging.error(f"Error getting chat history stats: {e}")
+            return jsonify({"error": str(e)}), 500
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.wsgi import WSGIMiddleware
+from .. import create_app
+from . import document_routes, query_routes
+import logging
+
+def create_asgi_app(environment):
+    """
+    ASGI entry point (`uvicorn asgi:app`). The query and document routes are
+    served natively: LLM calls await the async Ollama client and parsing,
+    embedding and index writes run on a thread pool, so a slow generation
+    does not hold a worker. Every other route falls through to the Flask app,
+    mounted underneath, and behaves exactly as it does under `app.py`.
+    """
+    flask_app = create_app(environment)
+
+    app = FastAPI(title="Doc Analyzer", docs_url=None, redoc_url=None, openapi_url=None)
+    app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:4200"], allow_methods=["*"], allow_headers=["*"])
+
+    api_router = APIRouter()
+    document_routes.init_app(api_router)
+    query_routes.init_app(api_router)
+    app.include_router(api_router, prefix="/api")
+
+    app.mount("/", WSGIMiddleware(flask_app))
+    logging.info(f"ASGI application started in {environment} environment.")
+    return app
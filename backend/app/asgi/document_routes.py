@@ -0,0 +1,236 @@
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.datastructures import UploadFile
+from werkzeug.datastructures import FileStorage
+# Shared with the Flask routes, so ingestion jobs and the hash index are the same on both servers.
+from ..api.document_routes import document_service, vector_store_service, ingestion_service
+from .helpers import read_json, run_blocking
+import logging
+
+def _file_storage(upload) -> FileStorage | None:
+    """Wraps a form upload in the werkzeug FileStorage the document service expects; None if the field is not a file."""
+    if not isinstance(upload, UploadFile):
+        return None
+    return FileStorage(stream=upload.file, filename=upload.filename or '', content_type=upload.content_type)
+
+def _int_arg(request: Request, name: str, default=None):
+    # Same leniency as Flask's request.args.get(type=int): unparsable values fall back to the default.
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+def init_app(router):
+    @router.get("/documentManagement")
+    async def document_management():
+        def count_documents():
+            return {
+                "pdf_count": len(document_service.list_documents("pdf")),
+                "docx_count": len(document_service.list_documents("docx")),
+                "csv_count": len(document_service.list_documents("csv")),
+                "xlsx_count": len(document_service.list_documents("xlsx")),
+                "doc_count": vector_store_service.get_document_count(),
+            }
+
+        try:
+            return JSONResponse(await run_blocking(count_documents))
+        except Exception as e:
+            logging.error(f"Error in document_management: {e}")
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+    @router.get("/indexed_documents")
+    async def list_indexed_documents(request: Request):
+        limit = _int_arg(request, "limit")
+        offset = _int_arg(request, "offset", 0)
+        if (limit is not None and limit < 0) or offset < 0:
+            return JSONResponse({"error": "'limit' and 'offset' must be non-negative integers"}, status_code=400)
+        try:
+            documents = await run_blocking(vector_store_service.list_documents, limit=limit, offset=offset)
+            return JSONResponse({
+                "documents": documents,
+                "offset": offset,
+                "limit": limit,
+                "chunk_count": await run_blocking(vector_store_service.get_document_count),
+            })
+        except Exception as e:
+            logging.error(f"Error listing indexed documents: {e}")
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+    @router.post("/upload_document")
+    async def upload_document(request: Request):
+        async with request.form() as form:
+            file = _file_storage(form.get('file'))
+            if file is None:
+                return JSONResponse({"error": "No file part in the request", "status": "failed"}, status_code=400)
+
+            if file.filename == '':
+                return JSONResponse({"error": "No selected file", "status": "failed"}, status_code=400)
+
+            # mode=async persists the file, queues the rest of the pipeline and returns a job id.
+            ingest_mode = request.query_params.get("mode") or form.get("mode")
+
+            try:
+                saved = await run_blocking(document_service.save_upload, file)
+                if ingest_mode == "async":
+                    job = ingestion_service.submit(saved)
+                    return JSONResponse({
+                        "job_id": job.id,
+                        "filename": saved.filename,
+                        "file_type": saved.type,
+                        "status": job.status.value,
+                    }, status_code=202)
+
+                ingest_stats = {}
+                try:
+                    docs, is_structured = await run_blocking(document_service.load_documents, saved, ingest_stats)
+                except Exception:
+                    await run_blocking(document_service.discard_upload, saved)
+                    raise
+                publish_error = await document_service.apublish_document(saved)
+                await run_blocking(vector_store_service.add_documents, docs, saved.filename)
+                return JSONResponse(jsonable_encoder({
+                    "filename": saved.filename,
+                    "doc_len": len(docs),
+                    "chunks": docs,
+                    "is_structured": is_structured,
+                    "file_type": saved.type,
+                    "ingest_stats": ingest_stats,
+                    "published": publish_error is None,
+                    "publish_error": publish_error,
+                    "status": "success",
+                }))
+            except ValueError as ve:
+                return JSONResponse({"error": str(ve), "status": "failed"}, status_code=400)
+            except Exception as e:
+                logging.error(f"Error uploading document: {e}")
+                return JSONResponse({"error": str(e), "status": "failed"}, status_code=500)
+
+    @router.post("/replace_document")
+    async def replace_document(request: Request):
+        async with request.form() as form:
+            file = _file_storage(form.get('file'))
+            if file is None:
+                return JSONResponse({"error": "No file part in the request", "status": "failed"}, status_code=400)
+
+            if file.filename == '':
+                return JSONResponse({"error": "No selected file", "status": "failed"}, status_code=400)
+
+            try:
+                saved = await run_blocking(document_service.save_replacement, file)
+                ingest_stats = {}
+                docs, is_structured = await run_blocking(document_service.load_documents, saved, ingest_stats)
+                replace_stats = await run_blocking(vector_store_service.replace_documents, docs, saved.filename)
+                publish_error = await document_service.arepublish_document(saved)
+                return JSONResponse({
+                    "filename": saved.filename,
+                    "file_type": saved.type,
+                    "doc_len": len(docs),
+                    "is_structured": is_structured,
+                    "ingest_stats": ingest_stats,
+                    **replace_stats,
+                    "published": publish_error is None,
+                    "publish_error": publish_error,
+                    "status": "success",
+                })
+            except ValueError as ve:
+                return JSONResponse({"error": str(ve), "status": "failed"}, status_code=400)
+            except Exception as e:
+                logging.error(f"Error replacing document: {e}")
+                return JSONResponse({"error": str(e), "status": "failed"}, status_code=500)
+
+    @router.post("/upload_documents")
+    async def upload_documents(request: Request):
+        async with request.form() as form:
+            files = [_file_storage(upload) for upload in form.getlist('files')]
+            files = [file for file in files if file is not None]
+            if not files:
+                return JSONResponse({"error": "No 'files' part in the request", "status": "failed"}, status_code=400)
+
+            manifest = []
+            saved_uploads = []
+            for file in files:
+                if file.filename == '':
+                    continue
+                try:
+                    saved_uploads.append(await run_blocking(document_service.save_upload, file))
+                except ValueError as ve:
+                    manifest.append({"filename": file.filename, "status": "failed", "error": str(ve)})
+                except Exception as e:
+                    logging.error(f"Error saving {file.filename}: {e}")
+                    manifest.append({"filename": file.filename, "status": "failed", "error": str(e)})
+
+        try:
+            manifest.extend(await run_blocking(ingestion_service.ingest_batch, saved_uploads))
+        except Exception as e:
+            logging.error(f"Error in bulk upload: {e}")
+            return JSONResponse({"error": str(e), "status": "failed", "files": manifest}, status_code=500)
+
+        succeeded = sum(1 for entry in manifest if entry["status"] == "success")
+        return JSONResponse({
+            "status": "success" if succeeded == len(manifest) else "partial" if succeeded else "failed",
+            "succeeded": succeeded,
+            "failed": len(manifest) - succeeded,
+            "files": manifest,
+        })
+
+    @router.get("/ingest_jobs/{job_id}")
+    async def get_ingest_job(job_id: str):
+        job = ingestion_service.get_job(job_id)
+        if job is None:
+            return JSONResponse({"error": "Ingestion job not found"}, status_code=404)
+        return JSONResponse(job.to_dict())
+
+    @router.post("/delete_document")
+    async def delete_single_document(request: Request):
+        json_content = await read_json(request) or {}
+        file_id = json_content.get("file_id")
+        file_name = json_content.get("file_name")
+        file_type = json_content.get("file_type")
+
+        if not file_name or not file_type:
+            return JSONResponse({"error": "Both 'file_name' and 'file_type' are required in the JSON request"}, status_code=400)
+
+        try:
+            # Chunks go first: if that fails the file and its record are still there to retry the delete.
+            await run_blocking(vector_store_service.delete_documents_by_source, file_name)
+            await run_blocking(document_service.delete_document, file_id, file_name, file_type)
+            return JSONResponse({"status": "success"})
+        except FileNotFoundError:
+            return JSONResponse({"error": "File not found"}, status_code=404)
+        except Exception as e:
+            logging.error(f"Error deleting document: {e}")
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+    @router.post("/delete_documents")
+    async def delete_documents(request: Request):
+        documents = (await read_json(request) or {}).get("documents")
+        if not isinstance(documents, list) or not documents:
+            return JSONResponse({"error": "A non-empty 'documents' list is required in the JSON request"}, status_code=400)
+
+        results = []
+        deleted_names = []
+        for document in documents:
+            file_name = document.get("file_name")
+            file_type = document.get("file_type")
+            if not file_name or not file_type:
+                results.append({"file_name": file_name, "status": "failed",
+                                "error": "Both 'file_name' and 'file_type' are required"})
+                continue
+            try:
+                await run_blocking(document_service.delete_document, document.get("file_id"), file_name, file_type)
+                results.append({"file_name": file_name, "status": "success"})
+            except FileNotFoundError:
+                results.append({"file_name": file_name, "status": "failed", "error": "File not found"})
+            except Exception as e:
+                logging.error(f"Error deleting document {file_name}: {e}")
+                results.append({"file_name": file_name, "status": "failed", "error": str(e)})
+            # Chunks are removed even if the file is already gone, so stale index entries get cleaned up.
+            deleted_names.append(file_name)
+
+        try:
+            chunks_deleted = await run_blocking(vector_store_service.delete_documents_by_sources, deleted_names)
+        except Exception as e:
+            logging.error(f"Error deleting document chunks: {e}")
+            return JSONResponse({"error": str(e), "results": results}, status_code=500)
+        return JSONResponse({"results": results, "chunks_deleted": chunks_deleted})
@@ -0,0 +1,25 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from fastapi import Request
+from ..config.config import Config
+
+# Parsing, embedding and vector-store writes get their own bounded pool, so a
+# burst of uploads cannot take every thread the query chains run on.
+cpu_executor = ThreadPoolExecutor(max_workers=Config.ASGI_CPU_WORKERS, thread_name_prefix="asgi-cpu")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Runs a blocking call on the CPU pool and waits for it without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(cpu_executor, functools.partial(func, *args, **kwargs))
+
+
+async def read_json(request: Request) -> Optional[dict]:
+    """The request's JSON object, or None when the body is not one (Flask answers 400 there too)."""
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
@@ -0,0 +1,178 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+# The ASGI routes share the Flask routes' service instances, so stats, history
+# and caches are the same whichever server handled a request.
+from ..api.query_routes import llm_service, vector_store_service, prompt_service, stats_service, \
+    chat_history_service, SSE_HEADERS
+from ..utils.sse import format_sse
+from ..utils.session import resolve_session_id
+from .helpers import read_json
+import asyncio
+import logging
+import time
+
+NOT_JSON = {"error": "Request body must be a JSON object"}
+
+def init_app(router):
+    @router.post("/ai")
+    async def ask_ai(request: Request):
+        json_content = await read_json(request)
+        if json_content is None:
+            return JSONResponse(NOT_JSON, status_code=400)
+        query = json_content.get("query")
+
+        if not query:
+            return JSONResponse({"error": "No 'query' found in JSON request"}, status_code=400)
+
+        try:
+            response = await llm_service.ainvoke(query)
+            return JSONResponse({"answer": response})
+        except Exception as e:
+            logging.error(f"Error in /ai: {e}")
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+    @router.post("/ask_document")
+    async def ask_document(request: Request):
+        json_content = await read_json(request)
+        if json_content is None:
+            return JSONResponse(NOT_JSON, status_code=400)
+        query = json_content.get("query")
+        prompt_type = json_content.get("promptType")
+        selected_files = json_content.get('selected_files')
+        retrieval_mode = json_content.get('retrieval_mode')
+        rewrite_mode = json_content.get('rewrite_mode')
+        session_id = resolve_session_id(request.headers, json_content)
+
+        if not query:
+            return JSONResponse({"error": "No 'query' found in JSON request"}, status_code=400)
+
+        prompt = prompt_service.get_prompt(prompt_type)
+        if not prompt:
+            return JSONResponse({"error": "Unknown prompt type"}, status_code=400)
+
+        try:
+            # With the mongo store these are network calls, so they run on a worker thread.
+            chat_history = await asyncio.to_thread(chat_history_service.get, session_id)
+            retrieval_result = await vector_store_service.aanswer_query(
+                query, prompt_type, selected_files, retrieval_mode, rewrite_mode, chat_history
+            )
+            answer = retrieval_result['answer']
+            sources = stats_service.create_context_with_metadata(retrieval_result.get("context", []))
+
+            stats_service.update_usage_counts(retrieval_result.get("context", []))
+            document_usage = stats_service.get_query_usage_percentage()
+            query_usage = stats_service.get_query_usage_percentage()
+            await asyncio.to_thread(chat_history_service.append, session_id, query, answer)
+
+            return JSONResponse({
+                "answer": answer if sources else f"No relevant documents found for the query: {query}. This answer is generated without any document context.",
+                "sources": sources,
+                "document_usage": document_usage,
+                "query_usage": query_usage,
+                "disclaimer": "This answer is not based on any available documents." if not sources else None,
+                "cached": retrieval_result.get("cached", False),
+                "context_packing": retrieval_result.get("context_packing"),
+            })
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        except Exception as e:
+            logging.error(f"Error in /ask_document: {e}")
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+    @router.post("/ai/stream")
+    async def ask_ai_stream(request: Request):
+        json_content = await read_json(request)
+        if json_content is None:
+            return JSONResponse(NOT_JSON, status_code=400)
+        query = json_content.get("query")
+
+        if not query:
+            return JSONResponse({"error": "No 'query' found in JSON request"}, status_code=400)
+
+        async def generate():
+            started = time.perf_counter()
+            first_token_ms = None
+            tokens = []
+            try:
+                async for token in llm_service.astream(query):
+                    if first_token_ms is None:
+                        first_token_ms = (time.perf_counter() - started) * 1000
+                    tokens.append(token)
+                    yield format_sse("token", {"token": token})
+                total_ms = (time.perf_counter() - started) * 1000
+                logging.info(f"/ai/stream: first token after {first_token_ms or total_ms:.0f} ms, "
+                             f"finished after {total_ms:.0f} ms.")
+                yield format_sse("done", {
+                    "answer": "".join(tokens),
+                    "chunks": len(tokens),
+                    "time_to_first_token_ms": first_token_ms,
+                    "total_ms": total_ms,
+                })
+            except Exception as e:
+                logging.error(f"Error in /ai/stream: {e}")
+                yield format_sse("error", {"error": str(e)})
+
+        return StreamingResponse(generate(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    @router.post("/ask_document/stream")
+    async def ask_document_stream(request: Request):
+        json_content = await read_json(request)
+        if json_content is None:
+            return JSONResponse(NOT_JSON, status_code=400)
+        query = json_content.get("query")
+        prompt_type = json_content.get("promptType")
+        selected_files = json_content.get('selected_files')
+        retrieval_mode = json_content.get('retrieval_mode')
+        rewrite_mode = json_content.get('rewrite_mode')
+        session_id = resolve_session_id(request.headers, json_content)
+
+        if not query:
+            return JSONResponse({"error": "No 'query' found in JSON request"}, status_code=400)
+
+        prompt = prompt_service.get_prompt(prompt_type)
+        if not prompt:
+            return JSONResponse({"error": "Unknown prompt type"}, status_code=400)
+
+        async def generate():
+            started = time.perf_counter()
+            first_token_ms = None
+            try:
+                chat_history = await asyncio.to_thread(chat_history_service.get, session_id)
+                async for event, payload in vector_store_service.astream_answer(
+                    query, prompt_type, selected_files, retrieval_mode, rewrite_mode, chat_history
+                ):
+                    if event == "context":
+                        yield format_sse("sources", {
+                            "sources": stats_service.create_context_with_metadata(payload.get("context", [])),
+                            "search_query": payload.get("search_query"),
+                            "context_packing": payload.get("context_packing"),
+                            "cached": payload.get("cached", False),
+                            "retrieval_ms": (time.perf_counter() - started) * 1000,
+                        })
+                    elif event == "token":
+                        if first_token_ms is None:
+                            first_token_ms = (time.perf_counter() - started) * 1000
+                        yield format_sse("token", {"token": payload})
+                    else:
+                        # History and usage are only recorded once the whole answer exists.
+                        answer = payload["answer"]
+                        context = payload.get("context", [])
+                        stats_service.update_usage_counts(context)
+                        await asyncio.to_thread(chat_history_service.append, session_id, query, answer)
+                        total_ms = (time.perf_counter() - started) * 1000
+                        logging.info(f"/ask_document/stream: first token after {first_token_ms or total_ms:.0f} ms, "
+                                     f"finished after {total_ms:.0f} ms.")
+                        yield format_sse("done", {
+                            "answer": answer,
+                            "document_usage": stats_service.get_query_usage_percentage(),
+                            "query_usage": stats_service.get_query_usage_percentage(),
+                            "disclaimer": "This answer is not based on any available documents." if not context else None,
+                            "cached": payload.get("cached", False),
+                            "time_to_first_token_ms": first_token_ms,
+                            "total_ms": total_ms,
+                        })
+            except Exception as e:
+                logging.error(f"Error in /ask_document/stream: {e}")
+                yield format_sse("error", {"error": str(e)})
+
+        return StreamingResponse(generate(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,20 @@
+import click
+
+
+def register_commands(app):
+    @app.cli.command("rebuild-hash-index")
+    def rebuild_hash_index():
+        """Rebuilds the duplicate-detection hash index from the files on disk."""
+        from .api.document_routes import document_service
+
+        counts = document_service.rebuild_hash_index()
+        for file_type, count in counts.items():
+            click.echo(f"{file_type}: {count} files indexed")
+
+    @app.cli.command("rebuild-lexical-index")
+    def rebuild_lexical_index():
+        """Rebuilds the BM25 index used by hybrid retrieval from the chunks in the vector store."""
+        from .api.document_routes import vector_store_service
+
+        count = vector_store_service.rebuild_lexical_index()
+        click.echo(f"{count} chunks indexed")
@@ -12,6 +12,11 @@ class Config:
     CSV_DIR = os.path.join(DATA_DIR, 'csv')
     XLSX_DIR = os.path.join(DATA_DIR, 'xlsx')
     LOGS_DIR = os.path.join(BASE_DIR, '..', '..', 'logs')
+    HASH_INDEX_PATH = os.path.join(DATA_DIR, 'hash_index.sqlite3')
+    UPLOAD_STAGING_DIR = os.path.join(DATA_DIR, 'staging')
+    EMBEDDING_CACHE_PATH = os.path.join(DATA_DIR, 'embedding_cache.sqlite3')
+    LEXICAL_INDEX_PATH = os.path.join(DATA_DIR, 'lexical_index.sqlite3')
+    INGEST_JOB_PATH = os.path.join(DATA_DIR, 'ingest_jobs.sqlite3')
     PDF_DIRECTORY = PDF_DIR  # For serving PDFs
     DOCX_DIR = DOCX_DIR
     CSV_DIR = CSV_DIR
@@ -22,6 +27,59 @@ class Config:
     CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', 100))
     SCORE_THRESHOLD = float(os.getenv('SCORE_THRESHOLD', 0.1))
     SEARCH_K = int(os.getenv('SEARCH_K', 20))
+    INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', 2))
+    INGEST_JOB_HISTORY = int(os.getenv('INGEST_JOB_HISTORY', 500))
+    INGEST_JOB_HEARTBEAT = float(os.getenv('INGEST_JOB_HEARTBEAT', 30))  # Seconds; a job silent for 4 heartbeats is rolled back
+    XLSX_ROWS_PER_DOCUMENT = int(os.getenv('XLSX_ROWS_PER_DOCUMENT', 200))
+    BULK_PARSE_WORKERS = int(os.getenv('BULK_PARSE_WORKERS', 4))
+    BULK_UPLOAD_WORKERS = int(os.getenv('BULK_UPLOAD_WORKERS', 4))
+    BULK_MAX_IN_FLIGHT = int(os.getenv('BULK_MAX_IN_FLIGHT', 8))  # Parsed files waiting to be embedded
+    VECTOR_WRITE_BATCH_SIZE = int(os.getenv('VECTOR_WRITE_BATCH_SIZE', 256))  # Chunks per vector store write
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))  # Default chunk size for resumable uploads
+    UPLOAD_MIN_CHUNK_SIZE = int(os.getenv('UPLOAD_MIN_CHUNK_SIZE', 256 * 1024))  # Smallest chunk size a resumable upload may ask for
+    UPLOAD_SESSION_TTL = int(os.getenv('UPLOAD_SESSION_TTL', 24 * 60 * 60))  # Seconds before an idle upload is discarded
+    UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', 2 * 1024 * 1024 * 1024))  # Largest file a resumable upload may declare, in bytes
+    EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true'
+    EMBEDDING_CACHE_MAX_MB = int(os.getenv('EMBEDDING_CACHE_MAX_MB', 512))
+    EMBED_BATCH_SIZE = int(os.getenv('EMBED_BATCH_SIZE', 256))
+    EMBED_THREADS = int(os.getenv('EMBED_THREADS', 0)) or None  # ONNX intra-op threads; None lets onnxruntime decide
+    # Data-parallel embedding worker processes: unset keeps a single process, 0 uses every core
+    EMBED_PARALLEL = int(os.environ['EMBED_PARALLEL']) if os.getenv('EMBED_PARALLEL') else None
+    QUERY_EMBED_THREADS = int(os.getenv('QUERY_EMBED_THREADS', 2))
+    RETRIEVAL_MODE = os.getenv('RETRIEVAL_MODE', 'vector')  # vector or hybrid (BM25 + vector, fused with RRF)
+    HYBRID_CANDIDATES = int(os.getenv('HYBRID_CANDIDATES', 50))  # Candidates taken from each retriever before fusion
+    RRF_K = int(os.getenv('RRF_K', 60))
+    ANSWER_CACHE_ENABLED = os.getenv('ANSWER_CACHE_ENABLED', 'true').lower() == 'true'
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', 1000))
+    ANSWER_CACHE_TTL = int(os.getenv('ANSWER_CACHE_TTL', 3600))  # Seconds
+    ANSWER_CACHE_SIMILARITY = float(os.getenv('ANSWER_CACHE_SIMILARITY', 0.95))  # 0 disables near-duplicate matching
+    # Invalidation log shared by every worker on this host; empty keeps invalidation per process.
+    ANSWER_CACHE_SYNC_PATH = os.getenv('ANSWER_CACHE_SYNC_PATH', os.path.join(DATA_DIR, 'answer_cache.sqlite3'))
+    CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', 3000))  # 0 disables the budget
+    MMR_LAMBDA = float(os.getenv('MMR_LAMBDA', 0.7))  # 1 ranks by relevance only, 0 by diversity only
+    DUPLICATE_SIMILARITY = float(os.getenv('DUPLICATE_SIMILARITY', 0.95))
+    RERANK_ENABLED = os.getenv('RERANK_ENABLED', 'false').lower() == 'true'
+    RERANK_MODEL = os.getenv('RERANK_MODEL', 'Xenova/ms-marco-MiniLM-L-6-v2')
+    RERANK_CANDIDATES = int(os.getenv('RERANK_CANDIDATES', 40))  # Retrieved wide...
+    RERANK_TOP_K = int(os.getenv('RERANK_TOP_K', 6))  # ...sent narrow to the LLM
+    RERANK_THREADS = int(os.getenv('RERANK_THREADS', 0)) or None
+    QUERY_REWRITE_MODE = os.getenv('QUERY_REWRITE_MODE', 'heuristic')  # always, never or heuristic
+    QUERY_REWRITE_CACHE_SIZE = int(os.getenv('QUERY_REWRITE_CACHE_SIZE', 1000))
+    QUERY_REWRITE_HISTORY_TURNS = int(os.getenv('QUERY_REWRITE_HISTORY_TURNS', 3))
+    CHAT_HISTORY_STORE = os.getenv('CHAT_HISTORY_STORE', 'memory')  # memory (per process) or mongo (shared by all workers)
+    CHAT_HISTORY_TURNS = int(os.getenv('CHAT_HISTORY_TURNS', 10))  # Question/answer pairs kept per session
+    CHAT_HISTORY_TTL = int(os.getenv('CHAT_HISTORY_TTL', 24 * 60 * 60))  # Seconds before an idle session is forgotten
+    CHAT_HISTORY_MAX_SESSIONS = int(os.getenv('CHAT_HISTORY_MAX_SESSIONS', 10000))  # In-memory store only
+    HISTORY_SUMMARY_ENABLED = os.getenv('HISTORY_SUMMARY_ENABLED', 'true').lower() == 'true'  # Only runs if QUERY_REWRITE_HISTORY_TURNS > HISTORY_VERBATIM_TURNS
+    HISTORY_VERBATIM_TURNS = int(os.getenv('HISTORY_VERBATIM_TURNS', 3))  # Recent turns kept word for word; older ones are summarized
+    HISTORY_SUMMARY_MAX_WORDS = int(os.getenv('HISTORY_SUMMARY_MAX_WORDS', 150))
+    ASGI_CPU_WORKERS = int(os.getenv('ASGI_CPU_WORKERS', 4))  # Threads for parsing, embedding and index writes under the ASGI server
+    PDF_ENGINE = os.getenv('PDF_ENGINE', 'pdfplumber')  # pdfplumber, pdfium or auto
+    PDF_WORKERS = int(os.getenv('PDF_WORKERS', os.cpu_count() or 1))
+    PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', 10))
+    PDF_TASK_TIMEOUT = int(os.getenv('PDF_TASK_TIMEOUT', 120))  # Seconds per page-range task
+    PDF_WORKER_MAX_MEMORY_MB = int(os.getenv('PDF_WORKER_MAX_MEMORY_MB', 2048))  # 0 disables the limit
+    PDF_WORKER_MAX_TASKS = int(os.getenv('PDF_WORKER_MAX_TASKS', 50))  # Recycle workers after this many tasks
     
     MONGO_URI = os.getenv('MONGO_URI')
     MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'DocParser')
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+import uuid
+from dataclasses import dataclass, field
 from datetime import datetime
 
 @dataclass
@@ -6,4 +7,30 @@ class DocumentDetail:
     filename: str
     size: int
     type: str
-    upload_date: datetime
\ No newline at end of file
+    upload_date: datetime
+
+@dataclass
+class SavedUpload:
+    filename: str
+    type: str
+    path: str
+    file_hash: str
+    size: int
+
+@dataclass
+class ChatSession:
+    """
+    A session's stored history. `turns` counts every question/answer pair
+    appended; `messages` holds only the most recent ones. The first
+    `summary_turns` turns are covered by `summary`, and `folded_tokens` is the
+    estimated size of the turns that were folded into it. `generation` is new
+    for every session created, so a cleared and restarted session can be told
+    apart from the one it replaced.
+    """
+    messages: list
+    turns: int = 0
+    summary: str = ""
+    summary_turns: int = 0
+    folded_tokens: int = 0
+    updated_at: float = 0.0
+    generation: str = field(default_factory=lambda: uuid.uuid4().hex)
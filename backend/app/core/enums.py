@@ -15,4 +15,10 @@ class AvailableModels(Enum):
         self.model_value = model_value
 
     def to_dict(self):
-        return {"name": self.display_name, "value": self.model_value}
\ No newline at end of file
+        return {"name": self.display_name, "value": self.model_value}
+
+class IngestJobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
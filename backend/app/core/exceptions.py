@@ -4,4 +4,8 @@ class FileHandlingError(Exception):
 
 class VectorStoreError(Exception):
     """Custom exception for vector store operations."""
-    pass
\ No newline at end of file
+    pass
+
+class DocumentExtractionError(Exception):
+    """Custom exception for document text extraction failures."""
+    pass
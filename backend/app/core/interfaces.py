@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 
 class DocumentServiceInterface(ABC):
     @abstractmethod
@@ -57,17 +57,23 @@ class VectorStoreServiceInterface(ABC):
         pass
 
     @abstractmethod
-    def add_documents(self, documents: List, source: str) -> None:
+    def add_documents(self, documents: Iterable, source: str) -> int:
         pass
 
     @abstractmethod
-    def query_vector_store(self, query: str, prompt: str) -> Dict[str, Any]:
+    def query_vector_store(self, query: str, prompt_type: str, selected_files: Optional[List[str]] = None,
+                           retrieval_mode: Optional[str] = None, rewrite_mode: Optional[str] = None,
+                           chat_history: Optional[List] = None) -> Dict[str, Any]:
         pass
 
     @abstractmethod
     def delete_documents_by_source(self, source: str) -> None:
         pass
 
+    @abstractmethod
+    def delete_documents_by_sources(self, sources: List[str]) -> int:
+        pass
+
     @abstractmethod
     def delete_document_by_id(self, doc_id: str) -> None:
         pass
@@ -77,7 +83,7 @@ class VectorStoreServiceInterface(ABC):
         pass
 
     @abstractmethod
-    def list_documents(self) -> List[Dict[str, str]]:
+    def list_documents(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
         pass
 
     @abstractmethod
@@ -109,11 +115,3 @@ class StatsServiceInterface(ABC):
     @abstractmethod
     def create_context_with_metadata(self, documents: List) -> List[Dict[str, str]]:
         pass
-
-    @abstractmethod
-    def clear_chat_history(self) -> None:
-        pass
-
-    @abstractmethod
-    def update_chat_history(self, human_message: str, ai_message: str) -> None:
-        pass
\ No newline at end of file
@@ -0,0 +1,69 @@
+import uuid
+from datetime import datetime, timedelta
+from pymongo import MongoClient, ReturnDocument
+from ...config.config import Config
+
+
+class ChatHistoryModel:
+    """
+    One document per chat session: `_id` is the session key, `messages` the
+    serialized recent turns, `turns` the number of turns ever appended,
+    `summary`/`summary_turns`/`folded_tokens` the running summary and what it
+    covers, `generation` an id set when the document is created, and
+    `updated_at` the last write. A TTL index on `updated_at` lets
+    MongoDB drop idle sessions.
+    """
+
+    def __init__(self, ttl: int):
+        self.client = MongoClient(Config.MONGO_URI)
+        self.db = self.client[Config.MONGO_DB_NAME]
+        self.chat_histories_collection = self.db['chat_histories']
+        self.ttl = ttl
+        self.chat_histories_collection.create_index("updated_at", expireAfterSeconds=ttl)
+
+    def get_session(self, session_id: str) -> dict | None:
+        # The TTL monitor only runs about once a minute, so expiry is also checked on read.
+        return self.chat_histories_collection.find_one(
+            {"_id": session_id, "updated_at": {"$gte": datetime.utcnow() - timedelta(seconds=self.ttl)}},
+        )
+
+    def append_messages(self, session_id: str, messages: list[dict], max_messages: int) -> dict:
+        """
+        Appends one turn's messages, trims the session to its last `max_messages`
+        and counts the turn, in one atomic update. Returns the updated turn counters.
+        """
+        return self.chat_histories_collection.find_one_and_update(
+            {"_id": session_id},
+            {
+                "$push": {"messages": {"$each": messages, "$slice": -max_messages}},
+                "$inc": {"turns": 1},
+                "$set": {"updated_at": datetime.utcnow()},
+                # A cleared session is deleted, so the next append starts a new generation.
+                "$setOnInsert": {"generation": uuid.uuid4().hex},
+            },
+            projection={"turns": True, "summary_turns": True},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def save_summary(self, session_id: str, generation: str | None, expected_summary_turns: int, summary: str,
+                     summary_turns: int, folded_tokens: int) -> bool:
+        """
+        Stores a new running summary unless the session was cleared and started
+        again (a new `generation`), or another worker already moved the summary
+        on since `expected_summary_turns` was read. Returns whether it was stored.
+        """
+        # Sessions written before summaries existed have no summary_turns field.
+        expected = {"$in": [0, None]} if expected_summary_turns == 0 else expected_summary_turns
+        result = self.chat_histories_collection.update_one(
+            {"_id": session_id, "generation": generation, "summary_turns": expected,
+             "turns": {"$gte": summary_turns}},
+            {"$set": {"summary": summary, "summary_turns": summary_turns}, "$inc": {"folded_tokens": folded_tokens}},
+        )
+        return result.modified_count == 1
+
+    def delete_session(self, session_id: str) -> None:
+        self.chat_histories_collection.delete_one({"_id": session_id})
+
+    def count_sessions(self) -> int:
+        return self.chat_histories_collection.estimated_document_count()
@@ -12,8 +12,8 @@ class DocumentDetailModel:
         self.db = self.client[Config.MONGO_DB_NAME]
         self.document_details_collection = self.db['document_details']
 
-    def insert_document_detail(self, name: str, size: int, upload_date: datetime, file_type: str, url: str, key: str):
-        document_detail = {
+    def _build_document_detail(self, name: str, size: int, upload_date: datetime, file_type: str, url: str, key: str) -> dict:
+        return {
             "name": name,
             "key": key,
             "size": size,
@@ -24,9 +24,32 @@ class DocumentDetailModel:
             "category": None,
             "sub_category": None
         }
+
+    def insert_document_detail(self, name: str, size: int, upload_date: datetime, file_type: str, url: str, key: str):
+        document_detail = self._build_document_detail(name, size, upload_date, file_type, url, key)
         result = self.document_details_collection.insert_one(document_detail)
         return str(result.inserted_id)  # Return the string representation of ObjectId
 
+    def insert_document_details(self, details: list[dict]) -> list[str]:
+        """Inserts many document details in one round trip. Each dict takes insert_document_detail's arguments."""
+        if not details:
+            return []
+        result = self.document_details_collection.insert_many(
+            [self._build_document_detail(**detail) for detail in details]
+        )
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+
+    def replace_document_detail(self, name: str, size: int, upload_date: datetime, file_type: str, url: str, key: str):
+        """Updates the stored details for a file name, inserting them if none exist."""
+        self.document_details_collection.update_one(
+            {"name": name, "type": file_type},
+            {
+                "$set": {"key": key, "size": size, "upload_date": upload_date, "url": url},
+                "$setOnInsert": {"user_id": None, "category": None, "sub_category": None},
+            },
+            upsert=True,
+        )
+
     def delete_document_detail_by_id(self, document_id: str):
         try:
             object_id = ObjectId(document_id)
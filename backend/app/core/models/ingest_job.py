@@ -0,0 +1,176 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from ..enums import IngestJobStatus
+
+INGEST_STAGES = ["parse", "embed", "publish"]
+
+
+@dataclass
+class IngestStage:
+    name: str
+    status: IngestJobStatus = IngestJobStatus.QUEUED
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "status": self.status.value,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IngestStage":
+        return cls(
+            name=data["name"],
+            status=IngestJobStatus(data["status"]),
+            started_at=_parse_time(data.get("started_at")),
+            finished_at=_parse_time(data.get("finished_at")),
+            error=data.get("error"),
+        )
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+@dataclass
+class IngestJob:
+    filename: str
+    file_type: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: IngestJobStatus = IngestJobStatus.QUEUED
+    created_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    stages: List[IngestStage] = field(default_factory=lambda: [IngestStage(name) for name in INGEST_STAGES])
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def get_stage(self, name: str) -> IngestStage:
+        return next(stage for stage in self.stages if stage.name == name)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (IngestJobStatus.COMPLETED, IngestJobStatus.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        completed = sum(1 for stage in self.stages if stage.status == IngestJobStatus.COMPLETED)
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "file_type": self.file_type,
+            "status": self.status.value,
+            "progress": completed / len(self.stages) if self.stages else 1.0,
+            "stages": [stage.to_dict() for stage in self.stages],
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IngestJob":
+        return cls(
+            filename=data["filename"],
+            file_type=data["file_type"],
+            id=data["job_id"],
+            status=IngestJobStatus(data["status"]),
+            created_at=_parse_time(data["created_at"]),
+            finished_at=_parse_time(data.get("finished_at")),
+            stages=[IngestStage.from_dict(stage) for stage in data["stages"]],
+            result=data.get("result") or {},
+            error=data.get("error"),
+        )
+
+
+# SQL list of the statuses of jobs that have not finished yet
+UNFINISHED = f"('{IngestJobStatus.QUEUED.value}', '{IngestJobStatus.RUNNING.value}')"
+
+
+class IngestJobModel:
+    """
+    Ingestion jobs in a SQLite table shared by every worker process, so a job
+    can be polled from any of them. Each row holds the job as `to_dict()`
+    JSON, the saved upload it is ingesting, the worker that runs it and that
+    worker's last heartbeat, which tells a job still running from one whose
+    worker died.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ingest_jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, job TEXT NOT NULL, "
+            "saved TEXT NOT NULL, owner TEXT NOT NULL, heartbeat_at REAL NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ingest_jobs_status ON ingest_jobs (status, heartbeat_at)")
+
+    def insert(self, job: IngestJob, saved: Dict[str, Any], owner: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO ingest_jobs (id, status, job, saved, owner, heartbeat_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.status.value, json.dumps(job.to_dict()), json.dumps(saved), owner, now, now),
+            )
+
+    def update(self, job: IngestJob) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE ingest_jobs SET status = ?, job = ?, heartbeat_at = ? WHERE id = ?",
+                (job.status.value, json.dumps(job.to_dict()), time.time(), job.id),
+            )
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            row = self._conn.execute("SELECT job FROM ingest_jobs WHERE id = ?", (job_id,)).fetchone()
+        return IngestJob.from_dict(json.loads(row[0])) if row else None
+
+    def heartbeat(self, owner: str) -> None:
+        """Marks the owner's unfinished jobs as still in progress."""
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE ingest_jobs SET heartbeat_at = ? WHERE owner = ? AND status IN {UNFINISHED}",
+                (time.time(), owner),
+            )
+
+    def claim_lost(self, owner: str, stale_before: float) -> List[Tuple[IngestJob, Dict[str, Any]]]:
+        """
+        Takes over the unfinished jobs with no heartbeat since `stale_before`.
+        Each lost job is claimed by exactly one caller. Returns (job, saved upload) pairs.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, job, saved, heartbeat_at FROM ingest_jobs WHERE status IN {UNFINISHED} "
+                "AND heartbeat_at < ?", (stale_before,),
+            ).fetchall()
+            claimed = []
+            for job_id, job, saved, heartbeat_at in rows:
+                cursor = self._conn.execute(
+                    "UPDATE ingest_jobs SET owner = ?, heartbeat_at = ? WHERE id = ? AND heartbeat_at = ?",
+                    (owner, time.time(), job_id, heartbeat_at),
+                )
+                if cursor.rowcount == 1:
+                    claimed.append((IngestJob.from_dict(json.loads(job)), json.loads(saved)))
+        return claimed
+
+    def prune(self, keep: int) -> None:
+        """Deletes finished jobs beyond the `keep` most recent."""
+        with self._lock:
+            self._conn.execute(
+                f"DELETE FROM ingest_jobs WHERE status NOT IN {UNFINISHED} AND id NOT IN "
+                "(SELECT id FROM ingest_jobs ORDER BY created_at DESC LIMIT ?)", (keep,),
+            )
@@ -0,0 +1,254 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional
+import numpy as np
+from ..config.config import Config
+
+
+def normalize_query(query: str) -> str:
+    """Lower-cases, collapses whitespace and drops trailing punctuation."""
+    return re.sub(r"\s+", " ", query).strip().lower().rstrip("?!. ")
+
+
+@dataclass
+class _CachedAnswer:
+    scope: tuple
+    query: str
+    result: dict
+    sources: set
+    created_at: float = field(default_factory=time.time)
+    embedding: Optional[np.ndarray] = None
+
+
+class AnswerCacheService:
+    """
+    LRU + TTL cache of retrieval-chain results for /api/ask_document.
+
+    Entries are keyed by normalized query, prompt type and selected files. If
+    `embed_query` is given and `similarity_threshold` is above zero, a query
+    with no exact match can also reuse the answer of a query in the same scope
+    whose embedding has a cosine similarity of at least the threshold.
+
+    An entry is dropped when any source it cited or was restricted to is
+    re-ingested or deleted; entries searched across all files are also dropped
+    whenever any source changes, since a new file could change their answer.
+
+    The entries live in the process. With `sync_path` set, invalidations are
+    also appended to a log in that SQLite file, and every lookup first applies
+    the ones other workers logged since it last looked, so a re-ingest on one
+    worker does not leave stale answers on the others.
+
+    Answers take a while to generate, so callers read `generation()` before
+    retrieval and pass it to `put`; an answer is not stored if any source was
+    invalidated in between, since it may be built from the old content.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[int] = None,
+                 similarity_threshold: Optional[float] = None,
+                 embed_query: Optional[Callable[[str], List[float]]] = None,
+                 sync_path: Optional[str] = None):
+        self.max_entries = max_entries or Config.ANSWER_CACHE_MAX_ENTRIES
+        self.ttl = ttl or Config.ANSWER_CACHE_TTL
+        self.similarity_threshold = (Config.ANSWER_CACHE_SIMILARITY
+                                     if similarity_threshold is None else similarity_threshold)
+        self.embed_query = embed_query if self.similarity_threshold > 0 else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._generation = 0  # Counts invalidations applied in this process, local or logged
+        self._sync = self._open_sync_log(sync_path) if sync_path else None
+        self._seen_generation = (
+            self._sync.execute("SELECT COALESCE(MAX(generation), 0) FROM invalidations").fetchone()[0]
+            if self._sync is not None else 0
+        )
+
+    @staticmethod
+    def _open_sync_log(path: str) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # `sources` is a JSON list of source names, or null when the whole cache was cleared.
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS invalidations ("
+            " generation INTEGER PRIMARY KEY AUTOINCREMENT, sources TEXT, created_at REAL NOT NULL)"
+        )
+        return conn
+
+    @staticmethod
+    def _scope(prompt_type: str, selected_files: Optional[List[str]]) -> tuple:
+        return prompt_type, tuple(sorted(set(selected_files or ())))
+
+    def _embed(self, query: str) -> Optional[np.ndarray]:
+        if self.embed_query is None:
+            return None
+        try:
+            vector = np.asarray(self.embed_query(query), dtype=np.float32)
+        except Exception as e:
+            logging.error(f"Error embedding query for the answer cache: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _is_expired(self, entry: _CachedAnswer) -> bool:
+        return time.time() - entry.created_at > self.ttl
+
+    def _drop(self, sources: Optional[set]) -> int:
+        """Drops the entries invalidated by a change to `sources` (None: all of them). Call with the lock held."""
+        doomed = [
+            key for key, entry in self._entries.items()
+            if sources is None or not entry.scope[1] or entry.sources & sources or sources.intersection(entry.scope[1])
+        ]
+        for key in doomed:
+            del self._entries[key]
+        self._generation += 1
+        self.invalidations += len(doomed)
+        return len(doomed)
+
+    def _apply_logged_invalidations(self) -> int:
+        """Applies invalidations other workers logged since the last check. Call with the lock held."""
+        if self._sync is None:
+            return 0
+        try:
+            rows = self._sync.execute(
+                "SELECT generation, sources FROM invalidations WHERE generation > ? ORDER BY generation",
+                (self._seen_generation,),
+            ).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading the answer cache invalidation log: {e}")
+            return 0
+        dropped = 0
+        for generation, sources in rows:
+            dropped += self._drop(None if sources is None else set(json.loads(sources)))
+            self._seen_generation = generation
+        return dropped
+
+    def _log_invalidation(self, sources: Optional[set]) -> int:
+        """Drops matching entries here and records the change for the other workers. Call with the lock held."""
+        if self._sync is None:
+            return self._drop(sources)
+        try:
+            # One write transaction, so no other worker's entry can land between the catch-up and our own.
+            self._sync.execute("BEGIN IMMEDIATE")
+            try:
+                self._apply_logged_invalidations()
+                dropped = self._drop(sources)
+                now = time.time()
+                cursor = self._sync.execute(
+                    "INSERT INTO invalidations (sources, created_at) VALUES (?, ?)",
+                    (None if sources is None else json.dumps(sorted(sources)), now),
+                )
+                self._seen_generation = cursor.lastrowid
+                # Entries older than the TTL have expired everywhere, so older log rows can go.
+                self._sync.execute("DELETE FROM invalidations WHERE created_at < ?", (now - self.ttl,))
+                self._sync.execute("COMMIT")
+                return dropped
+            except BaseException:
+                self._sync.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logging.error(f"Error logging answer cache invalidation: {e}")
+            return self._drop(sources)
+
+    def get(self, query: str, prompt_type: str, selected_files: Optional[List[str]] = None) -> Optional[dict]:
+        scope = self._scope(prompt_type, selected_files)
+        key = (scope, normalize_query(query))
+        with self._lock:
+            self._apply_logged_invalidations()
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.result
+
+        embedding = self._embed(query)
+        if embedding is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            best_key, best_score = None, self.similarity_threshold
+            for candidate_key, candidate in self._entries.items():
+                if candidate.scope != scope or candidate.embedding is None or self._is_expired(candidate):
+                    continue
+                score = float(np.dot(embedding, candidate.embedding))
+                if score >= best_score:
+                    best_key, best_score = candidate_key, score
+            if best_key is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.semantic_hits += 1
+            logging.info(f"Answer cache matched '{query}' to '{self._entries[best_key].query}' "
+                         f"(similarity {best_score:.3f}).")
+            return self._entries[best_key].result
+
+    def generation(self) -> int:
+        """A marker of the invalidations seen so far, to pass to `put`."""
+        with self._lock:
+            self._apply_logged_invalidations()
+            return self._generation
+
+    def put(self, query: str, prompt_type: str, selected_files: Optional[List[str]], result: dict,
+            generation: Optional[int] = None) -> bool:
+        """
+        Stores an answer. With `generation` from `generation()`, the answer is
+        skipped if a source was invalidated since. Returns whether it was stored.
+        """
+        scope = self._scope(prompt_type, selected_files)
+        sources = {doc.metadata.get("source") for doc in result.get("context", [])}
+        entry = _CachedAnswer(scope=scope, query=query, result=result, sources=sources - {None},
+                              embedding=self._embed(query))
+        with self._lock:
+            self._apply_logged_invalidations()
+            if generation is not None and generation != self._generation:
+                logging.info(f"Not caching the answer to '{query}': sources changed while it was generated.")
+                return False
+            key = (scope, normalize_query(query))
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def invalidate_sources(self, sources: Iterable[str]) -> int:
+        """Drops entries that cited or were restricted to any of `sources`, plus all unrestricted entries."""
+        sources = set(sources)
+        if not sources:
+            return 0
+        with self._lock:
+            dropped = self._log_invalidation(sources)
+        if dropped:
+            logging.info(f"Invalidated {dropped} cached answers for {', '.join(sorted(sources))}.")
+        return dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._log_invalidation(None)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "shared_invalidation": self._sync is not None,
+            }
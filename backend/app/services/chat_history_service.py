@@ -0,0 +1,266 @@
+import dataclasses
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, messages_from_dict, messages_to_dict
+from ..config.config import Config
+from ..core.dtos import ChatSession
+from ..core.models.chat_history import ChatHistoryModel
+from ..utils.context_packing import estimate_tokens
+from .history_summary_service import HistorySummaryService
+from .llm_service import LLMService
+
+CHAT_HISTORY_STORES = ("memory", "mongo")
+DEFAULT_SESSION = "default"
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+
+class ChatHistoryService:
+    """
+    Chat history per session, keeping the last `max_turns` question/answer
+    pairs of each one. Sessions not updated for `ttl` seconds are
+    forgotten.
+
+    The memory store lives in the process and also caps the number of
+    sessions, evicting the least recently updated. The mongo store keeps
+    histories in MongoDB, so every worker sees the same conversation.
+
+    With summarization on, once a session has twice `verbatim_turns` turns
+    outside its summary, a background thread folds all but the last
+    `verbatim_turns` into a running summary after the answer has been
+    returned, so there is one LLM call per `verbatim_turns` turns. `get` then
+    yields the summary as a system message followed by the recent turns, so
+    the history sent to the LLM stays roughly the same size however long the
+    conversation runs. Summarization only runs when the query rewriter's
+    window is wider than `verbatim_turns`; otherwise nothing reads the summary.
+    """
+
+    _instance = None
+
+    def __new__(cls, store: Optional[str] = None, max_turns: Optional[int] = None, ttl: Optional[int] = None,
+                max_sessions: Optional[int] = None, summarize: Optional[bool] = None, llm=None,
+                verbatim_turns: Optional[int] = None):
+        if cls._instance is None:
+            instance = super(ChatHistoryService, cls).__new__(cls)
+            instance.store = store or Config.CHAT_HISTORY_STORE
+            if instance.store not in CHAT_HISTORY_STORES:
+                raise ValueError(f"Unknown chat history store: {instance.store}")
+            instance.max_turns = max_turns or Config.CHAT_HISTORY_TURNS
+            instance.ttl = ttl or Config.CHAT_HISTORY_TTL
+            instance.max_sessions = max_sessions or Config.CHAT_HISTORY_MAX_SESSIONS
+            instance.model = ChatHistoryModel(instance.ttl) if instance.store == "mongo" else None
+            instance._sessions = OrderedDict()  # session id -> ChatSession, least recently updated first
+            instance._lock = threading.Lock()
+
+            instance.verbatim_turns = verbatim_turns or Config.HISTORY_VERBATIM_TURNS
+            summarize = Config.HISTORY_SUMMARY_ENABLED if summarize is None else summarize
+            if summarize and Config.QUERY_REWRITE_HISTORY_TURNS <= instance.verbatim_turns:
+                # The query rewriter reads only its last QUERY_REWRITE_HISTORY_TURNS turns, all of
+                # them verbatim, so a summary would only add tokens to its prompt.
+                logging.info("History compaction is off: QUERY_REWRITE_HISTORY_TURNS does not exceed "
+                             "HISTORY_VERBATIM_TURNS.")
+                summarize = False
+            if summarize:
+                instance.summarizer = HistorySummaryService(llm or LLMService(Config.OLLAMA_MODEL).llm)
+                instance._summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary")
+            else:
+                instance.summarizer = None
+                instance._summary_executor = None
+            instance._summarizing = set()
+            instance._compaction_stats = {
+                "compactions": 0, "turns_folded": 0, "tokens_folded": 0, "failures": 0,
+                "summary_ms": 0.0, "summarized_reads": 0, "tokens_saved": 0,
+            }
+            cls._instance = instance
+        return cls._instance
+
+    @property
+    def max_messages(self) -> int:
+        return self.max_turns * 2
+
+    def _expire(self, now: float) -> None:
+        # Sessions are kept in least-recently-updated order, so expired ones are at the front.
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.updated_at <= self.ttl and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+
+    def _load(self, session_id: str) -> Optional[ChatSession]:
+        """A snapshot of the stored session, or None if there is none."""
+        if self.model is not None:
+            document = self.model.get_session(session_id)
+            if document is None:
+                return None
+            messages = messages_from_dict(document.get("messages", []))
+            return ChatSession(
+                messages=messages,
+                # Sessions written before turns were counted hold at least their messages' turns.
+                turns=max(document.get("turns", 0), len(messages) // 2),
+                summary=document.get("summary", ""),
+                summary_turns=document.get("summary_turns", 0),
+                folded_tokens=document.get("folded_tokens", 0),
+                generation=document.get("generation"),
+            )
+
+        with self._lock:
+            self._expire(time.time())
+            session = self._sessions.get(session_id)
+            return dataclasses.replace(session, messages=list(session.messages)) if session else None
+
+    def get(self, session_id: str) -> List:
+        """
+        The session's history for a prompt, oldest first: the running summary,
+        if any, then the turns it does not cover. Empty for an unknown or
+        expired session.
+        """
+        try:
+            session = self._load(session_id)
+        except Exception as e:
+            logging.error(f"Error reading chat history for session {session_id}: {e}")
+            return []
+        if session is None:
+            return []
+
+        recent_turns = min(len(session.messages) // 2, max(session.turns - session.summary_turns, 0))
+        messages = session.messages[len(session.messages) - recent_turns * 2:] if recent_turns else []
+        if session.summary:
+            messages = [SystemMessage(content=SUMMARY_PREFIX + session.summary)] + messages
+            # Compared with the history this read would have produced without a summary.
+            saved = self._prompt_tokens(session.messages) - self._prompt_tokens(messages)
+            with self._lock:
+                self._compaction_stats["summarized_reads"] += 1
+                self._compaction_stats["tokens_saved"] += max(saved, 0)
+        return messages
+
+    def _prompt_tokens(self, messages: List) -> int:
+        """
+        Estimated tokens of `messages` that reach a prompt. The query rewriter is
+        the only consumer: it keeps a leading summary and the last
+        QUERY_REWRITE_HISTORY_TURNS turns, at most the `max_turns` stored.
+        """
+        recent = messages[-min(Config.QUERY_REWRITE_HISTORY_TURNS, self.max_turns) * 2:]
+        if len(messages) > len(recent) and messages[0].type == "system":
+            recent = [messages[0]] + recent
+        return sum(estimate_tokens(message.content) for message in recent)
+
+    def append(self, session_id: str, human_message: str, ai_message: str) -> None:
+        messages = [HumanMessage(content=human_message), AIMessage(content=ai_message)]
+        if self.model is not None:
+            try:
+                counters = self.model.append_messages(session_id, messages_to_dict(messages), self.max_messages)
+            except Exception as e:
+                logging.error(f"Error saving chat history for session {session_id}: {e}")
+                return
+            self._schedule_compaction(session_id, counters["turns"], counters.get("summary_turns", 0))
+            return
+
+        now = time.time()
+        with self._lock:
+            session = self._sessions.pop(session_id, None) or ChatSession(messages=[])
+            session.messages = (session.messages + messages)[-self.max_messages:]
+            session.turns += 1
+            session.updated_at = now
+            self._sessions[session_id] = session
+            self._expire(now)
+            turns, summary_turns = session.turns, session.summary_turns
+        self._schedule_compaction(session_id, turns, summary_turns)
+
+    def _schedule_compaction(self, session_id: str, turns: int, summary_turns: int) -> None:
+        # Capped at the stored window, so turns are summarized before they are trimmed away.
+        batch_turns = max(min(2 * self.verbatim_turns, self.max_turns), 1)
+        if self.summarizer is None or turns - summary_turns < batch_turns:
+            return
+        with self._lock:
+            if session_id in self._summarizing:
+                return
+            self._summarizing.add(session_id)
+        self._summary_executor.submit(self._compact, session_id)
+
+    def _compact(self, session_id: str) -> None:
+        """Folds every turn but the last `verbatim_turns` into the session's summary."""
+        try:
+            session = self._load(session_id)
+            if session is None:
+                return
+            # Turn numbers start at 1; `messages` holds turns first_kept..turns.
+            first_kept = session.turns - len(session.messages) // 2 + 1
+            first = max(session.summary_turns + 1, first_kept)
+            last = session.turns - self.verbatim_turns
+            if last < first:
+                return
+            folded = session.messages[(first - first_kept) * 2:(last - first_kept + 1) * 2]
+
+            started = time.perf_counter()
+            summary = self.summarizer.summarize(session.summary, folded)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            folded_tokens = sum(estimate_tokens(message.content) for message in folded)
+
+            if self._save_summary(session_id, session.generation, session.summary_turns, summary, last,
+                                  folded_tokens):
+                with self._lock:
+                    stats = self._compaction_stats
+                    stats["compactions"] += 1
+                    stats["turns_folded"] += last - first + 1
+                    stats["tokens_folded"] += folded_tokens
+                    stats["summary_ms"] += elapsed_ms
+        except Exception as e:
+            logging.error(f"Error summarizing chat history for session {session_id}: {e}")
+            with self._lock:
+                self._compaction_stats["failures"] += 1
+        finally:
+            with self._lock:
+                self._summarizing.discard(session_id)
+
+    def _save_summary(self, session_id: str, generation: Optional[str], expected_summary_turns: int, summary: str,
+                      summary_turns: int, folded_tokens: int) -> bool:
+        # A summary computed from a stale read (cleared session, another worker) is dropped.
+        if self.model is not None:
+            return self.model.save_summary(session_id, generation, expected_summary_turns, summary, summary_turns,
+                                           folded_tokens)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if (session is None or session.generation != generation
+                    or session.summary_turns != expected_summary_turns or session.turns < summary_turns):
+                return False
+            session.summary = summary
+            session.summary_turns = summary_turns
+            session.folded_tokens += folded_tokens
+            return True
+
+    def clear(self, session_id: str) -> None:
+        if self.model is not None:
+            self.model.delete_session(session_id)
+            return
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def get_stats(self) -> dict:
+        if self.model is not None:
+            sessions = self.model.count_sessions()
+        else:
+            with self._lock:
+                self._expire(time.time())
+                sessions = len(self._sessions)
+        with self._lock:
+            stats = dict(self._compaction_stats)
+        return {
+            "store": self.store,
+            "sessions": sessions,
+            "max_turns": self.max_turns,
+            "ttl": self.ttl,
+            "compaction": {
+                "enabled": self.summarizer is not None,
+                "verbatim_turns": self.verbatim_turns,
+                "compactions": stats["compactions"],
+                "turns_folded": stats["turns_folded"],
+                "tokens_folded": stats["tokens_folded"],
+                "failures": stats["failures"],
+                "avg_summary_ms": stats["summary_ms"] / stats["compactions"] if stats["compactions"] else 0.0,
+                "summarized_reads": stats["summarized_reads"],
+                "tokens_saved": stats["tokens_saved"],
+            },
+        }
@@ -1,25 +1,35 @@
+import asyncio
 import os
 from ..core.interfaces import DocumentServiceInterface
 from ..core.models.document import Document
-from ..utils.file_utils import file_exists, compute_file_hash, clear_directory
+from ..utils.file_utils import file_exists, compute_file_hash, clear_directory, stream_to_temp_file, commit_file
 from ..utils.text_processing import preprocess_text
-from ..core.dtos import DocumentDetail
-from langchain_community.document_loaders import PDFPlumberLoader, CSVLoader, Docx2txtLoader
-from openpyxl import load_workbook
+from ..utils.tabular_loaders import iter_xlsx_documents, iter_csv_documents
+from ..core.dtos import DocumentDetail, SavedUpload
+from ..core.exceptions import DocumentExtractionError
+from typing import Iterable, Iterator
+from langchain_community.document_loaders import Docx2txtLoader
 import logging
 from datetime import datetime
 from pymongo import MongoClient
 from ..config.config import Config  # Assuming you have a Config class
 from ..core.models.document_detail import DocumentDetailModel
 from ..services.uploadthing_service import UploadthingService
+from ..services.hash_index_service import HashIndexService
+from ..services.pdf_extraction_service import PdfExtractionService
+
+TABULAR_TYPES = ("csv", "xlsx")
 
 class DocumentService(DocumentServiceInterface):
-    def __init__(self, document_dirs):
+    def __init__(self, document_dirs, pdf_engine=None):
         self.document_dirs = document_dirs
+        self.pdf_engine = pdf_engine or Config.PDF_ENGINE
         for file_type, directory in self.document_dirs.items():
             os.makedirs(directory, exist_ok=True)
         self.document_detail_model = DocumentDetailModel() # Instantiate the MongoDB model
         self.uploadthing_service = UploadthingService() # Instantiate Uploadthing service
+        self.hash_index = HashIndexService()
+        self.pdf_extraction_service = PdfExtractionService()
 
     def list_documents(self, file_type: str) -> list[str]:
         directory = self.document_dirs.get(file_type)
@@ -66,21 +76,26 @@ class DocumentService(DocumentServiceInterface):
     def get_document_dir(self, file_type: str) -> str | None:
         return self.document_dirs.get(file_type)
 
-    def upload_document(self, file) -> dict:
-        file_name = file.filename
+    def _get_file_type(self, file_name: str) -> str:
         file_extension = os.path.splitext(file_name)[1].lower()
-        file_type = ""
-
         if file_extension == ".pdf":
-            file_type = "pdf"
+            return "pdf"
         elif file_extension == ".docx":
-            file_type = "docx"
+            return "docx"
         elif file_extension == ".csv":
-            file_type = "csv"
+            return "csv"
         elif file_extension == ".xlsx":
-            file_type = "xlsx"
-        else:
-            raise ValueError(f"Unsupported file type: {file_extension}")
+            return "xlsx"
+        raise ValueError(f"Unsupported file type: {file_extension}")
+
+    def save_upload(self, file) -> SavedUpload:
+        """
+        Streams an uploaded file to disk in a single read, hashing and sizing it
+        on the way, and commits it with an atomic rename once it is known not to
+        be a duplicate.
+        """
+        file_name = file.filename
+        file_type = self._get_file_type(file_name)
 
         save_dir = self.document_dirs[file_type]
         save_file = os.path.join(save_dir, file_name)
@@ -90,83 +105,227 @@ class DocumentService(DocumentServiceInterface):
             raise ValueError("File already exists.")
 
         try:
-            file_hash = compute_file_hash(file)
+            temp_path, file_hash, size = stream_to_temp_file(file.stream, save_dir)
+        except Exception as e:
+            raise Exception(f"Error saving file: {e}") from e
+
+        # Claimed before the file is committed, so a concurrent upload of the same content is rejected.
+        if self.hash_index.claim(file_type, file_hash, file_name):
+            os.remove(temp_path)
+            raise ValueError("File with identical content already exists.")
+
+        try:
+            commit_file(temp_path, save_file)
+        except Exception as e:
+            os.remove(temp_path)
+            self.hash_index.remove(file_type, file_name)
+            raise Exception(f"Error saving file: {e}") from e
+
+        return SavedUpload(filename=file_name, type=file_type, path=save_file, file_hash=file_hash, size=size)
+
+    def save_staged_file(self, staged_path: str, file_name: str, file_hash: str, size: int) -> SavedUpload:
+        """Commits a fully received and verified resumable upload into the document directory."""
+        file_type = self._get_file_type(file_name)
+        save_file = os.path.join(self.document_dirs[file_type], file_name)
+
+        if file_exists(save_file):
+            raise ValueError("File already exists.")
+        if self.hash_index.claim(file_type, file_hash, file_name):
+            raise ValueError("File with identical content already exists.")
+
+        try:
+            commit_file(staged_path, save_file)
         except Exception as e:
-            raise Exception(f"Error computing file hash: {e}") from e
+            self.hash_index.remove(file_type, file_name)
+            raise Exception(f"Error saving file: {e}") from e
 
-        existing_files = self.list_documents(file_type)
-        for existing_file in existing_files:
-            existing_file_path = os.path.join(save_dir, existing_file)
-            try:
-                if compute_file_hash(open(existing_file_path, 'rb')) == file_hash:
-                    raise ValueError("File with identical content already exists.")
-            except Exception as e:
-                raise Exception(f"Error checking existing files: {e}") from e
+        return SavedUpload(filename=file_name, type=file_type, path=save_file, file_hash=file_hash, size=size)
+
+    def save_replacement(self, file) -> SavedUpload:
+        """
+        Streams a revised version of a document over the stored file with the
+        same name. Content that already exists under a different name is rejected.
+        """
+        file_name = file.filename
+        file_type = self._get_file_type(file_name)
+
+        save_dir = self.document_dirs[file_type]
+        save_file = os.path.join(save_dir, file_name)
 
         try:
-            file.save(save_file)
+            temp_path, file_hash, size = stream_to_temp_file(file.stream, save_dir)
         except Exception as e:
             raise Exception(f"Error saving file: {e}") from e
 
+        if self.hash_index.claim(file_type, file_hash, file_name):
+            os.remove(temp_path)
+            raise ValueError("File with identical content already exists.")
+
+        try:
+            commit_file(temp_path, save_file)
+        except Exception as e:
+            os.remove(temp_path)
+            # The stored file is unchanged, but the claim dropped its old hash.
+            self._rehash_document(file_type, file_name)
+            raise Exception(f"Error saving file: {e}") from e
+
+        return SavedUpload(filename=file_name, type=file_type, path=save_file, file_hash=file_hash, size=size)
+
+    def load_documents(self, saved: SavedUpload, stats: dict | None = None) -> tuple[list[Document], bool]:
+        """
+        Parses a saved file into documents. Returns (documents, is_structured).
+        Loader throughput figures, where available, are written into `stats`.
+        """
+        stats = {} if stats is None else stats
+        file_name = saved.filename
+        file_type = saved.type
+        save_file = saved.path
         docs = []
         is_structured = True
 
         try:
             if file_type == "pdf":
-                loader = PDFPlumberLoader(save_file)
-                loaded_docs = loader.load_and_split()
-                docs = [Document(page_content=preprocess_text(doc.page_content), metadata={"source": file_name}) for doc in loaded_docs]
+                pages = self.pdf_extraction_service.extract_pages(save_file, self.pdf_engine)
+                docs = [
+                    Document(page_content=preprocess_text(text), metadata={"source": file_name, "page": page_number})
+                    for page_number, text in pages if text.strip()
+                ]
             elif file_type == "docx":
                 text = Docx2txtLoader(save_file).load()[0].page_content
                 docs = [Document(page_content=preprocess_text(text), metadata={"source": file_name})]
-            elif file_type == "csv":
-                loader = CSVLoader(save_file, encoding="utf-8")
-                loaded_docs = loader.load()
-                docs = [Document(page_content=preprocess_text(doc.page_content), metadata={"source": file_name}) for doc in loaded_docs]
-            elif file_type == "xlsx":
-                workbook = load_workbook(save_file)
-                text = ""
-                for sheet_name in workbook.sheetnames:
-                    sheet = workbook[sheet_name]
-                    for row in sheet.iter_rows():
-                        row_values = [cell.value for cell in row if cell.value is not None]
-                        text += " ".join(map(str, row_values)) + "\n"
-                docs = [Document(page_content=preprocess_text(text), metadata={"source": file_name})]
+            elif file_type in TABULAR_TYPES:
+                docs = list(self._iter_tabular(saved, stats))
             else:
                 is_structured = False
+        except DocumentExtractionError:
+            # Timeouts and memory limits fail the upload instead of indexing a placeholder.
+            raise
         except Exception as e:
             logging.warning(f"Error loading content from {file_type} file: {e}")
             is_structured = False
             docs = [Document(page_content="Error loading document content.", metadata={"source": file_name})]
 
-        # --- Integration with Uploadthing and MongoDB ---
-        uploadthing = None
+        return docs, is_structured
+
+    def iter_documents(self, saved: SavedUpload, stats: dict | None = None) -> tuple[Iterable[Document], bool]:
+        """
+        Like load_documents, but CSV and XLSX files come back as an iterator
+        that reads the file as it is consumed, so a large sheet is never held
+        in memory at once. Errors reading those files surface while iterating.
+        """
+        if saved.type in TABULAR_TYPES:
+            return self._iter_tabular(saved, {} if stats is None else stats), True
+        return self.load_documents(saved, stats)
+
+    def _iter_tabular(self, saved: SavedUpload, stats: dict) -> Iterator[Document]:
+        if saved.type == "xlsx":
+            yield from iter_xlsx_documents(saved.path, saved.filename, Config.CHUNK_SIZE, Config.XLSX_ROWS_PER_DOCUMENT)
+            return
+        chunk_count = 0
+        for doc in iter_csv_documents(saved.path, saved.filename, Config.CHUNK_SIZE, stats=stats):
+            chunk_count += 1
+            yield doc
+        logging.info(f"Ingested {stats.get('rows')} CSV rows from {saved.filename} into {chunk_count} chunks "
+                     f"({stats.get('rows_per_second')} rows/s).")
+
+    def upload_to_remote(self, saved: SavedUpload) -> dict:
+        """Uploads the saved file to Uploadthing and returns its MongoDB detail fields."""
+        return self._remote_detail(saved, self.uploadthing_service.upload(saved.path, saved.size))
+
+    async def aupload_to_remote(self, saved: SavedUpload) -> dict:
+        """Async counterpart of upload_to_remote using the non-blocking Uploadthing client."""
+        return self._remote_detail(saved, await self.uploadthing_service.aupload(saved.path, saved.size))
+
+    def _remote_detail(self, saved: SavedUpload, uploadthing: dict) -> dict:
+        return {
+            "name": saved.filename,
+            "size": saved.size,
+            "upload_date": datetime.now(),
+            "file_type": saved.type,
+            "url": uploadthing['url'],
+            "key": uploadthing['key'],
+        }
+
+    def publish_document(self, saved: SavedUpload) -> str | None:
+        """
+        Uploads the saved file to Uploadthing and records its details in MongoDB.
+        The document is already indexed, so a failure is logged and returned as
+        an error message rather than raised; None means it was published.
+        """
         try:
-            uploadthing = self.uploadthing_service.upload(file, os.path.getsize(save_file))
-            key_value = uploadthing['key']
-            # print("uploadthing", uploadthing)
-            logging.info(type(key_value))
+            detail = self.upload_to_remote(saved)
             # Save document details to MongoDB
-            upload_date = datetime.now()
-            self.document_detail_model.insert_document_detail(
-                name=file_name,
-                size=os.path.getsize(save_file),
-                upload_date=upload_date,
-                file_type=file_type,
-                url=uploadthing['url'],
-                key=uploadthing['key']
-            )
-            logging.info(f"Document details saved to MongoDB for: {file_name} with URL: {uploadthing}")
+            self.document_detail_model.insert_document_detail(**detail)
+            logging.info(f"Document details saved to MongoDB for: {saved.filename} with URL: {detail['url']}")
+            return None
+
+        except Exception as e:
+            logging.error(f"Error during Uploadthing upload or saving to MongoDB: {e}")
+            return f"Publishing failed: {e}"
+
+    def republish_document(self, saved: SavedUpload) -> str | None:
+        """Uploads a replaced file to Uploadthing and updates its MongoDB details in place. Returns as publish_document."""
+        try:
+            detail = self.upload_to_remote(saved)
+            self.document_detail_model.replace_document_detail(**detail)
+            logging.info(f"Document details updated in MongoDB for: {saved.filename} with URL: {detail['url']}")
+            return None
+        except Exception as e:
+            logging.error(f"Error during Uploadthing upload or saving to MongoDB: {e}")
+            return f"Publishing failed: {e}"
+
+    async def apublish_document(self, saved: SavedUpload) -> str | None:
+        """
+        Async counterpart of publish_document. The upload goes through the
+        non-blocking client; the MongoDB write runs on a worker thread.
+        """
+        try:
+            detail = await self.aupload_to_remote(saved)
+            await asyncio.to_thread(self.document_detail_model.insert_document_detail, **detail)
+            logging.info(f"Document details saved to MongoDB for: {saved.filename} with URL: {detail['url']}")
+            return None
+        except Exception as e:
+            logging.error(f"Error during Uploadthing upload or saving to MongoDB: {e}")
+            return f"Publishing failed: {e}"
 
+    async def arepublish_document(self, saved: SavedUpload) -> str | None:
+        """Async counterpart of republish_document."""
+        try:
+            detail = await self.aupload_to_remote(saved)
+            await asyncio.to_thread(self.document_detail_model.replace_document_detail, **detail)
+            logging.info(f"Document details updated in MongoDB for: {saved.filename} with URL: {detail['url']}")
+            return None
         except Exception as e:
             logging.error(f"Error during Uploadthing upload or saving to MongoDB: {e}")
+            return f"Publishing failed: {e}"
+
+    def discard_upload(self, saved: SavedUpload) -> None:
+        """Removes a saved file that failed to ingest, so the same file can be uploaded again."""
+        if os.path.exists(saved.path):
+            os.remove(saved.path)
+        self.hash_index.remove(saved.type, saved.filename)
+
+    def upload_document(self, file) -> dict:
+        saved = self.save_upload(file)
+        ingest_stats = {}
+        try:
+            docs, is_structured = self.load_documents(saved, ingest_stats)
+        except Exception:
+            self.discard_upload(saved)
+            raise
+
+        # --- Integration with Uploadthing and MongoDB ---
+        publish_error = self.publish_document(saved)
 
         return {
-            "filename": file_name,
+            "filename": saved.filename,
             "doc_len": len(docs),
             "chunks": docs,
             "is_structured": is_structured,
-            "file_type": file_type,
+            "file_type": saved.type,
+            "ingest_stats": ingest_stats,
+            "published": publish_error is None,
+            "publish_error": publish_error,
         }
 
     def delete_document(self, file_id: str, file_name: str, file_type: str) -> None:
@@ -176,6 +335,7 @@ class DocumentService(DocumentServiceInterface):
             file_path = os.path.join(directory, file_name)
             if os.path.exists(file_path):
                 os.remove(file_path)
+                self.hash_index.remove(file_type, file_name)
                 logging.info(f"Successfully deleted file: {file_path}")
             else:
                 logging.warning(f"File not found: {file_path}")
@@ -188,11 +348,34 @@ class DocumentService(DocumentServiceInterface):
         directory = self.document_dirs.get(file_type)
         if directory:
             clear_directory(directory)
+            self.hash_index.clear(file_type)
             self.document_detail_model.clear_db()
         else:
             logging.warning(f"Invalid file type: {file_type}")
             raise ValueError(f"Invalid file type: {file_type}")
 
+    def _rehash_document(self, file_type: str, file_name: str) -> None:
+        """Re-indexes one stored file's content hash, or drops its entry if the file is gone."""
+        file_path = os.path.join(self.document_dirs[file_type], file_name)
+        if not os.path.exists(file_path):
+            self.hash_index.remove(file_type, file_name)
+            return
+        with open(file_path, 'rb') as f:
+            self.hash_index.add(file_type, compute_file_hash(f), file_name)
+
+    def rebuild_hash_index(self) -> dict[str, int]:
+        """Re-hashes every stored file and rewrites the duplicate-detection index."""
+        counts = {}
+        for file_type, directory in self.document_dirs.items():
+            entries = {}
+            for file_name in self.list_documents(file_type):
+                with open(os.path.join(directory, file_name), 'rb') as f:
+                    entries[compute_file_hash(f)] = file_name
+            self.hash_index.replace(file_type, entries)
+            counts[file_type] = len(entries)
+            logging.info(f"Indexed {len(entries)} {file_type} files for duplicate detection.")
+        return counts
+
     # --- Hypothetical function for Uploadthing integration ---
     def upload_to_uploadthing(self, file):
         """
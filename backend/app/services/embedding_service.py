@@ -0,0 +1,235 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
+from ..config.config import Config
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding store backed by SQLite.
+
+    Vectors are keyed by (model name, sha256 of the text). When the stored
+    vectors exceed `max_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = path or Config.EMBEDDING_CACHE_PATH
+        self.max_bytes = max_bytes or Config.EMBEDDING_CACHE_MAX_MB * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._size_bytes = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, text_hashes: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        unique_hashes = list(dict.fromkeys(text_hashes))
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(unique_hashes), 500):
+                batch = unique_hashes[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for text_hash, vector in rows:
+                    found[text_hash] = array("f", vector).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, text_hash) for text_hash in found],
+                )
+                self._conn.commit()
+            hits = sum(1 for text_hash in text_hashes if text_hash in found)
+            self.hits += hits
+            self.misses += len(text_hashes) - hits
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        if not vectors:
+            return
+        now = time.time()
+        rows = [(model, text_hash, array("f", vector).tobytes(), now) for text_hash, vector in vectors.items()]
+        with self._lock:
+            # Rows being replaced already count towards the size; only the difference is added.
+            replaced_bytes = self._stored_bytes(model, list(vectors))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)", rows
+            )
+            self._size_bytes += sum(len(row[2]) for row in rows) - replaced_bytes
+            if self._size_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _stored_bytes(self, model: str, text_hashes: List[str]) -> int:
+        total = 0
+        for start in range(0, len(text_hashes), 500):
+            batch = text_hashes[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            total += self._conn.execute(
+                f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                [model, *batch],
+            ).fetchone()[0]
+        return total
+
+    def _evict(self) -> None:
+        """Drops least recently used entries until the cache is at 90% of its budget."""
+        target = int(self.max_bytes * 0.9)
+        cursor = self._conn.execute("SELECT model, text_hash, LENGTH(vector) FROM embeddings ORDER BY last_used")
+        doomed = []
+        size = self._size_bytes
+        for model, text_hash, length in cursor:
+            if size <= target:
+                break
+            doomed.append((model, text_hash))
+            size -= length
+        self._conn.executemany("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", doomed)
+        self.evictions += len(doomed)
+        self._size_bytes = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+        logging.info(f"Evicted {len(doomed)} entries from the embedding cache.")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class EmbeddingEngine(Embeddings):
+    """
+    FastEmbed with separate ingestion and query paths.
+
+    Ingestion uses large batches, a configurable ONNX thread count and optional
+    data-parallel worker processes; concurrent ingest calls are serialized so
+    they don't oversubscribe the CPU. Queries use their own small model session,
+    so an interactive query never waits behind a large ingest batch.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, batch_size: Optional[int] = None,
+                 threads: Optional[int] = None, parallel: Optional[int] = None,
+                 query_threads: Optional[int] = None):
+        ingest_kwargs = {
+            "batch_size": batch_size or Config.EMBED_BATCH_SIZE,
+            "threads": threads or Config.EMBED_THREADS,
+            "parallel": parallel if parallel is not None else Config.EMBED_PARALLEL,
+        }
+        if model_name:
+            ingest_kwargs["model_name"] = model_name
+        self.ingest_model = FastEmbedEmbeddings(**ingest_kwargs)
+        self.model_name = self.ingest_model.model_name
+        self.query_model = FastEmbedEmbeddings(
+            model_name=self.model_name,
+            batch_size=1,
+            threads=query_threads or Config.QUERY_EMBED_THREADS,
+        )
+        self._ingest_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.chunks_embedded = 0
+        self.ingest_seconds = 0.0
+        self.last_batch_chunks_per_second = 0.0
+        self.queries_embedded = 0
+        self.query_seconds = 0.0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        with self._ingest_lock:
+            started = time.perf_counter()
+            vectors = self.ingest_model.embed_documents(texts)
+            elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self.chunks_embedded += len(texts)
+            self.ingest_seconds += elapsed
+            self.last_batch_chunks_per_second = len(texts) / elapsed if elapsed else 0.0
+        logging.info(f"Embedded {len(texts)} chunks in {elapsed:.2f}s "
+                     f"({self.last_batch_chunks_per_second:.1f} chunks/s).")
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        started = time.perf_counter()
+        vector = self.query_model.embed_query(text)
+        with self._stats_lock:
+            self.queries_embedded += 1
+            self.query_seconds += time.perf_counter() - started
+        return vector
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "model": self.model_name,
+                "chunks_embedded": self.chunks_embedded,
+                "ingest_seconds": round(self.ingest_seconds, 3),
+                "chunks_per_second": self.chunks_embedded / self.ingest_seconds if self.ingest_seconds else 0.0,
+                "last_batch_chunks_per_second": self.last_batch_chunks_per_second,
+                "queries_embedded": self.queries_embedded,
+                "avg_query_ms": self.query_seconds / self.queries_embedded * 1000 if self.queries_embedded else 0.0,
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps an embedding model so both document and query embeddings consult the cache first."""
+
+    def __init__(self, embeddings: Embeddings, model_name: str, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        text_hashes = [self.cache.text_hash(text) for text in texts]
+        cached = self.cache.get_many(self.model_name, text_hashes)
+
+        missing = {}
+        for text_hash, text in zip(text_hashes, texts):
+            if text_hash not in cached:
+                missing.setdefault(text_hash, text)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model_name, computed)
+            cached.update(computed)
+        return [cached[text_hash] for text_hash in text_hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        # Query embeddings can differ from document embeddings, so they get their own key space.
+        model = f"{self.model_name}:query"
+        text_hash = self.cache.text_hash(text)
+        cached = self.cache.get_many(model, [text_hash])
+        if text_hash in cached:
+            return cached[text_hash]
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many(model, {text_hash: vector})
+        return vector
+
+    def get_stats(self) -> dict:
+        return self.cache.get_stats()
@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+from ..config.config import Config
+
+
+class HashIndexService:
+    """
+    Persistent content-hash index used for duplicate detection on upload.
+
+    The index maps ``(file_type, content_hash) -> file_name`` in a SQLite table
+    next to the document directories, so a duplicate check is a keyed lookup
+    instead of re-hashing every stored file. Every worker process writes the
+    same table, and `claim` checks and records a hash in one transaction, so
+    two workers cannot both accept the same content.
+    """
+    _instance = None
+
+    def __new__(cls, path: Optional[str] = None):
+        if cls._instance is None:
+            instance = super(HashIndexService, cls).__new__(cls)
+            instance.path = path or Config.HASH_INDEX_PATH
+            instance._lock = threading.Lock()
+            os.makedirs(os.path.dirname(instance.path) or ".", exist_ok=True)
+            # Autocommit, so each write opens its own BEGIN IMMEDIATE transaction.
+            instance._conn = sqlite3.connect(instance.path, check_same_thread=False, isolation_level=None)
+            instance._conn.execute("PRAGMA journal_mode=WAL")
+            instance._conn.execute("PRAGMA busy_timeout=5000")
+            instance._conn.execute(
+                "CREATE TABLE IF NOT EXISTS hashes (file_type TEXT NOT NULL, file_hash TEXT NOT NULL, "
+                "file_name TEXT NOT NULL, PRIMARY KEY (file_type, file_hash), UNIQUE (file_type, file_name))"
+            )
+            cls._instance = instance
+        return cls._instance
+
+    def _write(self, statements: list) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params in statements:
+                    self._conn.execute(sql, params)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def find(self, file_type: str, file_hash: str) -> Optional[str]:
+        """Returns the name of the stored file with this content hash, if any."""
+        with self._lock:
+            row = self._conn.execute("SELECT file_name FROM hashes WHERE file_type = ? AND file_hash = ?",
+                                     (file_type, file_hash)).fetchone()
+        return row[0] if row else None
+
+    def claim(self, file_type: str, file_hash: str, file_name: str) -> Optional[str]:
+        """
+        Records `file_name` as the holder of `file_hash` unless another file
+        already holds it. Returns the existing holder's name, or None once the
+        hash is claimed (or already belongs to `file_name`). Any older hash of
+        `file_name` is dropped.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT file_name FROM hashes WHERE file_type = ? AND file_hash = ?",
+                                         (file_type, file_hash)).fetchone()
+                if row is None:
+                    self._conn.execute("DELETE FROM hashes WHERE file_type = ? AND file_name = ?",
+                                       (file_type, file_name))
+                    self._conn.execute("INSERT INTO hashes (file_type, file_hash, file_name) VALUES (?, ?, ?)",
+                                       (file_type, file_hash, file_name))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row[0] if row and row[0] != file_name else None
+
+    def add(self, file_type: str, file_hash: str, file_name: str) -> None:
+        self._write([
+            ("DELETE FROM hashes WHERE file_type = ? AND (file_name = ? OR file_hash = ?)",
+             (file_type, file_name, file_hash)),
+            ("INSERT INTO hashes (file_type, file_hash, file_name) VALUES (?, ?, ?)", (file_type, file_hash, file_name)),
+        ])
+
+    def remove(self, file_type: str, file_name: str) -> None:
+        self._write([("DELETE FROM hashes WHERE file_type = ? AND file_name = ?", (file_type, file_name))])
+
+    def clear(self, file_type: str) -> None:
+        self._write([("DELETE FROM hashes WHERE file_type = ?", (file_type,))])
+
+    def replace(self, file_type: str, entries: Dict[str, str]) -> None:
+        """Replaces every entry for a file type, used by the backfill command."""
+        self._write([("DELETE FROM hashes WHERE file_type = ?", (file_type,))] + [
+            ("INSERT INTO hashes (file_type, file_hash, file_name) VALUES (?, ?, ?)", (file_type, file_hash, file_name))
+            for file_hash, file_name in entries.items()
+        ])
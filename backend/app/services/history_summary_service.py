@@ -0,0 +1,40 @@
+import logging
+import time
+from typing import List, Optional
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from ..config.config import Config
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "You keep a running summary of a conversation between a user and an assistant about the user's documents. "
+            "Keep the names, figures, documents and open questions the user may refer back to. "
+            "Reply with the updated summary only, in at most {max_words} words.",
+        ),
+        ("human", "Current summary:\n{summary}\n\nNew conversation turns:\n{turns}\n\nUpdated summary:"),
+    ]
+)
+
+
+class HistorySummaryService:
+    """Folds chat turns into a running conversation summary with the LLM."""
+
+    def __init__(self, llm, max_words: Optional[int] = None):
+        self.max_words = max_words or Config.HISTORY_SUMMARY_MAX_WORDS
+        self.chain = SUMMARY_PROMPT | llm | StrOutputParser()
+
+    def summarize(self, summary: str, messages: List) -> str:
+        turns = "\n".join(
+            f"{'User' if message.type == 'human' else 'Assistant'}: {message.content}" for message in messages
+        )
+        started = time.perf_counter()
+        updated = self.chain.invoke({
+            "summary": summary or "(none yet)",
+            "turns": turns,
+            "max_words": self.max_words,
+        }).strip()
+        logging.info(f"Folded {len(messages) // 2} chat turns into the summary in "
+                     f"{(time.perf_counter() - started) * 1000:.0f} ms.")
+        return updated or summary
@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+_search_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-search")
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], rrf_k: int = 60) -> List[tuple[str, float]]:
+    """Fuses ranked id lists: each id scores sum(1 / (rrf_k + rank)) over the lists it appears in."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Runs dense vector search and BM25 lexical search in parallel and fuses the
+    two rankings with reciprocal rank fusion. Vector hits below
+    `score_threshold` are dropped before fusion, matching the dense-only mode,
+    while lexical hits need no threshold, so exact identifiers still surface.
+    """
+
+    vector_store: Any
+    lexical_index: Any
+    k: int = 20
+    candidates: int = 50
+    rrf_k: int = 60
+    score_threshold: float = 0.0
+    selected_files: Optional[List[str]] = None
+
+    def _vector_search(self, query: str) -> List[Document]:
+        where = {"source": {"$in": self.selected_files}} if self.selected_files else None
+        results = self.vector_store.similarity_search_with_relevance_scores(
+            query, k=self.candidates, filter=where
+        )
+        return [doc for doc, score in results if score >= self.score_threshold]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        vector_future = _search_pool.submit(self._vector_search, query)
+        lexical_future = _search_pool.submit(self.lexical_index.search, query, self.candidates, self.selected_files)
+        vector_docs = vector_future.result()
+        lexical_ids = [chunk_id for chunk_id, _ in lexical_future.result()]
+
+        docs_by_id = {doc.id: doc for doc in vector_docs}
+        fused = reciprocal_rank_fusion([[doc.id for doc in vector_docs], lexical_ids], self.rrf_k)[:self.k]
+
+        missing = [doc_id for doc_id, _ in fused if doc_id not in docs_by_id]
+        if missing:
+            stored = self.vector_store.get(ids=missing, include=["documents", "metadatas"])
+            for doc_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"]):
+                docs_by_id[doc_id] = Document(page_content=text, metadata=metadata or {}, id=doc_id)
+        # An id can vanish from the store if a delete lands between the searches and this lookup.
+        return [docs_by_id[doc_id] for doc_id, _ in fused if doc_id in docs_by_id]
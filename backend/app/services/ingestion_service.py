@@ -0,0 +1,276 @@
+import dataclasses
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from datetime import datetime
+from typing import List, Optional
+from ..config.config import Config
+from ..core.dtos import SavedUpload
+from ..core.enums import IngestJobStatus
+from ..core.models.ingest_job import IngestJob, IngestJobModel
+
+LOST_JOB_ERROR = "Ingestion was interrupted before it finished; upload the file again."
+
+
+class IngestionService:
+    """
+    Runs the parse -> embed -> publish pipeline for saved uploads on a local
+    worker pool so that upload requests can return as soon as the file is on disk.
+
+    Job state is written to a SQLite table at every stage, so any worker can
+    report it. While a job is unfinished its worker refreshes a heartbeat every
+    `heartbeat_interval` seconds; a job whose heartbeat is four intervals old
+    lost its worker, and the first worker to notice rolls it back and marks it
+    failed.
+    """
+
+    def __init__(self, document_service, vector_store_service, max_workers: Optional[int] = None,
+                 job_history: Optional[int] = None, store_path: Optional[str] = None,
+                 heartbeat_interval: Optional[float] = None):
+        self.document_service = document_service
+        self.vector_store_service = vector_store_service
+        self.job_history = job_history or Config.INGEST_JOB_HISTORY
+        self.heartbeat_interval = heartbeat_interval or Config.INGEST_JOB_HEARTBEAT
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.INGEST_WORKERS,
+            thread_name_prefix="ingest",
+        )
+        self.model = IngestJobModel(store_path or Config.INGEST_JOB_PATH)
+        self.owner = uuid.uuid4().hex
+        self._closed = threading.Event()
+        threading.Thread(target=self._keep_alive, name="ingest-heartbeat", daemon=True).start()
+
+    def submit(self, saved: SavedUpload) -> IngestJob:
+        job = IngestJob(filename=saved.filename, file_type=saved.type)
+        try:
+            self.model.insert(job, dataclasses.asdict(saved), self.owner)
+            self.model.prune(self.job_history)
+        except Exception:
+            self.document_service.discard_upload(saved)
+            raise
+        self.executor.submit(self._run, job, saved)
+        logging.info(f"Queued ingestion job {job.id} for {saved.filename}")
+        return job
+
+    def ingest_batch(self, saved_uploads: List[SavedUpload]) -> List[dict]:
+        """
+        Ingests many saved files as overlapping pipeline stages and returns one
+        manifest entry per file.
+
+        Parsing runs on a bounded pool with at most BULK_MAX_IN_FLIGHT files
+        parsed but not yet embedded, while this thread embeds whatever has
+        finished parsing, so embedding file N overlaps with parsing file N+1.
+        Vector writes are grouped into batches of about VECTOR_WRITE_BATCH_SIZE
+        documents; CSV and XLSX files are streamed into the vector store on
+        their own instead, so a large sheet is never held in memory. Each file
+        is uploaded to remote storage on its own pool as soon as it is indexed,
+        and the MongoDB details of the indexed files are written with a single
+        insert_many. Files that fail are removed from disk and from the hash
+        index, so they can be uploaded again.
+        """
+        manifest = [{
+            "filename": saved.filename,
+            "file_type": saved.type,
+            "status": "pending",
+            "doc_len": 0,
+            "published": False,
+            "error": None,
+        } for saved in saved_uploads]
+        if not saved_uploads:
+            return manifest
+
+        with ThreadPoolExecutor(max_workers=Config.BULK_PARSE_WORKERS, thread_name_prefix="bulk-parse") as parse_pool, \
+                ThreadPoolExecutor(max_workers=Config.BULK_UPLOAD_WORKERS, thread_name_prefix="bulk-upload") as upload_pool:
+            upload_futures = {}
+
+            queued = iter(enumerate(saved_uploads))
+            in_flight = {}
+            batch = []  # (index, documents, source) waiting for a vector write
+            batch_size = 0
+
+            def fill_parse_queue():
+                while len(in_flight) + len(batch) < Config.BULK_MAX_IN_FLIGHT:
+                    next_item = next(queued, None)
+                    if next_item is None:
+                        return
+                    index, saved = next_item
+                    stats = manifest[index].setdefault("ingest_stats", {})
+                    in_flight[parse_pool.submit(self.document_service.iter_documents, saved, stats)] = index
+
+            def publish(index):
+                manifest[index]["status"] = "success"
+                upload_futures[upload_pool.submit(self.document_service.upload_to_remote, saved_uploads[index])] = index
+
+            def flush_batch():
+                nonlocal batch, batch_size
+                if not batch:
+                    return
+                try:
+                    self.vector_store_service.add_document_batch([(docs, source) for _, docs, source in batch])
+                    for index, _, _ in batch:
+                        publish(index)
+                except Exception as e:
+                    for index, _, _ in batch:
+                        manifest[index].update({"status": "failed", "error": str(e)})
+                        self._discard(saved_uploads[index], embedded=True)
+                batch, batch_size = [], 0
+
+            def add_streamed(index, docs):
+                try:
+                    manifest[index]["doc_len"] = self.vector_store_service.add_documents(
+                        docs, saved_uploads[index].filename
+                    )
+                    publish(index)
+                except Exception as e:
+                    manifest[index].update({"status": "failed", "error": str(e)})
+                    self._discard(saved_uploads[index], embedded=True)
+
+            fill_parse_queue()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    try:
+                        docs, is_structured = future.result()
+                    except Exception as e:
+                        manifest[index].update({"status": "failed", "error": str(e)})
+                        self._discard(saved_uploads[index], embedded=False)
+                        continue
+                    manifest[index]["is_structured"] = is_structured
+                    if isinstance(docs, list):
+                        manifest[index]["doc_len"] = len(docs)
+                        batch.append((index, docs, saved_uploads[index].filename))
+                        batch_size += len(docs)
+                    else:
+                        # Tabular files are streamed straight into the vector store instead of joining a batch.
+                        add_streamed(index, docs)
+                # Keep the parsers busy while this thread embeds.
+                fill_parse_queue()
+                if batch_size >= Config.VECTOR_WRITE_BATCH_SIZE or not in_flight:
+                    flush_batch()
+                    fill_parse_queue()
+            flush_batch()
+
+            details = []
+            published = []
+            for future in as_completed(upload_futures):
+                index = upload_futures[future]
+                try:
+                    details.append(future.result())
+                    published.append(index)
+                except Exception as e:
+                    logging.error(f"Error uploading {saved_uploads[index].filename} to Uploadthing: {e}")
+
+        if details:
+            try:
+                self.document_service.document_detail_model.insert_document_details(details)
+                for index in published:
+                    manifest[index]["published"] = True
+            except Exception as e:
+                logging.error(f"Error saving document details to MongoDB: {e}")
+
+        logging.info(f"Bulk ingestion finished: {sum(1 for e in manifest if e['status'] == 'success')}"
+                     f"/{len(manifest)} files succeeded.")
+        return manifest
+
+    def get_job(self, job_id: str) -> Optional[IngestJob]:
+        return self.model.get(job_id)
+
+    def _save(self, job: IngestJob) -> None:
+        try:
+            self.model.update(job)
+        except Exception as e:
+            logging.error(f"Error saving the state of ingestion job {job.id}: {e}")
+
+    def close(self) -> None:
+        """Stops the heartbeat and waits for queued jobs to finish."""
+        self._closed.set()
+        self.executor.shutdown(wait=True)
+
+    def _keep_alive(self) -> None:
+        self.recover_lost_jobs()
+        while not self._closed.wait(self.heartbeat_interval):
+            try:
+                self.model.heartbeat(self.owner)
+            except Exception as e:
+                logging.error(f"Error refreshing the ingestion job heartbeat: {e}")
+            self.recover_lost_jobs()
+
+    def recover_lost_jobs(self) -> int:
+        """
+        Fails the unfinished jobs whose worker stopped sending heartbeats,
+        dropping their chunks, file and hash index entry. Returns how many were recovered.
+        """
+        try:
+            lost = self.model.claim_lost(self.owner, time.time() - 4 * self.heartbeat_interval)
+        except Exception as e:
+            logging.error(f"Error looking for lost ingestion jobs: {e}")
+            return 0
+        for job, saved in lost:
+            logging.warning(f"Ingestion job {job.id} for {job.filename} lost its worker; rolling it back.")
+            self._discard(SavedUpload(**saved), embedded=True)
+            job.status = IngestJobStatus.FAILED
+            job.error = LOST_JOB_ERROR
+            job.finished_at = datetime.now()
+            self._save(job)
+        return len(lost)
+
+    def _run_stage(self, job: IngestJob, name: str, func, *args):
+        stage = job.get_stage(name)
+        stage.status = IngestJobStatus.RUNNING
+        stage.started_at = datetime.now()
+        self._save(job)
+        try:
+            result = func(*args)
+        except Exception as e:
+            stage.status = IngestJobStatus.FAILED
+            stage.error = str(e)
+            raise
+        finally:
+            stage.finished_at = datetime.now()
+        stage.status = IngestJobStatus.COMPLETED
+        return result
+
+    def _discard(self, saved: SavedUpload, embedded: bool) -> None:
+        """Undoes a failed ingestion: drops any chunks written and the saved file, so it can be uploaded again."""
+        try:
+            if embedded:
+                self.vector_store_service.delete_documents_by_source(saved.filename)
+            self.document_service.discard_upload(saved)
+        except Exception as e:
+            logging.error(f"Error cleaning up failed ingestion of {saved.filename}: {e}")
+
+    def _run(self, job: IngestJob, saved: SavedUpload) -> None:
+        job.status = IngestJobStatus.RUNNING
+        try:
+            ingest_stats = {}
+            # CSV and XLSX files come back as an iterator, so their rows are read while embedding.
+            docs, is_structured = self._run_stage(job, "parse", self.document_service.iter_documents, saved, ingest_stats)
+            doc_len = self._run_stage(job, "embed", self.vector_store_service.add_documents, docs, saved.filename)
+            publish_error = self._run_stage(job, "publish", self.document_service.publish_document, saved)
+            if publish_error:
+                # The document is indexed and searchable, so the job completes with its publish stage failed.
+                publish = job.get_stage("publish")
+                publish.status = IngestJobStatus.FAILED
+                publish.error = publish_error
+            job.result = {
+                "filename": saved.filename,
+                "doc_len": doc_len,
+                "is_structured": is_structured,
+                "file_type": saved.type,
+                "ingest_stats": ingest_stats,
+                "published": publish_error is None,
+                "publish_error": publish_error,
+            }
+            job.status = IngestJobStatus.COMPLETED
+            logging.info(f"Ingestion job {job.id} completed for {saved.filename}")
+        except Exception as e:
+            job.status = IngestJobStatus.FAILED
+            job.error = str(e)
+            logging.error(f"Ingestion job {job.id} failed for {saved.filename}: {e}")
+            self._discard(saved, embedded=job.get_stage("embed").started_at is not None)
+        finally:
+            job.finished_at = datetime.now()
+            self._save(job)
@@ -0,0 +1,161 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import Stemmer
+from ..config.config import Config
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:[-_./:#][^\W_]+)*")
+IDENTIFIER_SEPARATORS = re.compile(r"[-_./:#]")
+
+_stemmers = threading.local()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-cases and splits text into BM25 terms. Plain words are stemmed;
+    anything containing digits is kept verbatim. Compound identifiers such as
+    "INV-2024-0042" or "clause 4.2.1" produce both their parts and the joined
+    form ("inv20240042"), so a query for the whole identifier ranks exact
+    matches first.
+    """
+    # PyStemmer objects are not thread-safe, so each thread gets its own.
+    stemmer = getattr(_stemmers, "stemmer", None)
+    if stemmer is None:
+        stemmer = _stemmers.stemmer = Stemmer.Stemmer("english")
+
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        parts = IDENTIFIER_SEPARATORS.split(match.group())
+        if len(parts) > 1:
+            tokens.append("".join(parts))
+        tokens.extend(parts)
+    return [stemmer.stemWord(token) if token.isalpha() else token for token in tokens]
+
+
+class LexicalIndexService:
+    """
+    Local BM25 index over the chunks in the vector store, kept in a SQLite FTS5
+    table. Chunks are tokenized and stemmed by `tokenize` before they are
+    stored, and queries go through the same function, so FTS5 only has to
+    match whole terms and rank them with its built-in bm25().
+
+    A `source_counts` table keeps the number of chunks per source up to date
+    on every write, so listing sources never scans the chunks.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.LEXICAL_INDEX_PATH
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # chunks.rowid doubles as the FTS rowid, so deletes by id or source never scan the FTS table.
+        self._conn.execute("CREATE TABLE IF NOT EXISTS chunks (chunk_id TEXT PRIMARY KEY, source TEXT NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source)")
+        self._conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(terms)")
+        has_counts = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'source_counts'"
+        ).fetchone()
+        if not has_counts:
+            self._conn.execute("CREATE TABLE source_counts (source TEXT PRIMARY KEY, chunks INTEGER NOT NULL)")
+            # Indexes written before the table existed are counted once here.
+            self._conn.execute("INSERT INTO source_counts SELECT source, COUNT(*) FROM chunks GROUP BY source")
+        self._conn.commit()
+
+    def _adjust_counts(self, deltas: Dict[str, int]) -> None:
+        self._conn.executemany(
+            "INSERT INTO source_counts (source, chunks) VALUES (?, ?) "
+            "ON CONFLICT (source) DO UPDATE SET chunks = chunks + excluded.chunks",
+            [(source, delta) for source, delta in deltas.items() if delta],
+        )
+        self._conn.execute("DELETE FROM source_counts WHERE chunks <= 0")
+
+    def _delete_rows(self, where: str, params: list) -> int:
+        rows = self._conn.execute(f"SELECT rowid, source FROM chunks WHERE {where}", params).fetchall()
+        if rows:
+            self._conn.executemany("DELETE FROM chunks_fts WHERE rowid = ?", [(rowid,) for rowid, _ in rows])
+            self._conn.executemany("DELETE FROM chunks WHERE rowid = ?", [(rowid,) for rowid, _ in rows])
+            removed = Counter(source for _, source in rows)
+            self._adjust_counts({source: -count for source, count in removed.items()})
+        return len(rows)
+
+    def add(self, ids: List[str], chunks: list) -> None:
+        """Indexes chunks under the given vector store ids, replacing any existing entries."""
+        rows = [(chunk_id, chunk.metadata["source"], " ".join(tokenize(chunk.page_content)))
+                for chunk_id, chunk in zip(ids, chunks)]
+        with self._lock:
+            for start in range(0, len(rows), 500):
+                batch = rows[start:start + 500]
+                self._delete_rows(f"chunk_id IN ({','.join('?' * len(batch))})", [row[0] for row in batch])
+                for chunk_id, source, terms in batch:
+                    rowid = self._conn.execute(
+                        "INSERT INTO chunks (chunk_id, source) VALUES (?, ?)", (chunk_id, source)
+                    ).lastrowid
+                    self._conn.execute("INSERT INTO chunks_fts (rowid, terms) VALUES (?, ?)", (rowid, terms))
+                self._adjust_counts(Counter(source for _, source, _ in batch))
+            self._conn.commit()
+
+    def remove_ids(self, ids: Iterable[str]) -> int:
+        ids = list(ids)
+        removed = 0
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                removed += self._delete_rows(f"chunk_id IN ({','.join('?' * len(batch))})", batch)
+            self._conn.commit()
+        return removed
+
+    def remove_sources(self, sources: List[str]) -> int:
+        if not sources:
+            return 0
+        with self._lock:
+            removed = self._delete_rows(f"source IN ({','.join('?' * len(sources))})", list(sources))
+            self._conn.commit()
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("DELETE FROM chunks_fts")
+            self._conn.execute("DELETE FROM source_counts")
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def source_counts(self, limit: Optional[int] = None, offset: int = 0) -> List[Tuple[str, int]]:
+        """Returns (source, chunk count) pairs sorted by source, paged by `limit` and `offset`."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT source, chunks FROM source_counts ORDER BY source LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset),
+            ).fetchall()
+
+    def search(self, query: str, k: int, sources: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+        """Returns up to `k` (chunk id, BM25 score) pairs, best first, optionally limited to `sources`."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        # Terms only contain letters and digits, so quoting them is enough to keep FTS5 syntax out.
+        match = " OR ".join(f'"{term}"' for term in terms)
+        sql = ("SELECT chunks.chunk_id, bm25(chunks_fts) AS score FROM chunks_fts"
+               " JOIN chunks ON chunks.rowid = chunks_fts.rowid WHERE chunks_fts MATCH ?")
+        params = [match]
+        if sources:
+            sql += f" AND chunks.source IN ({','.join('?' * len(sources))})"
+            params.extend(sources)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(k)
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Error searching lexical index: {e}")
+            return []
+        # FTS5 reports bm25 as a negative number where lower is better.
+        return [(chunk_id, -score) for chunk_id, score in rows]
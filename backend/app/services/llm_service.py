@@ -1,3 +1,4 @@
+from typing import AsyncIterator, Iterator
 from langchain_ollama import OllamaLLM
 from ..core.interfaces import LLMServiceInterface
 
@@ -6,4 +7,13 @@ class LLMService(LLMServiceInterface):
         self.llm = OllamaLLM(model=model_name)
 
     def invoke(self, query: str) -> str:
-        return self.llm.invoke(query)
\ No newline at end of file
+        return self.llm.invoke(query)
+
+    def stream(self, query: str) -> Iterator[str]:
+        return self.llm.stream(query)
+
+    async def ainvoke(self, query: str) -> str:
+        return await self.llm.ainvoke(query)
+
+    def astream(self, query: str) -> AsyncIterator[str]:
+        return self.llm.astream(query)
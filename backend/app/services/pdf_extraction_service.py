@@ -0,0 +1,149 @@
+import logging
+import multiprocessing
+import time
+from typing import List, Optional, Tuple
+import pdfplumber
+import pypdfium2 as pdfium
+from ..config.config import Config
+from ..core.exceptions import DocumentExtractionError
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+PDF_ENGINES = ("pdfplumber", "pdfium", "auto")
+
+
+def _limit_worker_memory(max_memory_mb: int) -> None:
+    """Pool initializer: caps the address space of a parser worker."""
+    if resource is None or not max_memory_mb:
+        return
+    limit = max_memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _worker_context():
+    """
+    Parser workers are forked from a forkserver that has only this module
+    loaded, not from the web process, which already runs request, ingest and
+    ONNX threads whose locks a fork would copy. Windows has no forkserver and
+    falls back to spawn.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def _count_pages(path: str) -> int:
+    pdf = pdfium.PdfDocument(path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def extract_with_pdfplumber(path: str, page_numbers: List[int]) -> List[Tuple[int, str]]:
+    """Layout-aware extraction. Returns (1-based page number, text) pairs."""
+    with pdfplumber.open(path, pages=page_numbers) as pdf:
+        return [(page.page_number, page.extract_text() or "") for page in pdf.pages]
+
+
+def extract_with_pdfium(path: str, page_numbers: List[int]) -> List[Tuple[int, str]]:
+    """Fast plain-text extraction. Returns (1-based page number, text) pairs."""
+    pdf = pdfium.PdfDocument(path)
+    try:
+        pages = []
+        for page_number in page_numbers:
+            page = pdf[page_number - 1]
+            textpage = page.get_textpage()
+            pages.append((page_number, textpage.get_text_range()))
+            textpage.close()
+            page.close()
+        return pages
+    finally:
+        pdf.close()
+
+
+def extract_page_range(path: str, start: int, end: int, engine: str = "pdfplumber") -> List[Tuple[int, str]]:
+    """
+    Extracts pages [start, end) with the given engine. In "auto" mode pdfium is
+    tried first and pages where it finds no text are re-extracted with pdfplumber.
+    """
+    page_numbers = list(range(start + 1, end + 1))
+    if engine == "pdfplumber":
+        return extract_with_pdfplumber(path, page_numbers)
+
+    pages = extract_with_pdfium(path, page_numbers)
+    if engine == "auto":
+        empty_pages = [page_number for page_number, text in pages if not text.strip()]
+        if empty_pages:
+            fallback = dict(extract_with_pdfplumber(path, empty_pages))
+            pages = [(page_number, fallback.get(page_number, text)) for page_number, text in pages]
+    return pages
+
+
+class PdfExtractionService:
+    """
+    Extracts PDF text page-range by page-range in parser processes.
+
+    Parsing runs outside the web worker, so a pathological PDF can only exhaust
+    its own worker's memory limit or time out. Each extraction gets its own
+    pool, so a timeout terminates that document's workers and leaves other
+    extractions running.
+    """
+    _instance = None
+
+    def __new__(cls, workers: Optional[int] = None, pages_per_task: Optional[int] = None,
+                task_timeout: Optional[int] = None, max_memory_mb: Optional[int] = None):
+        if cls._instance is None:
+            cls._instance = super(PdfExtractionService, cls).__new__(cls)
+            cls._instance.workers = workers or Config.PDF_WORKERS
+            cls._instance.pages_per_task = pages_per_task or Config.PDF_PAGES_PER_TASK
+            cls._instance.task_timeout = task_timeout or Config.PDF_TASK_TIMEOUT
+            cls._instance.max_memory_mb = Config.PDF_WORKER_MAX_MEMORY_MB if max_memory_mb is None else max_memory_mb
+            cls._instance._context = _worker_context()
+        return cls._instance
+
+    def _create_pool(self):
+        return self._context.Pool(
+            processes=self.workers,
+            initializer=_limit_worker_memory,
+            initargs=(self.max_memory_mb,),
+            maxtasksperchild=Config.PDF_WORKER_MAX_TASKS,
+        )
+
+    def _wait(self, async_result, timeout: float, path: str):
+        try:
+            return async_result.get(timeout=max(timeout, 0))
+        except multiprocessing.TimeoutError:
+            logging.error(f"PDF extraction timed out for {path}; terminating its parser workers.")
+            raise DocumentExtractionError(f"PDF extraction timed out for {path}")
+        except MemoryError:
+            raise DocumentExtractionError(f"PDF extraction exceeded the worker memory limit for {path}")
+
+    def extract_pages(self, path: str, engine: Optional[str] = None) -> List[Tuple[int, str]]:
+        """Returns (page number, text) pairs for every page, in document order."""
+        engine = engine or Config.PDF_ENGINE
+        if engine not in PDF_ENGINES:
+            raise ValueError(f"Unknown PDF engine: {engine}")
+        # Leaving the block terminates the pool, including any task still running after a timeout.
+        with self._create_pool() as pool:
+            page_count = self._wait(pool.apply_async(_count_pages, (path,)), self.task_timeout, path)
+
+            ranges = [(start, min(start + self.pages_per_task, page_count))
+                      for start in range(0, page_count, self.pages_per_task)]
+            submitted_at = time.monotonic()
+            pending = [pool.apply_async(extract_page_range, (path, start, end, engine)) for start, end in ranges]
+
+            pages = []
+            for index, async_result in enumerate(pending):
+                # Tasks beyond the first wave have to wait for a free worker before they start.
+                deadline = submitted_at + self.task_timeout * (index // self.workers + 1)
+                pages.extend(self._wait(async_result, deadline - time.monotonic(), path))
+
+        logging.info(f"Extracted {page_count} pages from {path} with {engine} in {len(ranges)} tasks "
+                     f"({time.monotonic() - submitted_at:.2f}s).")
+        return pages
@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from ..config.config import Config
+
+REWRITE_MODES = ("always", "never", "heuristic")
+
+REWRITE_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        MessagesPlaceholder(variable_name="chat_history"),
+        ("human", "{input}"),
+        (
+            "human",
+            "Given the above conversation, generate a search query to lookup in order to get information relevant to the conversation",
+        ),
+    ]
+)
+
+FOLLOW_UP_PREFIXES = ("and ", "but ", "also ", "so ", "then ", "what about", "how about", "why not", "what else")
+ANAPHORS = {
+    "it", "its", "they", "them", "their", "that", "this", "those", "these", "he", "she", "his", "her",
+    "there", "above", "previous", "former", "latter", "same", "such", "one", "ones", "else", "more",
+}
+
+
+def looks_like_follow_up(query: str) -> bool:
+    """
+    Guesses whether a query depends on the conversation: it opens like a
+    continuation ("and what about..."), refers back with a pronoun or
+    "the previous/same/above", or is too short to stand on its own.
+    """
+    text = query.strip().lower()
+    words = re.findall(r"[a-z']+", text)
+    if len(words) <= 3:
+        return True
+    if text.startswith(FOLLOW_UP_PREFIXES):
+        return True
+    return any(word in ANAPHORS for word in words)
+
+
+class QueryRewriteService:
+    """
+    Turns a follow-up question into a standalone search query using the LLM
+    and the chat history, according to a policy:
+
+    - always: rewrite whenever there is chat history
+    - never: search with the question as asked
+    - heuristic: rewrite only when there is history and the question looks
+      like a follow-up (see `looks_like_follow_up`)
+
+    Rewrites are cached in an LRU keyed by a hash of the last `history_turns`
+    messages plus the question, and latency is counted per mode.
+    """
+
+    def __init__(self, llm, mode: Optional[str] = None, cache_size: Optional[int] = None,
+                 history_turns: Optional[int] = None):
+        self.mode = mode or Config.QUERY_REWRITE_MODE
+        if self.mode not in REWRITE_MODES:
+            raise ValueError(f"Unknown query rewrite mode: {self.mode}")
+        self.cache_size = cache_size or Config.QUERY_REWRITE_CACHE_SIZE
+        self.history_turns = history_turns or Config.QUERY_REWRITE_HISTORY_TURNS
+        self.chain = REWRITE_PROMPT | llm | StrOutputParser()
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            mode: {"requests": 0, "skipped": 0, "cache_hits": 0, "rewrites": 0, "rewrite_ms": 0.0}
+            for mode in REWRITE_MODES
+        }
+
+    def _recent(self, chat_history: List) -> List:
+        """The last `history_turns` turns, behind the conversation summary when the history opens with one."""
+        recent = chat_history[-self.history_turns * 2:]
+        if len(chat_history) > len(recent) and chat_history[0].type == "system":
+            recent = [chat_history[0]] + recent
+        return recent
+
+    def _cache_key(self, query: str, chat_history: List) -> str:
+        recent = self._recent(chat_history)
+        digest = hashlib.sha256()
+        for message in recent:
+            digest.update(f"{message.type}:{message.content}\x00".encode("utf-8"))
+        digest.update(query.strip().lower().encode("utf-8"))
+        return digest.hexdigest()
+
+    def _should_rewrite(self, mode: str, query: str, chat_history: List) -> bool:
+        if mode == "never" or not chat_history:
+            return False
+        return mode == "always" or looks_like_follow_up(query)
+
+    def _lookup(self, query: str, chat_history: List, mode: Optional[str]):
+        """
+        Applies the policy and the cache. Returns (answer, None) when no LLM
+        call is needed, otherwise (None, (cache key, mode stats)).
+        """
+        mode = mode or self.mode
+        if mode not in REWRITE_MODES:
+            raise ValueError(f"Unknown query rewrite mode: {mode}")
+        stats = self._stats[mode]
+        with self._lock:
+            stats["requests"] += 1
+        if not self._should_rewrite(mode, query, chat_history):
+            with self._lock:
+                stats["skipped"] += 1
+            return query, None
+
+        key = self._cache_key(query, chat_history)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                stats["cache_hits"] += 1
+                return cached, None
+        return None, (key, stats)
+
+    def _chain_input(self, query: str, chat_history: List) -> dict:
+        return {"input": query, "chat_history": self._recent(chat_history)}
+
+    def _store(self, query: str, output: str, pending: tuple, started: float) -> str:
+        key, stats = pending
+        rewritten = output.strip() or query
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logging.info(f"Rewrote query '{query}' as '{rewritten}' in {elapsed_ms:.0f} ms.")
+
+        with self._lock:
+            stats["rewrites"] += 1
+            stats["rewrite_ms"] += elapsed_ms
+            self._cache[key] = rewritten
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return rewritten
+
+    def rewrite(self, query: str, chat_history: List, mode: Optional[str] = None) -> str:
+        answer, pending = self._lookup(query, chat_history, mode)
+        if pending is None:
+            return answer
+        started = time.perf_counter()
+        output = self.chain.invoke(self._chain_input(query, chat_history))
+        return self._store(query, output, pending, started)
+
+    async def arewrite(self, query: str, chat_history: List, mode: Optional[str] = None) -> str:
+        """Async counterpart of `rewrite`; the LLM call does not block the event loop."""
+        answer, pending = self._lookup(query, chat_history, mode)
+        if pending is None:
+            return answer
+        started = time.perf_counter()
+        output = await self.chain.ainvoke(self._chain_input(query, chat_history))
+        return self._store(query, output, pending, started)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "cache_entries": len(self._cache),
+                "modes": {
+                    mode: {
+                        **{key: value for key, value in stats.items() if key != "rewrite_ms"},
+                        "avg_rewrite_ms": stats["rewrite_ms"] / stats["rewrites"] if stats["rewrites"] else 0.0,
+                    }
+                    for mode, stats in self._stats.items()
+                },
+            }
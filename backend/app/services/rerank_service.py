@@ -0,0 +1,72 @@
+import logging
+import threading
+import time
+from typing import List, Optional
+from fastembed.rerank.cross_encoder import TextCrossEncoder
+from ..config.config import Config
+
+
+class RerankService:
+    """
+    Scores retrieved candidates against the query with a local ONNX
+    cross-encoder (fastembed's TextCrossEncoder) and keeps the best `top_k`.
+
+    The model is loaded on first use, so enabling reranking does not slow down
+    start-up. Latency counters cover the scoring step only.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, top_k: Optional[int] = None,
+                 threads: Optional[int] = None, batch_size: int = 32):
+        self.model_name = model_name or Config.RERANK_MODEL
+        self.top_k = top_k or Config.RERANK_TOP_K
+        self.threads = threads or Config.RERANK_THREADS
+        self.batch_size = batch_size
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.candidates_scored = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def _get_model(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._model = TextCrossEncoder(model_name=self.model_name, threads=self.threads)
+                    logging.info(f"Loaded reranker model {self.model_name}")
+        return self._model
+
+    def rerank(self, query: str, documents: List, top_k: Optional[int] = None) -> List:
+        """Returns the `top_k` documents ordered by cross-encoder score, best first."""
+        if not documents:
+            return []
+        top_k = top_k or self.top_k
+        model = self._get_model()
+        started = time.perf_counter()
+        scores = list(model.rerank(query, [doc.page_content for doc in documents], batch_size=self.batch_size))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        with self._stats_lock:
+            self.calls += 1
+            self.candidates_scored += len(documents)
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self.last_ms = elapsed_ms
+        logging.info(f"Reranked {len(documents)} candidates in {elapsed_ms:.0f} ms.")
+
+        ranked = sorted(zip(scores, range(len(documents))), key=lambda item: item[0], reverse=True)
+        return [documents[index] for _, index in ranked[:top_k]]
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "model": self.model_name,
+                "top_k": self.top_k,
+                "calls": self.calls,
+                "candidates_scored": self.candidates_scored,
+                "avg_ms": self.total_ms / self.calls if self.calls else 0.0,
+                "max_ms": self.max_ms,
+                "last_ms": self.last_ms,
+            }
@@ -1,4 +1,3 @@
-from langchain_core.messages import HumanMessage, AIMessage
 from typing import List, Dict
 from ..core.interfaces import StatsServiceInterface
 
@@ -10,12 +9,8 @@ class StatsService(StatsServiceInterface):
             cls._instance = super(StatsService, cls).__new__(cls)
             cls._instance.document_usage_count = {}  # Updated name
             cls._instance.query_usage_count = {}
-            cls._instance.chat_history = []
         return cls._instance
 
-    def get_chat_history(self):
-        return self.chat_history
-
     def update_usage_counts(self, documents: List) -> None:
         for doc in documents:
             doc_source = doc.metadata.get("source")
@@ -47,15 +42,11 @@ class StatsService(StatsServiceInterface):
         contexts = []
         for doc in documents:
             metadata = doc.metadata
-            contexts.append({
+            context = {
                 "source": metadata.get("source", "Unknown"),
                 "page_content": doc.page_content
-            })
+            }
+            if metadata.get("page") is not None:
+                context["page"] = metadata["page"]
+            contexts.append(context)
         return contexts
-
-    def clear_chat_history(self) -> None:
-        self.chat_history = []
-
-    def update_chat_history(self, human_message: str, ai_message: str) -> None:
-        self.chat_history.append(HumanMessage(content=human_message))
-        self.chat_history.append(AIMessage(content=ai_message))
\ No newline at end of file
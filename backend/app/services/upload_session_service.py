@@ -0,0 +1,189 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from typing import Optional
+from ..config.config import Config
+from ..utils.file_utils import STREAM_CHUNK_SIZE
+
+SESSION_FILE = "session.json"
+DATA_FILE = "data.part"
+CHUNKS_DIR = "chunks"
+MISSING_CHUNKS_LISTED = 100  # Status lists at most this many missing chunk indices; missing_ranges covers the rest
+
+
+class UploadSessionService:
+    """
+    Resumable chunked uploads: init, put chunk N, query received ranges, finalize.
+
+    Each session is a directory in the staging area holding the session
+    description, a preallocated data file that chunks are written into at their
+    offsets, and one marker file per received chunk. Markers are written after
+    the chunk data, so a chunk is only reported as received once it is fully on
+    disk, and several workers can accept chunks for the same session.
+    """
+
+    def __init__(self, staging_dir: Optional[str] = None, chunk_size: Optional[int] = None,
+                 session_ttl: Optional[int] = None, max_size: Optional[int] = None,
+                 min_chunk_size: Optional[int] = None):
+        self.staging_dir = staging_dir or Config.UPLOAD_STAGING_DIR
+        self.chunk_size = chunk_size or Config.UPLOAD_CHUNK_SIZE
+        self.session_ttl = session_ttl or Config.UPLOAD_SESSION_TTL
+        self.max_size = max_size or Config.UPLOAD_MAX_SIZE
+        self.min_chunk_size = min_chunk_size or Config.UPLOAD_MIN_CHUNK_SIZE
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def _session_dir(self, upload_id: str) -> str:
+        # Upload ids are generated as uuid4 hex; reject anything else to keep paths inside the staging dir.
+        try:
+            uuid.UUID(hex=upload_id)
+        except ValueError:
+            raise FileNotFoundError(f"Upload session not found: {upload_id}")
+        return os.path.join(self.staging_dir, upload_id)
+
+    def _load_session(self, upload_id: str) -> dict:
+        session_file = os.path.join(self._session_dir(upload_id), SESSION_FILE)
+        if not os.path.exists(session_file):
+            raise FileNotFoundError(f"Upload session not found: {upload_id}")
+        with open(session_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _received_chunks(self, upload_id: str) -> list[int]:
+        chunks_dir = os.path.join(self._session_dir(upload_id), CHUNKS_DIR)
+        return sorted(int(name) for name in os.listdir(chunks_dir) if name.isdigit())
+
+    def cleanup_expired(self) -> None:
+        cutoff = time.time() - self.session_ttl
+        for upload_id in os.listdir(self.staging_dir):
+            session_dir = os.path.join(self.staging_dir, upload_id)
+            if os.path.isdir(session_dir) and os.path.getmtime(session_dir) < cutoff:
+                shutil.rmtree(session_dir, ignore_errors=True)
+                logging.info(f"Removed expired upload session {upload_id}")
+
+    def init_upload(self, filename: str, size: int, checksum: str, chunk_size: Optional[int] = None) -> dict:
+        if not filename or os.path.basename(filename) != filename:
+            raise ValueError("A plain file name is required.")
+        # bool is an int subclass, so JSON true would otherwise pass as 1.
+        if isinstance(size, bool) or not isinstance(size, int) or size <= 0:
+            raise ValueError("File size must be a positive integer.")
+        if size > self.max_size:
+            raise ValueError(f"File size exceeds the {self.max_size} byte upload limit.")
+        if not checksum:
+            raise ValueError("An MD5 checksum of the whole file is required.")
+        self.cleanup_expired()
+
+        chunk_size = self.chunk_size if chunk_size is None else chunk_size
+        if isinstance(chunk_size, bool) or not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("Chunk size must be a positive integer.")
+        # Tiny chunks would mean millions of marker files and status entries for one upload.
+        if chunk_size < min(self.min_chunk_size, size):
+            raise ValueError(f"Chunk size must be at least {self.min_chunk_size} bytes.")
+        upload_id = uuid.uuid4().hex
+        session_dir = self._session_dir(upload_id)
+        os.makedirs(os.path.join(session_dir, CHUNKS_DIR))
+        with open(os.path.join(session_dir, DATA_FILE), "wb") as f:
+            f.truncate(size)
+        session = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "size": size,
+            "checksum": checksum.lower(),
+            "chunk_size": chunk_size,
+            "total_chunks": -(-size // chunk_size),
+            "created_at": time.time(),
+        }
+        with open(os.path.join(session_dir, SESSION_FILE), "w", encoding="utf-8") as f:
+            json.dump(session, f)
+        logging.info(f"Started resumable upload {upload_id} for {filename} ({size} bytes)")
+        return session
+
+    def put_chunk(self, upload_id: str, index: int, stream) -> dict:
+        session = self._load_session(upload_id)
+        if index < 0 or index >= session["total_chunks"]:
+            raise ValueError(f"Chunk index {index} is out of range.")
+        offset = index * session["chunk_size"]
+        expected = min(session["chunk_size"], session["size"] - offset)
+
+        session_dir = self._session_dir(upload_id)
+        written = 0
+        with open(os.path.join(session_dir, DATA_FILE), "r+b") as f:
+            f.seek(offset)
+            while written <= expected:
+                data = stream.read(min(STREAM_CHUNK_SIZE, expected + 1 - written))
+                if not data:
+                    break
+                f.write(data[:max(expected - written, 0)])
+                written += len(data)
+        if written != expected:
+            raise ValueError(f"Chunk {index} must be exactly {expected} bytes, received {written}.")
+
+        open(os.path.join(session_dir, CHUNKS_DIR, str(index)), "w").close()
+        os.utime(session_dir)  # Keeps active sessions from expiring
+        return self.get_status(upload_id)
+
+    def get_status(self, upload_id: str) -> dict:
+        """
+        The session with what has arrived so far: `received_ranges` in bytes,
+        `missing_ranges` as [first, end) chunk index ranges, and the first
+        MISSING_CHUNKS_LISTED missing indices in `missing_chunks`.
+        """
+        session = self._load_session(upload_id)
+        received = self._received_chunks(upload_id)
+
+        ranges = []
+        for index in received:
+            start = index * session["chunk_size"]
+            end = min(start + session["chunk_size"], session["size"])
+            if ranges and ranges[-1][1] == start:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+
+        missing_ranges = []
+        next_index = 0
+        for index in received + [session["total_chunks"]]:
+            if index > next_index:
+                missing_ranges.append([next_index, index])
+            next_index = index + 1
+        missing_chunks = []
+        for start, end in missing_ranges:
+            missing_chunks.extend(range(start, min(end, start + MISSING_CHUNKS_LISTED - len(missing_chunks))))
+            if len(missing_chunks) >= MISSING_CHUNKS_LISTED:
+                break
+
+        return {
+            **session,
+            "received_chunks": len(received),
+            "received_ranges": ranges,
+            "missing_ranges": missing_ranges,
+            "missing_chunks": missing_chunks,
+            "complete": len(received) == session["total_chunks"],
+        }
+
+    def finalize(self, upload_id: str) -> tuple[str, str, str, int]:
+        """
+        Verifies that every chunk arrived and that the whole-file MD5 matches the
+        checksum given at init. Returns (staged path, filename, md5, size).
+        """
+        status = self.get_status(upload_id)
+        if not status["complete"]:
+            raise ValueError(f"Upload is incomplete; missing chunks: {status['missing_chunks'][:20]}")
+
+        data_path = os.path.join(self._session_dir(upload_id), DATA_FILE)
+        hash_md5 = hashlib.md5()
+        with open(data_path, "rb") as f:
+            for data in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+                hash_md5.update(data)
+        file_hash = hash_md5.hexdigest()
+        if file_hash != status["checksum"]:
+            raise ValueError("Checksum mismatch: the assembled file does not match the expected MD5.")
+        return data_path, status["filename"], file_hash, status["size"]
+
+    def discard(self, upload_id: str) -> None:
+        session_dir = self._session_dir(upload_id)
+        if not os.path.isdir(session_dir):
+            raise FileNotFoundError(f"Upload session not found: {upload_id}")
+        shutil.rmtree(session_dir, ignore_errors=True)
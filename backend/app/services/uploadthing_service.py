@@ -1,4 +1,5 @@
 import requests
+import httpx
 import json
 import logging
 import uuid
@@ -81,27 +82,15 @@ class UploadthingService:
             self.logger.error(f"Failed to determine file size: {e}")
             raise ValueError(f"Unable to determine file size: {e}")
 
-    def upload(self, file: Any, size: Optional[int] = None, 
-               custom_id: Optional[str] = None, acl: str = "public-read", 
-               content_disposition: str = "inline", metadata: Optional[Dict[str, Any]] = None) -> str:
-        """
-        Upload a file to Uploadthing.
-        
-        Args:
-            file: The file object to upload.
-            size: The size of the file in bytes. If not provided, it will be determined automatically.
-            custom_id: A custom ID for the file. If not provided, a UUID will be generated.
-            acl: The access control list for the file (default: "public-read").
-            content_disposition: The content disposition for the file (default: "inline").
-            metadata: Optional metadata for the file.
-            
-        Returns:
-            The URL of the uploaded file.
-        """
+    def _prepare_upload(self, file: Any, size: Optional[int], custom_id: Optional[str], acl: str,
+                        content_disposition: str, metadata: Optional[Dict[str, Any]]) -> tuple:
+        """Works out the file name, content type and the initial Uploadthing request for a file."""
         self._validate_configuration()
         
         # Get filename and content type from file object
-        if hasattr(file, "filename"):
+        if isinstance(file, (str, os.PathLike)):
+            filename = os.path.basename(file)
+        elif hasattr(file, "filename"):
             filename = file.filename
         elif hasattr(file, "name"):
             filename = os.path.basename(file.name)
@@ -118,7 +107,7 @@ class UploadthingService:
         
         # Determine file size if not provided
         if size is None:
-            size = self._get_file_size(file)
+            size = os.path.getsize(file) if isinstance(file, (str, os.PathLike)) else self._get_file_size(file)
         
         # Generate a custom ID if not provided
         if custom_id is None:
@@ -145,59 +134,89 @@ class UploadthingService:
             "metadata": metadata,
             "contentDisposition": content_disposition
         }
+        return filename, content_type, headers, data
+
+    def _parse_upload_details(self, upload_details: Dict[str, Any]) -> Dict[str, Any]:
+        """Validates Uploadthing's answer to the initial request and returns the file's upload details."""
+        # Validate response format
+        if not upload_details or 'data' not in upload_details or not isinstance(upload_details['data'], list) or not upload_details['data']:
+            self.logger.error(f"Unexpected response from Uploadthing: {upload_details}")
+            raise ValueError("Invalid response format from Uploadthing.")
         
-        try:
-            # Step 1: Get upload details from Uploadthing
-            self.logger.debug(f"Making initial request to {self.upload_api_url}")
-            response = requests.post(
-                self.upload_api_url, 
-                headers=headers, 
-                data=json.dumps(data),
-                timeout=30
-            )
-            response.raise_for_status()
-            upload_details = response.json()
-            
-            self.logger.debug(f"Upload details received: {upload_details}")
-            
-            # Validate response format
-            if not upload_details or 'data' not in upload_details or not isinstance(upload_details['data'], list) or not upload_details['data']:
-                self.logger.error(f"Unexpected response from Uploadthing: {upload_details}")
-                raise ValueError("Invalid response format from Uploadthing.")
-            
-            file_data = upload_details['data'][0]
-            
-            if not file_data.get('url') or not file_data.get('fields'):
-                self.logger.error(f"Missing required fields in response: {file_data}")
-                raise ValueError("Missing required fields in Uploadthing response.")
-            
-            upload_url = file_data['url']
-            fields = file_data['fields']
-            file_url = file_data['fileUrl']
-            
-            # Step 2: Prepare multipart form data for actual upload
-            if hasattr(file, "read"):
-                # Ensure file is at the beginning
-                if hasattr(file, "seek"):
-                    file.seek(0)
-                file_content = file.read()
-            else:
-                # If file is a path, open and read it
-                with open(file, 'rb') as f:
-                    file_content = f.read()
-            
-            # Prepare the multipart form data
-            files = {'file': (filename, file_content, content_type)}
+        file_data = upload_details['data'][0]
+        
+        if not file_data.get('url') or not file_data.get('fields'):
+            self.logger.error(f"Missing required fields in response: {file_data}")
+            raise ValueError("Missing required fields in Uploadthing response.")
+        return file_data
+
+    def _open_upload_file(self, file: Any):
+        """Returns a readable handle for a file object or path; paths are opened here and must be closed by the caller."""
+        if hasattr(file, "read"):
+            # Ensure file is at the beginning
+            if hasattr(file, "seek"):
+                file.seek(0)
+            return file
+        # If file is a path, open it
+        return open(file, 'rb')
+
+    def upload(self, file: Any, size: Optional[int] = None, 
+               custom_id: Optional[str] = None, acl: str = "public-read", 
+               content_disposition: str = "inline", metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Upload a file to Uploadthing.
+        
+        Args:
+            file: The file object to upload.
+            size: The size of the file in bytes. If not provided, it will be determined automatically.
+            custom_id: A custom ID for the file. If not provided, a UUID will be generated.
+            acl: The access control list for the file (default: "public-read").
+            content_disposition: The content disposition for the file (default: "inline").
+            metadata: Optional metadata for the file.
             
-            # Step 3: Upload the file to the pre-signed URL
-            self.logger.debug(f"Uploading file to {upload_url}")
-            upload_response = requests.post(
-                upload_url, 
-                data=fields, 
-                files=files,
-                timeout=60  # Longer timeout for file upload
-            )
-            upload_response.raise_for_status()
+        Returns:
+            The URL of the uploaded file.
+        """
+        filename, content_type, headers, data = self._prepare_upload(
+            file, size, custom_id, acl, content_disposition, metadata
+        )
+        
+        try:
+            # httpx streams a file handle into the multipart body in small
+            # chunks; requests would read the whole file into memory first.
+            with httpx.Client() as client:
+                # Step 1: Get upload details from Uploadthing
+                self.logger.debug(f"Making initial request to {self.upload_api_url}")
+                response = client.post(self.upload_api_url, headers=headers, content=json.dumps(data), timeout=30)
+                response.raise_for_status()
+                upload_details = response.json()
+
+                self.logger.debug(f"Upload details received: {upload_details}")
+
+                file_data = self._parse_upload_details(upload_details)
+                upload_url = file_data['url']
+                fields = file_data['fields']
+                file_url = file_data['fileUrl']
+
+                # Step 2: Prepare multipart form data for actual upload
+                file_handle = self._open_upload_file(file)
+
+                try:
+                    # Prepare the multipart form data
+                    files = {'file': (filename, file_handle, content_type)}
+
+                    # Step 3: Upload the file to the pre-signed URL
+                    self.logger.debug(f"Uploading file to {upload_url}")
+                    upload_response = client.post(
+                        upload_url,
+                        data=fields,
+                        files=files,
+                        timeout=60  # Longer timeout for file upload
+                    )
+                    upload_response.raise_for_status()
+                finally:
+                    if file_handle is not file:
+                        file_handle.close()
             
             self.logger.info(f"File '{filename}' uploaded successfully to Uploadthing. URL: {file_url}")
             uploadthing = {
@@ -209,15 +228,64 @@ class UploadthingService:
             print (uploadthing)
             return uploadthing
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             self.logger.error(f"Error communicating with Uploadthing: {str(e)}")
-            if 'response' in locals() and hasattr(response, 'text'):
-                self.logger.error(f"Response body: {response.text}")
+            if isinstance(e, httpx.HTTPStatusError):
+                self.logger.error(f"Response body: {e.response.text}")
             raise ValueError(f"Error during Uploadthing communication: {str(e)}")
         except Exception as e:
             self.logger.error(f"Unexpected error during Uploadthing upload: {str(e)}")
             raise ValueError(f"Unexpected error during Uploadthing upload: {str(e)}")
 
+    async def aupload(self, file: Any, size: Optional[int] = None,
+                      custom_id: Optional[str] = None, acl: str = "public-read",
+                      content_disposition: str = "inline", metadata: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """
+        Async counterpart of `upload` that talks to Uploadthing through
+        httpx.AsyncClient, so an upload does not hold a thread while it waits
+        on the network. Takes the same arguments and returns the same details.
+        """
+        filename, content_type, headers, data = self._prepare_upload(
+            file, size, custom_id, acl, content_disposition, metadata
+        )
+
+        try:
+            async with httpx.AsyncClient() as client:
+                self.logger.debug(f"Making initial request to {self.upload_api_url}")
+                response = await client.post(self.upload_api_url, headers=headers, content=json.dumps(data), timeout=30)
+                response.raise_for_status()
+                file_data = self._parse_upload_details(response.json())
+
+                file_handle = self._open_upload_file(file)
+                try:
+                    self.logger.debug(f"Uploading file to {file_data['url']}")
+                    upload_response = await client.post(
+                        file_data['url'],
+                        data=file_data['fields'],
+                        files={'file': (filename, file_handle, content_type)},
+                        timeout=60  # Longer timeout for file upload
+                    )
+                    upload_response.raise_for_status()
+                finally:
+                    if file_handle is not file:
+                        file_handle.close()
+        except httpx.HTTPError as e:
+            self.logger.error(f"Error communicating with Uploadthing: {str(e)}")
+            raise ValueError(f"Error during Uploadthing communication: {str(e)}")
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Unexpected error during Uploadthing upload: {str(e)}")
+            raise ValueError(f"Unexpected error during Uploadthing upload: {str(e)}")
+
+        self.logger.info(f"File '{filename}' uploaded successfully to Uploadthing. URL: {file_data['fileUrl']}")
+        return {
+            "url": file_data['fileUrl'],
+            "key": file_data['key'],
+            "fileName": file_data['fileName'],
+            "fileType": file_data['fileType']
+        }
+
     def upload_multiple(self, files: List[Any], custom_ids: Optional[List[str]] = None, 
                         acl: str = "public-read", content_disposition: str = "inline", 
                         metadata: Optional[Dict[str, Any]] = None) -> List[str]:
@@ -1,29 +1,42 @@
 from langchain_chroma import Chroma
-from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain.chains import create_retrieval_chain
 from langchain_core.messages import HumanMessage, AIMessage
-from langchain.chains.history_aware_retriever import create_history_aware_retriever
+from langchain_core.documents import Document
+from langchain_core.runnables import ConfigurableField, RunnableLambda, RunnablePassthrough
 from ..core.interfaces import VectorStoreServiceInterface
+from ..core.exceptions import VectorStoreError
 from ..config.config import Config
+from ..utils.context_packing import pack_context
 from .llm_service import LLMService
-from .stats_service import StatsService
 from .prompt_service import PromptService  # Import PromptService
+from .embedding_service import CachedEmbeddings, EmbeddingCache, EmbeddingEngine
+from .lexical_index_service import LexicalIndexService
+from .hybrid_retriever import HybridRetriever
+from .answer_cache_service import AnswerCacheService
+from .rerank_service import RerankService
+from .query_rewrite_service import QueryRewriteService
+import asyncio
 import os
+import hashlib
 import logging
+import time
 from typing import Optional, List
 import random
+from operator import itemgetter
+from itertools import islice
 
 llm_service = LLMService(Config.OLLAMA_MODEL)
-stats_service = StatsService()
 prompt_service = PromptService() # Instantiate PromptService
 
+METADATA_PAGE_SIZE = 1000
+
 class VectorStoreService(VectorStoreServiceInterface):
     _instance = None
 
-    def __new__(cls, db_folder=None, chunk_size=None, chunk_overlap=None, score_threshold=None, search_k=None):
+    def __new__(cls, db_folder=None, chunk_size=None, chunk_overlap=None, score_threshold=None, search_k=None,
+                write_batch_size=None):
         if cls._instance is None:
             cls._instance = super(VectorStoreService, cls).__new__(cls)
             cls._instance.db_folder = db_folder or Config.DB_FOLDER
@@ -31,23 +44,47 @@ class VectorStoreService(VectorStoreServiceInterface):
             cls._instance.chunk_overlap = chunk_overlap or Config.CHUNK_OVERLAP
             cls._instance.score_threshold = score_threshold or Config.SCORE_THRESHOLD
             cls._instance.search_k = search_k or Config.SEARCH_K
-            cls._instance.embedding = FastEmbedEmbeddings()
+            cls._instance.write_batch_size = write_batch_size or Config.VECTOR_WRITE_BATCH_SIZE
+            cls._instance.embedding = cls._instance._create_embedding()
             cls._instance.text_splitter = RecursiveCharacterTextSplitter(
                 chunk_size=cls._instance.chunk_size,
                 chunk_overlap=cls._instance.chunk_overlap,
                 length_function=len,
                 is_separator_regex=False
             )
+            cls._instance._chains = {}
             cls._instance.vector_store = cls._instance._initialize_vector_store()
+            cls._instance.lexical_index = LexicalIndexService()
+            cls._instance.reranker = RerankService() if Config.RERANK_ENABLED else None
+            cls._instance.query_rewriter = QueryRewriteService(llm_service.llm)
+            cls._instance.answer_cache = (
+                AnswerCacheService(embed_query=cls._instance.embedding.embed_query,
+                                   sync_path=Config.ANSWER_CACHE_SYNC_PATH)
+                if Config.ANSWER_CACHE_ENABLED else None
+            )
         return cls._instance
 
+    def _create_embedding(self):
+        self.embedding_engine = EmbeddingEngine()
+        if not Config.EMBEDDING_CACHE_ENABLED:
+            return self.embedding_engine
+        return CachedEmbeddings(self.embedding_engine, self.embedding_engine.model_name, EmbeddingCache())
+
+    def get_embedding_cache_stats(self) -> Optional[dict]:
+        if isinstance(self.embedding, CachedEmbeddings):
+            return self.embedding.get_stats()
+        return None
+
+    def get_embedding_stats(self) -> dict:
+        return self.embedding_engine.get_stats()
+
     def _initialize_vector_store(self):
         if not os.path.exists(self.db_folder):
             os.makedirs(self.db_folder)
             logging.info(f"Created vector store directory: {self.db_folder}")
         try:
             vector_store = Chroma(persist_directory=self.db_folder, embedding_function=self.embedding)
-            if not vector_store.get():
+            if vector_store._collection.count() == 0:
                 logging.info("Vector store is empty or not properly initialized.")
             return vector_store
         except Exception as e:
@@ -56,82 +93,478 @@ class VectorStoreService(VectorStoreServiceInterface):
 
     def initialize_vector_store(self) -> None:
         self.vector_store = self._initialize_vector_store()
+        self._chains = {}  # Cached chains hold the previous store
 
-    def add_documents(self, documents, source: str) -> None:
-        if self.vector_store is None:
-            self.vector_store = self._initialize_vector_store()
+    def _split_documents(self, documents, source: str) -> list:
         chunks = self.text_splitter.split_documents(documents)
         for chunk in chunks:
-            chunk.metadata = {"source": source}
+            chunk.metadata = {
+                **(chunk.metadata or {}),
+                "source": source,
+                "chunk_hash": hashlib.sha256(chunk.page_content.encode("utf-8")).hexdigest(),
+            }
+        return chunks
+
+    @staticmethod
+    def _chunk_ids(chunks: list, taken: Optional[set] = None) -> list[str]:
+        """
+        Deterministic ids derived from source and content hash, so re-adding the
+        same chunks upserts them instead of creating duplicates. Repeated chunks
+        within a source get increasing occurrence numbers, skipping ids in `taken`.
+        """
+        taken = set(taken or ())
+        ids = []
+        for chunk in chunks:
+            source_hash = hashlib.sha256(chunk.metadata["source"].encode("utf-8")).hexdigest()[:16]
+            occurrence = 0
+            while True:
+                chunk_id = f"{source_hash}-{chunk.metadata['chunk_hash'][:32]}-{occurrence}"
+                if chunk_id not in taken:
+                    break
+                occurrence += 1
+            taken.add(chunk_id)
+            ids.append(chunk_id)
+        return ids
+
+    def _invalidate_answers(self, sources) -> None:
+        if self.answer_cache is not None:
+            self.answer_cache.invalidate_sources(sources)
+
+    def get_answer_cache_stats(self) -> Optional[dict]:
+        if self.answer_cache is None:
+            return None
+        return self.answer_cache.get_stats()
+
+    def _write_chunks(self, chunks: list, taken_ids: Optional[set] = None) -> list[str]:
+        """Upserts chunks into the live collection in batches of `write_batch_size`. Returns their ids."""
+        if self.vector_store is None:
+            self.vector_store = self._initialize_vector_store()
+        ids = self._chunk_ids(chunks, taken_ids)
         try:
-            Chroma.from_documents(documents=chunks, embedding=self.embedding, persist_directory=self.db_folder)
-            # Re-initialize the vector store to pick up the new documents
-            self.vector_store = Chroma(persist_directory=self.db_folder, embedding_function=self.embedding)
-            logging.info(f"Added {len(chunks)} chunks from {source} to vector store.")
+            for start in range(0, len(chunks), self.write_batch_size):
+                end = start + self.write_batch_size
+                self.vector_store.add_documents(chunks[start:end], ids=ids[start:end])
+                self.lexical_index.add(ids[start:end], chunks[start:end])
         except Exception as e:
             logging.error(f"Error adding documents to vector store: {e}")
+            raise VectorStoreError(f"Error adding documents to vector store: {e}") from e
+        finally:
+            self._invalidate_answers({chunk.metadata["source"] for chunk in chunks})
+        return ids
+
+    def add_documents(self, documents, source: str) -> int:
+        """
+        Splits and writes `documents`, which may be any iterable, `write_batch_size`
+        documents at a time, so a streamed file is never held in memory whole.
+        Returns the number of documents consumed.
+        """
+        started = time.perf_counter()
+        documents = iter(documents)
+        written_ids = set()
+        doc_count = 0
+        while True:
+            group = list(islice(documents, self.write_batch_size))
+            if not group:
+                break
+            doc_count += len(group)
+            chunks = self._split_documents(group, source)
+            # Ids already written for this source are passed on so repeated chunks keep distinct ids.
+            written_ids.update(self._write_chunks(chunks, taken_ids=written_ids))
+        logging.info(f"Added {len(written_ids)} chunks from {source} to vector store "
+                     f"in {(time.perf_counter() - started) * 1000:.0f} ms.")
+        return doc_count
+
+    def add_document_batch(self, batch: list[tuple[list, str]]) -> int:
+        """Adds documents from several sources in a single vector store write. Returns the chunk count."""
+        chunks = []
+        for documents, source in batch:
+            chunks.extend(self._split_documents(documents, source))
+        if chunks:
+            self._write_chunks(chunks)
+        logging.info(f"Added {len(chunks)} chunks from {len(batch)} sources to vector store.")
+        return len(chunks)
 
-    def query_vector_store(self, query: str, prompt, selected_files: Optional[List[str]] = None) -> dict:
+    def replace_documents(self, documents, source: str) -> dict:
+        """
+        Re-ingests a revised version of `source`, embedding only the chunks whose
+        content changed. Chunks are matched by content hash against those already
+        stored for the source: new hashes are added, missing ones are deleted and
+        unchanged chunks keep their embeddings (only their metadata is refreshed).
+        """
         if self.vector_store is None:
-            return {"answer": "Vector store not initialized."}
+            self.vector_store = self._initialize_vector_store()
+        chunks = self._split_documents(documents, source)
+        try:
+            existing = self.vector_store.get(where={"source": source}, include=["metadatas"])
+        except Exception as e:
+            logging.error(f"Error reading existing chunks for {source}: {e}")
+            raise VectorStoreError(f"Error reading existing chunks for {source}: {e}") from e
+
+        existing_ids_by_hash = {}
+        for doc_id, metadata in zip(existing.get("ids", []), existing.get("metadatas", [])):
+            existing_ids_by_hash.setdefault((metadata or {}).get("chunk_hash"), []).append(doc_id)
+        # Chunks stored before hashes were recorded can never match.
+        stale_ids = existing_ids_by_hash.pop(None, [])
 
+        to_add = []
+        kept_ids, kept_metadatas = [], []
+        for chunk in chunks:
+            matching_ids = existing_ids_by_hash.get(chunk.metadata["chunk_hash"])
+            if matching_ids:
+                kept_ids.append(matching_ids.pop())
+                kept_metadatas.append(chunk.metadata)
+            else:
+                to_add.append(chunk)
+        to_delete = stale_ids + [doc_id for ids in existing_ids_by_hash.values() for doc_id in ids]
+
+        try:
+            # Batched like _write_chunks, so a large revision stays under Chroma's max batch size.
+            for start in range(0, len(to_delete), self.write_batch_size):
+                batch = to_delete[start:start + self.write_batch_size]
+                self.vector_store.delete(ids=batch)
+                self.lexical_index.remove_ids(batch)
+            for start in range(0, len(kept_ids), self.write_batch_size):
+                end = start + self.write_batch_size
+                # Page numbers and row ranges may shift between revisions; no re-embedding needed.
+                self.vector_store._collection.update(ids=kept_ids[start:end], metadatas=kept_metadatas[start:end])
+        except Exception as e:
+            logging.error(f"Error replacing documents for {source}: {e}")
+            raise VectorStoreError(f"Error replacing documents for {source}: {e}") from e
+        if to_add:
+            self._write_chunks(to_add, taken_ids=set(kept_ids))
+        else:
+            self._invalidate_answers([source])
+
+        result = {
+            "added": len(to_add),
+            "deleted": len(to_delete),
+            "unchanged": len(kept_ids),
+            "embeddings_skipped": len(kept_ids),
+        }
+        logging.info(f"Replaced {source} in vector store: {result}")
+        return result
+
+    def rebuild_lexical_index(self) -> int:
+        """Re-indexes every chunk in the vector store for BM25 search. Returns the chunk count."""
+        if self.vector_store is None:
+            self.vector_store = self._initialize_vector_store()
+        self.lexical_index.clear()
+        indexed = 0
+        while True:
+            page = self.vector_store.get(include=["documents", "metadatas"], limit=METADATA_PAGE_SIZE, offset=indexed)
+            chunks = [
+                Document(page_content=text, metadata=metadata or {})
+                for text, metadata in zip(page.get("documents", []), page.get("metadatas", []))
+            ]
+            self.lexical_index.add(page.get("ids", []), chunks)
+            indexed += len(chunks)
+            if len(chunks) < METADATA_PAGE_SIZE:
+                break
+        logging.info(f"Rebuilt lexical index with {indexed} chunks.")
+        return indexed
+
+    def _create_retriever(self, retrieval_mode: str):
+        """
+        Builds the retriever for a cached chain. The file filter is left
+        configurable so each request can supply it through the run config
+        (see `_search_config`) without rebuilding the chain.
+        """
+        if retrieval_mode == "hybrid":
+            return HybridRetriever(
+                vector_store=self.vector_store,
+                lexical_index=self.lexical_index,
+                k=self._retrieval_k(),
+                candidates=max(Config.HYBRID_CANDIDATES, self._retrieval_k()),
+                rrf_k=Config.RRF_K,
+                score_threshold=self.score_threshold,
+            ).configurable_fields(selected_files=ConfigurableField(id="selected_files"))
+        if retrieval_mode != "vector":
+            raise ValueError(f"Unknown retrieval mode: {retrieval_mode}")
+
+        return self.vector_store.as_retriever(
+            search_type="similarity_score_threshold",
+            search_kwargs=self._search_kwargs(),
+        ).configurable_fields(search_kwargs=ConfigurableField(id="search_kwargs"))
+
+    def _retrieval_k(self) -> int:
+        """With reranking on, retrieval fetches RERANK_CANDIDATES and the reranker keeps RERANK_TOP_K."""
+        return Config.RERANK_CANDIDATES if self.reranker is not None else self.search_k
+
+    def _search_kwargs(self, selected_files: Optional[List[str]] = None) -> dict:
         search_kwargs = {
-            "k": self.search_k,
+            "k": self._retrieval_k(),
             "score_threshold": self.score_threshold,
         }
-
         if selected_files:
-            search_kwargs["where"] = {"source": {"$in": selected_files}}
+            search_kwargs["filter"] = {"source": {"$in": selected_files}}
+        return search_kwargs
 
-        retriever = self.vector_store.as_retriever(
-            search_type="similarity_score_threshold",
-            search_kwargs=search_kwargs,
-        )
+    def _search_config(self, selected_files: Optional[List[str]] = None) -> dict:
+        """Per-request run config for a cached chain; each retriever type picks the field it exposes."""
+        return {"configurable": {
+            "search_kwargs": self._search_kwargs(selected_files),
+            "selected_files": selected_files or None,
+        }}
 
-        retriever_prompt = ChatPromptTemplate.from_messages(
-            [
-                MessagesPlaceholder(variable_name="chat_history"),
-                ("human", "{input}"),
-                (
-                    "human",
-                    "Given the above conversation, generate a search query to lookup in order to get information relevant to the conversation",
-                ),
-            ]
-        )
-        history_aware_retriever = create_history_aware_retriever(
-            llm=llm_service.llm, retriever=retriever, prompt=retriever_prompt
+    def _get_chains(self, prompt_type: str, retrieval_mode: Optional[str] = None) -> tuple:
+        """
+        Returns (context chain, document chain, full chain) for a prompt type and
+        retrieval mode, building them on first use. The context chain rewrites the
+        query, retrieves, reranks and packs the context; the document chain
+        generates the answer from it. Streaming runs the two separately.
+        """
+        retrieval_mode = retrieval_mode or Config.RETRIEVAL_MODE
+        key = (prompt_type, retrieval_mode)
+        chains = self._chains.get(key)
+        if chains is None:
+            prompt = prompt_service.get_prompt(prompt_type)
+            if not prompt:
+                raise ValueError(f"Unknown prompt type: {prompt_type}")
+            retriever = self._create_retriever(retrieval_mode)
+            document_chain = create_stuff_documents_chain(llm_service.llm, prompt)
+            # Same shape as create_retrieval_chain, with query rewriting, reranking and context packing.
+            context_chain = (
+                RunnablePassthrough.assign(search_query=RunnableLambda(self._rewrite_query, afunc=self._arewrite_query))
+                | RunnablePassthrough.assign(retrieved=itemgetter("search_query") | retriever)
+            )
+            if self.reranker is not None:
+                context_chain = context_chain | RunnableLambda(self._rerank)
+            context_chain = context_chain | RunnableLambda(self._pack_context)
+            full_chain = context_chain | RunnablePassthrough.assign(answer=document_chain)
+            chains = self._chains[key] = (context_chain, document_chain, full_chain)
+        return chains
+
+    def _get_chunk_embeddings(self, documents: list) -> list:
+        """Stored embeddings for retrieved chunks; chunks without a stored vector are embedded again."""
+        ids = [doc.id for doc in documents if doc.id]
+        stored = {}
+        if ids:
+            result = self.vector_store.get(ids=ids, include=["embeddings"])
+            stored = dict(zip(result["ids"], result["embeddings"]))
+        embeddings = [stored.get(doc.id) for doc in documents]
+        missing = [index for index, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            vectors = self.embedding.embed_documents([documents[index].page_content for index in missing])
+            for index, vector in zip(missing, vectors):
+                embeddings[index] = vector
+        return embeddings
+
+    def _rewrite_query(self, inputs: dict) -> str:
+        return self.query_rewriter.rewrite(inputs["input"], inputs["chat_history"], inputs.get("rewrite_mode"))
+
+    async def _arewrite_query(self, inputs: dict) -> str:
+        return await self.query_rewriter.arewrite(inputs["input"], inputs["chat_history"], inputs.get("rewrite_mode"))
+
+    def get_query_rewrite_stats(self) -> dict:
+        return self.query_rewriter.get_stats()
+
+    def _rerank(self, inputs: dict) -> dict:
+        return {**inputs, "retrieved": self.reranker.rerank(inputs["search_query"], inputs["retrieved"])}
+
+    def get_rerank_stats(self) -> Optional[dict]:
+        if self.reranker is None:
+            return None
+        return self.reranker.get_stats()
+
+    def _pack_context(self, inputs: dict) -> dict:
+        """Replaces the retrieved documents with the de-duplicated, token-budgeted context."""
+        documents = inputs["retrieved"]
+        outputs = {key: value for key, value in inputs.items() if key != "retrieved"}
+        query_embedding = self.embedding.embed_query(inputs["search_query"]) if documents else []
+        outputs["context"], outputs["context_packing"] = pack_context(
+            documents,
+            query_embedding,
+            self._get_chunk_embeddings(documents) if documents else [],
+            token_budget=Config.CONTEXT_TOKEN_BUDGET,
+            lambda_mult=Config.MMR_LAMBDA,
+            duplicate_threshold=Config.DUPLICATE_SIMILARITY,
         )
-        document_chain = create_stuff_documents_chain(LLMService(Config.OLLAMA_MODEL).llm, prompt)
-        retrieval_chain = create_retrieval_chain(history_aware_retriever, document_chain)
+        stats = outputs["context_packing"]
+        if stats["chunks_dropped"]:
+            logging.info(f"Context packing kept {stats['chunks_kept']}/{stats['chunks_retrieved']} chunks "
+                         f"({stats['tokens_kept']} tokens), dropped {stats['tokens_dropped']} tokens.")
+        return outputs
 
-        # Assuming chat_history is managed by the stats service
-        chat_history = stats_service.get_chat_history()
-        result = retrieval_chain.invoke({"input": query, "chat_history": chat_history})
-        return result
+    def query_vector_store(self, query: str, prompt_type: str, selected_files: Optional[List[str]] = None,
+                           retrieval_mode: Optional[str] = None, rewrite_mode: Optional[str] = None,
+                           chat_history: Optional[List] = None) -> dict:
+        if self.vector_store is None:
+            return {"answer": "Vector store not initialized."}
+
+        _, _, retrieval_chain = self._get_chains(prompt_type, retrieval_mode)
+        return retrieval_chain.invoke(self._chain_input(query, chat_history, rewrite_mode), config=self._search_config(selected_files))
+
+    async def aquery_vector_store(self, query: str, prompt_type: str, selected_files: Optional[List[str]] = None,
+                                  retrieval_mode: Optional[str] = None, rewrite_mode: Optional[str] = None,
+                                  chat_history: Optional[List] = None) -> dict:
+        """
+        Async counterpart of query_vector_store. The rewrite and the answer go
+        through the async Ollama client; retrieval, reranking and context
+        packing run on the default executor.
+        """
+        if self.vector_store is None:
+            return {"answer": "Vector store not initialized."}
+
+        _, _, retrieval_chain = self._get_chains(prompt_type, retrieval_mode)
+        return await retrieval_chain.ainvoke(self._chain_input(query, chat_history, rewrite_mode),
+                                             config=self._search_config(selected_files))
+
+    def _chain_input(self, query: str, chat_history: Optional[List], rewrite_mode: Optional[str] = None) -> dict:
+        return {"input": query, "chat_history": chat_history or [], "rewrite_mode": rewrite_mode}
+
+    def _use_answer_cache(self, retrieval_mode: Optional[str], chat_history: Optional[List]) -> bool:
+        return (self.answer_cache is not None and not chat_history
+                and retrieval_mode in (None, Config.RETRIEVAL_MODE))
+
+    def answer_query(self, query: str, prompt_type: str, selected_files: Optional[List[str]] = None,
+                     retrieval_mode: Optional[str] = None, rewrite_mode: Optional[str] = None,
+                     chat_history: Optional[List] = None) -> dict:
+        """
+        query_vector_store behind the answer cache. The result carries
+        `cached: True` when it was served from the cache. Follow-up questions
+        depend on the conversation, so the cache is bypassed while there is
+        chat history.
+        """
+        use_cache = self._use_answer_cache(retrieval_mode, chat_history)
+        if use_cache:
+            cached = self.answer_cache.get(query, prompt_type, selected_files)
+            if cached is not None:
+                return {**cached, "cached": True}
+            generation = self.answer_cache.generation()
+
+        result = self.query_vector_store(query, prompt_type, selected_files, retrieval_mode, rewrite_mode,
+                                         chat_history)
+        if use_cache and "context" in result:
+            self.answer_cache.put(query, prompt_type, selected_files, result, generation)
+        return {**result, "cached": False}
+
+    def stream_answer(self, query: str, prompt_type: str, selected_files: Optional[List[str]] = None,
+                      retrieval_mode: Optional[str] = None, rewrite_mode: Optional[str] = None,
+                      chat_history: Optional[List] = None):
+        """
+        Streaming counterpart of answer_query. Yields ("context", result) once the
+        context is packed, then ("token", text) for each generated chunk, then
+        ("result", result) with the full answer. Cached answers are replayed as a
+        single token.
+        """
+        if self.vector_store is None:
+            yield "result", {"answer": "Vector store not initialized.", "context": [], "cached": False}
+            return
+
+        use_cache = self._use_answer_cache(retrieval_mode, chat_history)
+        if use_cache:
+            cached = self.answer_cache.get(query, prompt_type, selected_files)
+            if cached is not None:
+                result = {**cached, "cached": True}
+                yield "context", result
+                yield "token", result["answer"]
+                yield "result", result
+                return
+            generation = self.answer_cache.generation()
+
+        context_chain, document_chain, _ = self._get_chains(prompt_type, retrieval_mode)
+        context = context_chain.invoke(self._chain_input(query, chat_history, rewrite_mode), config=self._search_config(selected_files))
+        yield "context", {**context, "cached": False}
+
+        tokens = []
+        for token in document_chain.stream(context):
+            tokens.append(token)
+            yield "token", token
+        result = {**context, "answer": "".join(tokens)}
+        if use_cache:
+            self.answer_cache.put(query, prompt_type, selected_files, result, generation)
+        yield "result", {**result, "cached": False}
+
+    async def aanswer_query(self, query: str, prompt_type: str, selected_files: Optional[List[str]] = None,
+                            retrieval_mode: Optional[str] = None, rewrite_mode: Optional[str] = None,
+                            chat_history: Optional[List] = None) -> dict:
+        """Async counterpart of answer_query; cache lookups embed the query on a worker thread."""
+        use_cache = self._use_answer_cache(retrieval_mode, chat_history)
+        if use_cache:
+            cached = await asyncio.to_thread(self.answer_cache.get, query, prompt_type, selected_files)
+            if cached is not None:
+                return {**cached, "cached": True}
+            generation = await asyncio.to_thread(self.answer_cache.generation)
+
+        result = await self.aquery_vector_store(query, prompt_type, selected_files, retrieval_mode,
+                                                rewrite_mode, chat_history)
+        if use_cache and "context" in result:
+            await asyncio.to_thread(self.answer_cache.put, query, prompt_type, selected_files, result, generation)
+        return {**result, "cached": False}
+
+    async def astream_answer(self, query: str, prompt_type: str, selected_files: Optional[List[str]] = None,
+                             retrieval_mode: Optional[str] = None, rewrite_mode: Optional[str] = None,
+                             chat_history: Optional[List] = None):
+        """Async counterpart of stream_answer, yielding the same events."""
+        if self.vector_store is None:
+            yield "result", {"answer": "Vector store not initialized.", "context": [], "cached": False}
+            return
+
+        use_cache = self._use_answer_cache(retrieval_mode, chat_history)
+        if use_cache:
+            cached = await asyncio.to_thread(self.answer_cache.get, query, prompt_type, selected_files)
+            if cached is not None:
+                result = {**cached, "cached": True}
+                yield "context", result
+                yield "token", result["answer"]
+                yield "result", result
+                return
+            generation = await asyncio.to_thread(self.answer_cache.generation)
+
+        context_chain, document_chain, _ = self._get_chains(prompt_type, retrieval_mode)
+        context = await context_chain.ainvoke(self._chain_input(query, chat_history, rewrite_mode),
+                                              config=self._search_config(selected_files))
+        yield "context", {**context, "cached": False}
+
+        tokens = []
+        async for token in document_chain.astream(context):
+            tokens.append(token)
+            yield "token", token
+        result = {**context, "answer": "".join(tokens)}
+        if use_cache:
+            await asyncio.to_thread(self.answer_cache.put, query, prompt_type, selected_files, result, generation)
+        yield "result", {**result, "cached": False}
 
     def delete_documents_by_source(self, source: str) -> None:
+        self.delete_documents_by_sources([source])
+
+    def delete_documents_by_sources(self, sources: List[str]) -> int:
+        """
+        Deletes every chunk belonging to any of `sources` in one pass. Chunk ids
+        are looked up through a metadata filter without loading texts or
+        embeddings, so the cost scales with the deleted documents rather than
+        the size of the store. Returns the number of chunks deleted.
+        """
         if self.vector_store is None:
             self.vector_store = self._initialize_vector_store()
+        sources = list(dict.fromkeys(source for source in sources if source))
+        if not sources:
+            return 0
+        where = {"source": sources[0]} if len(sources) == 1 else {"source": {"$in": sources}}
         try:
-            db_data = self.vector_store.get()
-            metadatas = db_data.get("metadatas", [])
-            ids = db_data.get("ids", [])
-            docs_to_delete = [id for id, metadata in zip(ids, metadatas) if metadata.get("source", "").strip().lower() == source.strip().lower()]
-            if docs_to_delete:
-                self.vector_store.delete(docs_to_delete)
-                self.vector_store.persist()
-                logging.info(f"Deleted {len(docs_to_delete)} documents with source: {source}")
-            else:
-                logging.info(f"No documents found for source: {source}")
+            ids = self.vector_store.get(where=where, include=[]).get("ids", [])
+            for start in range(0, len(ids), self.write_batch_size):
+                self.vector_store.delete(ids=ids[start:start + self.write_batch_size])
+            self.lexical_index.remove_sources(sources)
         except Exception as e:
             logging.error(f"Error deleting documents by source: {e}")
+            raise VectorStoreError(f"Error deleting documents by source: {e}") from e
+        finally:
+            self._invalidate_answers(sources)
+        if ids:
+            logging.info(f"Deleted {len(ids)} chunks for {len(sources)} sources: {', '.join(sources)}")
+        else:
+            logging.info(f"No documents found for sources: {', '.join(sources)}")
+        return len(ids)
 
     def delete_document_by_id(self, doc_id: str) -> None:
         if self.vector_store is None:
             self.vector_store = self._initialize_vector_store()
         try:
+            stored = self.vector_store.get(ids=[doc_id], include=["metadatas"])
             self.vector_store.delete([doc_id])
-            self.vector_store.persist()
+            self.lexical_index.remove_ids([doc_id])
+            self._invalidate_answers({(metadata or {}).get("source") for metadata in stored.get("metadatas", [])} - {None})
             logging.info(f"Deleted document with ID: {doc_id}")
         except Exception as e:
             logging.error(f"Error deleting document by ID: {doc_id}")
@@ -140,25 +573,28 @@ class VectorStoreService(VectorStoreServiceInterface):
         if self.vector_store is None:
             self.vector_store = self._initialize_vector_store()
         try:
-            db_data = self.vector_store.get()
-            ids = db_data.get("ids", [])
-            if ids:
-                self.vector_store.delete(ids)
-                self.vector_store.persist()
-                logging.info("Successfully deleted all documents from vector store.")
-            else:
-                logging.info("No documents found in vector store to delete.")
+            # Dropping and recreating the collection avoids reading every id back first.
+            self.vector_store.reset_collection()
+            self.lexical_index.clear()
+            if self.answer_cache is not None:
+                self.answer_cache.clear()
+            logging.info("Successfully deleted all documents from vector store.")
         except Exception as e:
             logging.error(f"Error clearing vector store: {e}")
 
-    def list_documents(self) -> list[dict[str, str]]:
-        if self.vector_store is None:
-            self.vector_store = self._initialize_vector_store()
+    def list_documents(self, limit: Optional[int] = None, offset: int = 0) -> list[dict]:
+        """
+        Lists the sources in the store with their chunk counts, sorted by source.
+
+        Counts come from the per-source totals the lexical index keeps up to
+        date on every write, so a page costs O(limit) rather than a scan of
+        every chunk's metadata. `limit` and `offset` page through the sources.
+        Stores indexed before the lexical index existed need
+        `flask --app app rebuild-lexical-index` once.
+        """
         try:
-            db_data = self.vector_store.get()
-            metadatas = db_data.get("metadatas", [])
-            documents = [{"source": metadata.get("source", "Unknown")} for metadata in metadatas]
-            return documents
+            return [{"source": source, "chunks": chunks}
+                    for source, chunks in self.lexical_index.source_counts(limit=limit, offset=offset)]
         except Exception as e:
             logging.error(f"Error listing documents: {e}")
             return []
@@ -167,8 +603,7 @@ class VectorStoreService(VectorStoreServiceInterface):
         if self.vector_store is None:
             self.vector_store = self._initialize_vector_store()
         try:
-            db_data = self.vector_store.get()
-            return len(db_data.get("metadatas", []))
+            return self.vector_store._collection.count()
         except Exception as e:
             logging.error(f"Error getting document count: {e}")
             return 0
@@ -0,0 +1,83 @@
+from typing import List, Sequence, Tuple
+import numpy as np
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English with llama-style tokenizers)."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def pack_context(documents: List, query_embedding: Sequence[float], document_embeddings: Sequence[Sequence[float]],
+                 token_budget: int, lambda_mult: float = 0.7,
+                 duplicate_threshold: float = 0.95) -> Tuple[List, dict]:
+    """
+    Chooses which retrieved documents go into the prompt.
+
+    Documents are picked in maximal marginal relevance order, trading query
+    similarity against similarity to what was already picked (`lambda_mult`
+    weights relevance). Candidates whose cosine similarity to a picked document
+    reaches `duplicate_threshold` are dropped as near-duplicates. Picking stops
+    once the next document would exceed `token_budget` (0 means no budget); the
+    first pick is always kept. The kept documents are returned in their
+    original retrieval order, which is relevance order, together with counts
+    of what was dropped (`chunks_dropped` and `tokens_dropped` include the
+    near-duplicates).
+    """
+    stats = {
+        "chunks_retrieved": len(documents),
+        "chunks_kept": 0,
+        "tokens_kept": 0,
+        "duplicates_dropped": 0,
+        "chunks_dropped": 0,
+        "tokens_dropped": 0,
+        "token_budget": token_budget,
+    }
+    if not documents:
+        return [], stats
+
+    tokens = [estimate_tokens(doc.page_content) for doc in documents]
+    doc_vectors = _normalize(document_embeddings)
+    relevance = doc_vectors @ _normalize(query_embedding)
+    similarity = doc_vectors @ doc_vectors.T
+
+    candidates = list(range(len(documents)))
+    picked = []
+    used = 0
+    while candidates:
+        if picked:
+            redundancy = similarity[np.ix_(candidates, picked)].max(axis=1)
+        else:
+            redundancy = np.zeros(len(candidates), dtype=np.float32)
+
+        duplicates = [index for index, score in zip(candidates, redundancy) if score >= duplicate_threshold]
+        if duplicates:
+            stats["duplicates_dropped"] += len(duplicates)
+            stats["tokens_dropped"] += sum(tokens[index] for index in duplicates)
+            keep = [position for position, index in enumerate(candidates) if index not in duplicates]
+            candidates = [candidates[position] for position in keep]
+            redundancy = redundancy[keep]
+            if not candidates:
+                break
+
+        scores = lambda_mult * relevance[candidates] - (1 - lambda_mult) * redundancy
+        best = candidates[int(np.argmax(scores))]
+        if picked and token_budget and used + tokens[best] > token_budget:
+            break
+        picked.append(best)
+        used += tokens[best]
+        candidates.remove(best)
+
+    stats["chunks_dropped"] = len(candidates) + stats["duplicates_dropped"]
+    stats["tokens_dropped"] += sum(tokens[index] for index in candidates)
+    stats["chunks_kept"] = len(picked)
+    stats["tokens_kept"] = used
+    return [documents[index] for index in sorted(picked)], stats
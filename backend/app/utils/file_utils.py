@@ -2,6 +2,9 @@ import os
 import hashlib
 import shutil
 import logging
+import tempfile
+
+STREAM_CHUNK_SIZE = 1024 * 1024
 
 def file_exists(file_path):
     return os.path.isfile(file_path)
@@ -14,6 +17,32 @@ def compute_file_hash(file):
     file.seek(0)  # Reset file pointer
     return hash_md5.hexdigest()
 
+def stream_to_temp_file(stream, directory, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Copies a stream into a temporary file inside `directory` in a single pass,
+    computing the MD5 hash and byte count as the data goes by.
+
+    Returns a (temp_path, md5_hexdigest, size) tuple. The temporary file lives
+    in the destination directory so it can later be committed with an atomic rename.
+    """
+    hash_md5 = hashlib.md5()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: stream.read(chunk_size), b""):
+                hash_md5.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    return temp_path, hash_md5.hexdigest(), size
+
+def commit_file(temp_path, file_path):
+    """Atomically moves a fully written temporary file to its final location."""
+    os.replace(temp_path, file_path)
+
 def clear_directory(directory_path):
     """
     Clears the specified directory by removing it and then recreating it.
@@ -0,0 +1,30 @@
+from typing import Mapping, Optional
+import jwt
+from ..config.config import Config
+from ..services.chat_history_service import DEFAULT_SESSION
+
+SESSION_HEADER = "X-Session-Id"
+
+
+def resolve_session_id(headers: Mapping, json_content: Optional[dict] = None) -> str:
+    """
+    Picks the chat session for a request: the subject of a valid bearer token,
+    else the X-Session-Id header, else a `session_id` field in the JSON body.
+    Requests carrying none of them share the default session. Token subjects
+    and client-chosen ids are prefixed differently, so a client cannot pick an
+    id that lands in a signed-in user's history.
+    """
+    auth_header = headers.get("Authorization") or ""
+    if auth_header.startswith("Bearer "):
+        try:
+            claims = jwt.decode(auth_header[len("Bearer "):], Config.JWT_SECRET_KEY, algorithms=["HS256"])
+            subject = claims.get("sub") or claims.get("user_id")
+            if subject:
+                return f"user:{subject}"
+        except jwt.InvalidTokenError:
+            pass
+
+    session_id = headers.get(SESSION_HEADER) or (json_content or {}).get("session_id")
+    if session_id:
+        return f"session:{session_id}"
+    return DEFAULT_SESSION
@@ -0,0 +1,6 @@
+import json
+
+
+def format_sse(event: str, data) -> str:
+    """Formats one Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,15 @@
+from app.asgi import create_asgi_app
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# PDF parser workers re-import the main module as __mp_main__; they must not build the app.
+if __name__ != '__mp_main__':
+    app = create_asgi_app(os.getenv('FLASK_ENV') or 'development')
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 5000))
+    uvicorn.run(app, host='0.0.0.0', port=port)
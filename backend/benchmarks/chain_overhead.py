@@ -0,0 +1,111 @@
+"""
+Measures per-request retrieval chain overhead: rebuilt per call versus reused.
+
+Building the chain for every /ask_document call is compared with invoking a
+chain compiled once per prompt type and given the file filter per request.
+
+Usage (from the backend directory):
+    python -m benchmarks.chain_overhead [--requests 200]
+
+The LLM and embeddings are in-process fakes, so the numbers exclude model
+latency and show only the chain construction and invocation overhead.
+"""
+import argparse
+import statistics
+import time
+from langchain.chains import create_retrieval_chain
+from langchain.chains.combine_documents import create_stuff_documents_chain
+from langchain.chains.history_aware_retriever import create_history_aware_retriever
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake import FakeListLLM
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import ConfigurableField
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_ollama import OllamaLLM
+from app.utils.prompts import PROMPTS
+
+HISTORY = []
+QUERY = "What are the payment terms?"
+SOURCES = ["a.pdf", "b.pdf", "c.pdf"]
+
+
+def _retriever_prompt():
+    return ChatPromptTemplate.from_messages([
+        MessagesPlaceholder(variable_name="chat_history"),
+        ("human", "{input}"),
+        ("human", "Given the above conversation, generate a search query to lookup in order to get information relevant to the conversation"),
+    ])
+
+
+def _vector_store():
+    store = InMemoryVectorStore(DeterministicFakeEmbedding(size=64))
+    store.add_documents([
+        Document(page_content=f"{source} section {i}: payment terms are net {i} days.", metadata={"source": source})
+        for source in SOURCES for i in range(50)
+    ])
+    return store
+
+
+def _filter(selected_files):
+    return lambda doc: doc.metadata.get("source") in selected_files
+
+
+def rebuilt_per_request(store, llm, prompt, selected_files):
+    """The previous behaviour: every request rebuilds the prompt, retriever, chains and an Ollama client."""
+    retriever = store.as_retriever(search_kwargs={"k": 5, "filter": _filter(selected_files)})
+    history_aware_retriever = create_history_aware_retriever(llm=llm, retriever=retriever, prompt=_retriever_prompt())
+    OllamaLLM(model="llama3")  # The client construction each request used to pay for; never called.
+    document_chain = create_stuff_documents_chain(llm, prompt)
+    chain = create_retrieval_chain(history_aware_retriever, document_chain)
+    return chain.invoke({"input": QUERY, "chat_history": HISTORY})
+
+
+def build_cached_chain(store, llm, prompt):
+    retriever = store.as_retriever(search_kwargs={"k": 5}).configurable_fields(
+        search_kwargs=ConfigurableField(id="search_kwargs")
+    )
+    history_aware_retriever = create_history_aware_retriever(llm=llm, retriever=retriever, prompt=_retriever_prompt())
+    return create_retrieval_chain(history_aware_retriever, create_stuff_documents_chain(llm, prompt))
+
+
+def reused(chain, selected_files):
+    config = {"configurable": {"search_kwargs": {"k": 5, "filter": _filter(selected_files)}}}
+    return chain.invoke({"input": QUERY, "chat_history": HISTORY}, config=config)
+
+
+def _time(func, requests):
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run(requests: int) -> None:
+    store = _vector_store()
+    llm = FakeListLLM(responses=["answer"])
+    prompt = next(iter(PROMPTS.values()))
+    selected_files = SOURCES[:2]
+    chain = build_cached_chain(store, llm, prompt)
+
+    # Warm up imports and lazy initialisation before measuring.
+    rebuilt_per_request(store, llm, prompt, selected_files)
+    reused(chain, selected_files)
+
+    print(f"{'variant':<12}{'requests':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, func in [
+        ("rebuilt", lambda: rebuilt_per_request(store, llm, prompt, selected_files)),
+        ("reused", lambda: reused(chain, selected_files)),
+    ]:
+        samples = sorted(_time(func, requests))
+        print(f"{name:<12}{requests:>10}{statistics.mean(samples):>10.2f}"
+              f"{samples[len(samples) // 2]:>10.2f}{samples[int(len(samples) * 0.95) - 1]:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    run(args.requests)
@@ -0,0 +1,72 @@
+"""
+Compares PDF text extraction engines on a directory of sample PDFs.
+
+Usage (from the backend directory):
+    python -m benchmarks.pdf_engines path/to/sample_pdfs [--engines pdfplumber pdfium auto]
+
+For each engine it reports pages per second and, for engines other than the
+pdfplumber baseline, the average per-page text similarity against pdfplumber's
+output (word-count overlap, so it stays linear on large PDFs).
+"""
+import argparse
+import os
+import re
+import time
+from collections import Counter
+from app.services.pdf_extraction_service import PDF_ENGINES, extract_page_range, _count_pages
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _similarity(a: str, b: str) -> float:
+    """Dice coefficient over the two pages' word counts: 1.0 for the same words, 0.0 for none in common."""
+    words_a, words_b = Counter(a.split()), Counter(b.split())
+    total = sum(words_a.values()) + sum(words_b.values())
+    if not total:
+        return 1.0
+    return 2 * sum((words_a & words_b).values()) / total
+
+
+def run(sample_dir: str, engines: list[str]) -> None:
+    paths = sorted(
+        os.path.join(sample_dir, name) for name in os.listdir(sample_dir) if name.lower().endswith(".pdf")
+    )
+    if not paths:
+        raise SystemExit(f"No PDF files found in {sample_dir}")
+
+    outputs = {}
+    print(f"{'engine':<12}{'files':>7}{'pages':>8}{'seconds':>10}{'pages/s':>10}{'similarity':>12}")
+    for engine in ["pdfplumber"] + [e for e in engines if e != "pdfplumber"]:
+        started = time.perf_counter()
+        texts = {}
+        page_total = 0
+        for path in paths:
+            page_count = _count_pages(path)
+            page_total += page_count
+            pages = extract_page_range(path, 0, page_count, engine)
+            texts[path] = [_normalize(text) for _, text in pages]
+        elapsed = time.perf_counter() - started
+        outputs[engine] = texts
+
+        if engine == "pdfplumber":
+            similarity = "baseline"
+        else:
+            scores = [
+                _similarity(baseline_page, page)
+                for path in paths
+                for baseline_page, page in zip(outputs["pdfplumber"][path], texts[path])
+            ]
+            similarity = f"{sum(scores) / len(scores):.3f}" if scores else "n/a"
+        if engine in engines:
+            print(f"{engine:<12}{len(paths):>7}{page_total:>8}{elapsed:>10.2f}"
+                  f"{page_total / elapsed if elapsed else 0:>10.1f}{similarity:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sample_dir", help="Directory containing sample PDF files")
+    parser.add_argument("--engines", nargs="+", choices=PDF_ENGINES, default=list(PDF_ENGINES))
+    args = parser.parse_args()
+    run(args.sample_dir, args.engines)
@@ -1,5 +1,12 @@
+import os
+from types import SimpleNamespace
 import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake import FakeStreamingListLLM
 from app import create_app
+from app.config.config import Config
+
+FAKE_ANSWER = "Refunds are accepted within 30 days."
 
 @pytest.fixture(scope='module')
 def test_client():
@@ -9,4 +16,97 @@ def test_client():
     with flask_app.test_client() as testing_client:
         # Establish an application context
         with flask_app.app_context():
-            yield testing_client
\ No newline at end of file
+            yield testing_client
+
+
+class FakeUploadthing:
+    def upload(self, path, size):
+        key = os.path.basename(path)
+        return {"url": f"https://utfs.io/f/{key}", "key": key}
+
+    async def aupload(self, path, size):
+        return self.upload(path, size)
+
+
+class FakeDocumentDetails:
+    def __init__(self):
+        self.details = {}
+
+    def insert_document_detail(self, **detail):
+        self.details[detail["name"]] = detail
+
+    def insert_document_details(self, details):
+        for detail in details:
+            self.insert_document_detail(**detail)
+
+    def replace_document_detail(self, **detail):
+        self.insert_document_detail(**detail)
+
+    def delete_document_detail_by_id(self, document_id):
+        pass
+
+    def list_document_details(self):
+        return list(self.details.values())
+
+    def clear_db(self):
+        self.details.clear()
+
+
+@pytest.fixture(scope='session')
+def api_services(tmp_path_factory):
+    """
+    The route modules build their services when imported, so the data paths
+    are pointed at a temporary directory and Ollama, FastEmbed, Uploadthing
+    and MongoDB are swapped for fakes before the modules are loaded.
+    """
+    from app.services import vector_store_service as vector_store_module
+    from app.services.chat_history_service import ChatHistoryService
+    from app.services.hash_index_service import HashIndexService
+    from app.services.stats_service import StatsService
+
+    data_dir = tmp_path_factory.mktemp("data")
+    monkeypatch = pytest.MonkeyPatch()
+    for name in ("DB_FOLDER", "PDF_DIR", "DOCX_DIR", "CSV_DIR", "XLSX_DIR", "UPLOAD_STAGING_DIR"):
+        monkeypatch.setattr(Config, name, str(data_dir / name.lower()))
+    monkeypatch.setattr(Config, "HASH_INDEX_PATH", str(data_dir / "hash_index.sqlite3"))
+    monkeypatch.setattr(Config, "LEXICAL_INDEX_PATH", str(data_dir / "lexical_index.sqlite3"))
+    monkeypatch.setattr(Config, "INGEST_JOB_PATH", str(data_dir / "ingest_jobs.sqlite3"))
+    monkeypatch.setattr(Config, "ANSWER_CACHE_SYNC_PATH", str(data_dir / "answer_cache.sqlite3"))
+    monkeypatch.setattr(Config, "MONGO_URI", "mongodb://localhost:27017/docparser_test")
+    monkeypatch.setattr(Config, "HISTORY_SUMMARY_ENABLED", False)
+    monkeypatch.setattr(Config, "LOGS_DIR", str(data_dir))
+    for service in (vector_store_module.VectorStoreService, ChatHistoryService, HashIndexService, StatsService):
+        monkeypatch.setattr(service, "_instance", None)
+    monkeypatch.setattr(vector_store_module.VectorStoreService, "_create_embedding",
+                        lambda self: DeterministicFakeEmbedding(size=32))
+    llm = FakeStreamingListLLM(responses=[FAKE_ANSWER])
+    monkeypatch.setattr(vector_store_module.llm_service, "llm", llm)
+
+    from app.api import document_routes, query_routes
+    query_routes.llm_service.llm = llm
+    for document_service in (document_routes.document_service, query_routes.document_service):
+        document_service.uploadthing_service = FakeUploadthing()
+        document_service.document_detail_model = FakeDocumentDetails()
+
+    yield SimpleNamespace(
+        llm=llm,
+        data_dir=data_dir,
+        document_service=document_routes.document_service,
+        vector_store_service=document_routes.vector_store_service,
+        ingestion_service=document_routes.ingestion_service,
+        chat_history_service=query_routes.chat_history_service,
+        stats_service=query_routes.stats_service,
+    )
+    monkeypatch.undo()
+
+
+@pytest.fixture(scope='session')
+def flask_client(api_services):
+    return create_app('testing').test_client()
+
+
+@pytest.fixture(scope='session')
+def asgi_client(api_services):
+    from fastapi.testclient import TestClient
+    from app.asgi import create_asgi_app
+    return TestClient(create_asgi_app('testing'))
@@ -0,0 +1,89 @@
+from app.core.models.document import Document
+from app.services.answer_cache_service import AnswerCacheService, normalize_query
+
+def _result(answer, *sources):
+    return {"answer": answer, "context": [Document(page_content="text", metadata={"source": s}) for s in sources]}
+
+def test_normalize_query():
+    assert normalize_query("  What is   the Policy? ") == "what is the policy"
+
+def test_exact_hit_is_scoped_by_prompt_and_files():
+    cache = AnswerCacheService(max_entries=10, ttl=60, similarity_threshold=0)
+    cache.put("What is the policy?", "default", ["a.pdf"], _result("yes", "a.pdf"))
+    assert cache.get("what is the policy", "default", ["a.pdf"])["answer"] == "yes"
+    assert cache.get("what is the policy", "summary", ["a.pdf"]) is None
+    assert cache.get("what is the policy", "default", ["b.pdf"]) is None
+
+def test_near_duplicate_match_uses_similarity_threshold():
+    vectors = {"refund policy": [1.0, 0.0], "the refund policy": [0.99, 0.05], "office hours": [0.0, 1.0]}
+    cache = AnswerCacheService(max_entries=10, ttl=60, similarity_threshold=0.95, embed_query=vectors.get)
+    cache.put("refund policy", "default", None, _result("30 days", "a.pdf"))
+    assert cache.get("the refund policy", "default", None)["answer"] == "30 days"
+    assert cache.get("office hours", "default", None) is None
+
+def test_lru_eviction():
+    cache = AnswerCacheService(max_entries=2, ttl=60, similarity_threshold=0)
+    cache.put("q1", "default", None, _result("1"))
+    cache.put("q2", "default", None, _result("2"))
+    cache.get("q1", "default", None)
+    cache.put("q3", "default", None, _result("3"))
+    assert cache.get("q2", "default", None) is None
+    assert cache.get("q1", "default", None) is not None
+
+def test_invalidation_by_cited_source():
+    cache = AnswerCacheService(max_entries=10, ttl=60, similarity_threshold=0)
+    cache.put("q1", "default", ["a.pdf", "b.pdf"], _result("1", "a.pdf"))
+    cache.put("q2", "default", ["c.pdf"], _result("2", "c.pdf"))
+    cache.invalidate_sources(["a.pdf"])
+    assert cache.get("q1", "default", ["a.pdf", "b.pdf"]) is None
+    assert cache.get("q2", "default", ["c.pdf"]) is not None
+
+def test_invalidation_reaches_other_workers_through_the_sync_log(tmp_path):
+    sync_path = str(tmp_path / "answer_cache.sqlite3")
+    worker_a = AnswerCacheService(max_entries=10, ttl=60, similarity_threshold=0, sync_path=sync_path)
+    worker_b = AnswerCacheService(max_entries=10, ttl=60, similarity_threshold=0, sync_path=sync_path)
+    for cache in (worker_a, worker_b):
+        cache.put("q1", "default", ["a.pdf"], _result("1", "a.pdf"))
+        cache.put("q2", "default", ["c.pdf"], _result("2", "c.pdf"))
+
+    worker_a.invalidate_sources(["a.pdf"])
+    assert worker_b.get("q1", "default", ["a.pdf"]) is None
+    assert worker_b.get("q2", "default", ["c.pdf"]) is not None
+
+    worker_b.clear()
+    assert worker_a.get("q2", "default", ["c.pdf"]) is None
+    # A worker started later has nothing cached, so it skips the log written before it.
+    worker_c = AnswerCacheService(max_entries=10, ttl=60, similarity_threshold=0, sync_path=sync_path)
+    worker_c.put("q2", "default", ["c.pdf"], _result("2", "c.pdf"))
+    assert worker_c.get("q2", "default", ["c.pdf"]) is not None
+
+def test_answer_is_not_stored_if_sources_changed_while_it_was_generated(tmp_path):
+    sync_path = str(tmp_path / "answer_cache.sqlite3")
+    worker_a = AnswerCacheService(max_entries=10, ttl=60, similarity_threshold=0, sync_path=sync_path)
+    worker_b = AnswerCacheService(max_entries=10, ttl=60, similarity_threshold=0, sync_path=sync_path)
+
+    generation = worker_a.generation()
+    worker_a.invalidate_sources(["a.pdf"])
+    assert not worker_a.put("q1", "default", None, _result("stale", "a.pdf"), generation)
+    assert worker_a.get("q1", "default", None) is None
+
+    # An invalidation logged by another worker counts too.
+    generation = worker_a.generation()
+    worker_b.invalidate_sources(["a.pdf"])
+    assert not worker_a.put("q1", "default", None, _result("stale", "a.pdf"), generation)
+
+    assert worker_a.put("q1", "default", None, _result("fresh", "a.pdf"), worker_a.generation())
+    assert worker_a.get("q1", "default", None)["answer"] == "fresh"
+
+def test_answer_query_skips_the_cache_when_a_document_changes_mid_answer(api_services, monkeypatch):
+    service = api_services.vector_store_service
+    cache = service.answer_cache
+
+    def answer_while_replacing(query, *args, **kwargs):
+        # Another request re-ingests the cited document while this answer is generated.
+        cache.invalidate_sources(["contract.pdf"])
+        return _result("old terms", "contract.pdf")
+
+    monkeypatch.setattr(service, "query_vector_store", answer_while_replacing)
+    assert service.answer_query("What are the contract terms?", "default")["cached"] is False
+    assert cache.get("What are the contract terms?", "default") is None
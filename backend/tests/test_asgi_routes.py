@@ -0,0 +1,162 @@
+import io
+import os
+import time
+import pytest
+from app.core.exceptions import VectorStoreError
+from app.core.models.document import Document
+from app.services.prompt_service import PROMPTS
+
+PROMPT_TYPE = next(iter(PROMPTS))
+
+@pytest.fixture(scope='module', autouse=True)
+def indexed_policy(api_services):
+    api_services.vector_store_service.add_documents(
+        [Document(page_content="Refunds are accepted within 30 days of purchase.", metadata={"source": "policy.pdf"})],
+        "policy.pdf",
+    )
+
+def _wait_for_job(client, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/ingest_jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Ingestion job {job_id} did not finish")
+
+@pytest.mark.parametrize("method, path, kwargs", [
+    ("post", "/api/ai", {"json": {}}),
+    ("post", "/api/ask_document", {"json": {"promptType": PROMPT_TYPE}}),
+    ("post", "/api/ask_document", {"json": {"query": "refunds?", "promptType": "no-such-prompt"}}),
+    ("post", "/api/ask_document/stream", {"json": {"query": "refunds?", "promptType": "no-such-prompt"}}),
+    ("post", "/api/ai/stream", {"json": {}}),
+    ("post", "/api/upload_document", {"data": {"mode": "async"}}),
+    ("post", "/api/delete_document", {"json": {"file_name": "a.pdf"}}),
+    ("post", "/api/delete_documents", {"json": {"documents": []}}),
+    ("get", "/api/indexed_documents?limit=-1", {}),
+])
+def test_bad_requests_match_flask(flask_client, asgi_client, method, path, kwargs):
+    flask_response = getattr(flask_client, method)(path, **kwargs)
+    asgi_response = getattr(asgi_client, method)(path, **kwargs)
+    assert flask_response.status_code == asgi_response.status_code == 400
+    assert flask_response.get_json() == asgi_response.json()
+
+def test_ask_document_response_matches_flask(flask_client, asgi_client):
+    # The fake embedding scores nothing as relevant, so the BM25 half of hybrid retrieval finds the policy.
+    body = {"query": "Are refunds accepted?", "promptType": PROMPT_TYPE, "retrieval_mode": "hybrid"}
+    flask_response = flask_client.post("/api/ask_document", json=body, headers={"X-Session-Id": "parity-flask"})
+    asgi_response = asgi_client.post("/api/ask_document", json=body, headers={"X-Session-Id": "parity-asgi"})
+    assert flask_response.status_code == asgi_response.status_code == 200
+
+    flask_json, asgi_json = flask_response.get_json(), asgi_response.json()
+    assert flask_json.keys() == asgi_json.keys()
+    assert asgi_json["answer"] == flask_json["answer"]
+    assert [source["source"] for source in asgi_json["sources"]] == ["policy.pdf"]
+    assert asgi_json["disclaimer"] is None
+
+def test_async_upload_returns_202_and_queues_a_job(flask_client, asgi_client, api_services):
+    # Each server gets different content, or the second upload is rejected as a duplicate.
+    flask_response = flask_client.post("/api/upload_document?mode=async",
+                                       data={"file": (io.BytesIO(b"item,days\nflask,30\n"), "flask.csv")},
+                                       content_type="multipart/form-data")
+    asgi_response = asgi_client.post("/api/upload_document?mode=async",
+                                     files={"file": ("asgi.csv", b"item,days\nasgi,30\n", "text/csv")})
+    assert flask_response.status_code == asgi_response.status_code == 202
+
+    for payload, name in ((flask_response.get_json(), "flask.csv"), (asgi_response.json(), "asgi.csv")):
+        assert payload["filename"] == name and payload["file_type"] == "csv" and payload["job_id"]
+
+        job = _wait_for_job(asgi_client, payload["job_id"])
+        assert job["status"] == "completed"
+        assert job["result"]["doc_len"] == 1
+        assert name in api_services.document_service.document_detail_model.details
+
+def test_delete_documents_results_match_flask(flask_client, asgi_client, api_services):
+    api_services.vector_store_service.add_documents([Document(page_content="Flask copy", metadata={})], "gone-flask.pdf")
+    api_services.vector_store_service.add_documents([Document(page_content="ASGI copy", metadata={})], "gone-asgi.pdf")
+
+    def delete(client, file_name):
+        body = {"documents": [{"file_name": file_name, "file_type": "pdf"}, {"file_name": "no-type.pdf"}]}
+        return client.post("/api/delete_documents", json=body)
+
+    flask_response = delete(flask_client, "gone-flask.pdf")
+    asgi_response = delete(asgi_client, "gone-asgi.pdf")
+    assert flask_response.status_code == asgi_response.status_code == 200
+
+    flask_json, asgi_json = flask_response.get_json(), asgi_response.json()
+    for payload, file_name in ((flask_json, "gone-flask.pdf"), (asgi_json, "gone-asgi.pdf")):
+        assert payload["results"] == [
+            {"file_name": file_name, "status": "failed", "error": "File not found"},
+            {"file_name": "no-type.pdf", "status": "failed", "error": "Both 'file_name' and 'file_type' are required"},
+        ]
+        # The file was never saved, but its chunks are still cleaned out of the index.
+        assert payload["chunks_deleted"] == 1
+
+def test_delete_document_keeps_the_file_when_chunk_deletion_fails(flask_client, asgi_client, api_services,
+                                                                  monkeypatch):
+    def fail(source):
+        raise VectorStoreError("Chroma is unavailable")
+
+    monkeypatch.setattr(api_services.vector_store_service, "delete_documents_by_source", fail)
+    for client, name in ((flask_client, "keep-flask.csv"), (asgi_client, "keep-asgi.csv")):
+        path = os.path.join(api_services.document_service.get_document_dir("csv"), name)
+        with open(path, "w") as f:
+            f.write(f"item\n{name}\n")
+
+        response = client.post("/api/delete_document", json={"file_name": name, "file_type": "csv"})
+        assert response.status_code == 500
+        assert os.path.exists(path)
+
+def test_replace_document_reembeds_only_changed_rows(flask_client, asgi_client, api_services, monkeypatch):
+    # Rows this long are packed one per chunk; a batch size of 2 splits every write into several calls.
+    monkeypatch.setattr(api_services.vector_store_service, "write_batch_size", 2)
+    rows = {key: f"{key}," + key * 1500 for key in "abcde"}
+    vector_store = api_services.vector_store_service
+
+    def csv_body(name, keys, changed=()):
+        # The header differs per server, or one server's revision duplicates the other's.
+        return (f"key,{name}\n" + "\n".join(rows[key] + ("!" if key in changed else "") for key in keys) + "\n").encode()
+
+    for client, name in ((flask_client, "replace-flask.csv"), (asgi_client, "replace-asgi.csv")):
+        def post(path, body):
+            if client is flask_client:
+                response = client.post(path, data={"file": (io.BytesIO(body), name)}, content_type="multipart/form-data")
+                return response.status_code, response.get_json()
+            response = client.post(path, files={"file": (name, body, "text/csv")})
+            return response.status_code, response.json()
+
+        status, payload = post("/api/upload_document", csv_body(name, "abcde"))
+        assert status == 200 and payload["doc_len"] == 5
+
+        # Row b changes and row d is dropped; a, c and e keep their embeddings.
+        status, payload = post("/api/replace_document", csv_body(name, "abce", changed="b"))
+        assert status == 200
+        assert (payload["added"], payload["deleted"], payload["unchanged"]) == (1, 2, 3)
+        assert payload["embeddings_skipped"] == 3
+
+        stored = vector_store.vector_store.get(where={"source": name}, include=["documents", "metadatas"])
+        rows_by_text = {text.splitlines()[1].replace(" | ", ","): metadata
+                        for text, metadata in zip(stored["documents"], stored["metadatas"])}
+        assert sorted(rows_by_text) == sorted([rows["a"], rows["b"] + "!", rows["c"], rows["e"]])
+        # Kept chunks carry the new row numbers: e moved up from row 6 to row 5.
+        assert (rows_by_text[rows["e"]]["row_start"], rows_by_text[rows["e"]]["row_end"]) == (5, 5)
+
+def test_indexed_documents_pages_over_sources(flask_client, asgi_client, api_services):
+    vector_store = api_services.vector_store_service
+    vector_store.add_documents([Document(page_content=f"Listed chunk {i}", metadata={}) for i in range(3)], "listed-a.pdf")
+    vector_store.add_documents([Document(page_content="Listed chunk b", metadata={})], "listed-b.pdf")
+
+    everything = asgi_client.get("/api/indexed_documents").json()
+    sources = [document["source"] for document in everything["documents"]]
+    assert sources == sorted(sources)
+    counts = {document["source"]: document["chunks"] for document in everything["documents"]}
+    assert counts["listed-a.pdf"] == 3 and counts["listed-b.pdf"] == 1
+    # Every chunk in the collection is counted under exactly one source.
+    assert sum(counts.values()) == everything["chunk_count"] == vector_store.get_document_count()
+
+    offset = sources.index("listed-a.pdf")
+    flask_page = flask_client.get(f"/api/indexed_documents?limit=2&offset={offset}").get_json()
+    asgi_page = asgi_client.get(f"/api/indexed_documents?limit=2&offset={offset}").json()
+    assert flask_page == asgi_page
+    assert asgi_page["documents"] == everything["documents"][offset:offset + 2]
+    assert asgi_page["documents"][0] == {"source": "listed-a.pdf", "chunks": 3}
@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.mark.parametrize("module", ["benchmarks.chain_overhead", "benchmarks.pdf_engines"])
+def test_benchmark_import_does_not_build_services(module):
+    # A fresh interpreter, since this test session has already loaded the route modules.
+    check = (
+        f"import sys, {module}\n"
+        "loaded = sorted(name for name in sys.modules if name.startswith(('app.api', 'app.asgi')))\n"
+        "assert not loaded, loaded\n"
+    )
+    result = subprocess.run([sys.executable, "-c", check], cwd=BACKEND_DIR, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
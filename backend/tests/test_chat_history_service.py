@@ -0,0 +1,148 @@
+import threading
+import jwt
+import pytest
+from langchain_core.language_models.fake import FakeListLLM
+from app.config.config import Config
+from app.services import chat_history_service as chs
+from app.services.chat_history_service import ChatHistoryService, DEFAULT_SESSION
+from app.utils.context_packing import estimate_tokens
+from app.utils.session import resolve_session_id
+
+@pytest.fixture
+def history():
+    ChatHistoryService._instance = None
+    service = ChatHistoryService(store="memory", max_turns=2, ttl=60, max_sessions=2, summarize=False)
+    yield service
+    ChatHistoryService._instance = None
+
+def test_sessions_are_separate(history):
+    history.append("a", "q1", "a1")
+    history.append("b", "q2", "a2")
+    assert [m.content for m in history.get("a")] == ["q1", "a1"]
+    assert [m.content for m in history.get("b")] == ["q2", "a2"]
+    history.clear("a")
+    assert history.get("a") == []
+
+def test_turn_window_is_bounded(history):
+    for i in range(5):
+        history.append("a", f"q{i}", f"a{i}")
+    assert [m.content for m in history.get("a")] == ["q3", "a3", "q4", "a4"]
+
+def test_idle_sessions_expire(history, monkeypatch):
+    monkeypatch.setattr(chs.time, "time", lambda: 1000.0)
+    history.append("a", "q", "a")
+    monkeypatch.setattr(chs.time, "time", lambda: 1061.0)
+    assert history.get("a") == []
+
+def test_least_recently_updated_session_is_evicted(history):
+    history.append("a", "q", "a")
+    history.append("b", "q", "a")
+    history.append("a", "q", "a")
+    history.append("c", "q", "a")
+    assert history.get("b") == []
+    assert history.get_stats()["sessions"] == 2
+
+def test_resolve_session_id():
+    token = jwt.encode({"sub": "alice"}, Config.JWT_SECRET_KEY, algorithm="HS256")
+    assert resolve_session_id({"Authorization": f"Bearer {token}", "X-Session-Id": "x"}) == "user:alice"
+    assert resolve_session_id({"Authorization": "Bearer forged", "X-Session-Id": "x"}) == "session:x"
+    assert resolve_session_id({}, {"session_id": "y"}) == "session:y"
+    assert resolve_session_id({}) == DEFAULT_SESSION
+
+@pytest.fixture
+def compacting_history():
+    ChatHistoryService._instance = None
+    service = ChatHistoryService(store="memory", max_turns=10, ttl=60, summarize=True, verbatim_turns=2,
+                                 llm=FakeListLLM(responses=["user asked about refunds"]))
+    yield service
+    ChatHistoryService._instance = None
+
+def _wait_for_summaries(service):
+    # The summary pool has a single worker, so this runs after every queued compaction.
+    service._summary_executor.submit(lambda: None).result()
+
+def test_old_turns_are_folded_into_a_summary(compacting_history):
+    for i in range(4):
+        compacting_history.append("a", f"question {i} " * 20, f"answer {i} " * 20)
+        _wait_for_summaries(compacting_history)
+    messages = compacting_history.get("a")
+    assert messages[0].type == "system"
+    assert messages[0].content.endswith("user asked about refunds")
+    assert [m.content.split()[1] for m in messages[1:]] == ["2", "2", "3", "3"]
+
+    stats = compacting_history.get_stats()["compaction"]
+    assert stats["turns_folded"] == 2
+    assert stats["tokens_saved"] > 0
+
+def test_short_sessions_are_not_summarized(compacting_history):
+    compacting_history.append("a", "q", "a")
+    compacting_history.append("a", "q", "a")
+    _wait_for_summaries(compacting_history)
+    assert [m.type for m in compacting_history.get("a")] == ["human", "ai", "human", "ai"]
+    assert compacting_history.get_stats()["compaction"]["compactions"] == 0
+
+def test_compaction_waits_for_a_full_batch(compacting_history):
+    for i in range(3):
+        compacting_history.append("a", f"q{i}", f"a{i}")
+    _wait_for_summaries(compacting_history)
+    assert compacting_history.get_stats()["compaction"]["compactions"] == 0
+
+    compacting_history.append("a", "q3", "a3")
+    _wait_for_summaries(compacting_history)
+    assert compacting_history.get_stats()["compaction"]["compactions"] == 1
+
+def test_tokens_saved_is_measured_against_the_rewrite_window(compacting_history, monkeypatch):
+    monkeypatch.setattr(Config, "QUERY_REWRITE_HISTORY_TURNS", 6)
+    turns = [(f"question {i} " * 20, f"answer {i} " * 20) for i in range(6)]
+    for question, answer in turns:
+        compacting_history.append("a", question, answer)
+        _wait_for_summaries(compacting_history)
+
+    messages = compacting_history.get("a")
+    assert [m.content.split()[1] for m in messages[1:]] == ["4", "4", "5", "5"]
+    # Without the summary the rewriter would have read all six turns word for word.
+    folded = sum(estimate_tokens(text) for turn in turns[:4] for text in turn)
+    stats = compacting_history.get_stats()["compaction"]
+    assert stats["turns_folded"] == 4
+    assert stats["tokens_saved"] == folded - estimate_tokens(messages[0].content) > 0
+
+def test_compaction_is_off_when_the_rewrite_window_fits_the_verbatim_turns(monkeypatch):
+    monkeypatch.setattr(Config, "QUERY_REWRITE_HISTORY_TURNS", 2)
+    monkeypatch.setattr(ChatHistoryService, "_instance", None)
+    service = ChatHistoryService(store="memory", max_turns=10, ttl=60, summarize=True, verbatim_turns=2,
+                                 llm=FakeListLLM(responses=["never used"]))
+    for i in range(4):
+        service.append("a", f"q{i}", f"a{i}")
+    assert service.get_stats()["compaction"]["enabled"] is False
+    assert [m.type for m in service.get("a")][:2] == ["human", "ai"]
+
+class BlockingLLM(FakeListLLM):
+    """Holds every summary until the test releases it."""
+
+    def _call(self, *args, **kwargs):
+        assert SUMMARY_RELEASED.wait(timeout=5)
+        return super()._call(*args, **kwargs)
+
+SUMMARY_RELEASED = threading.Event()
+
+def test_clear_during_compaction_drops_the_stale_summary():
+    ChatHistoryService._instance = None
+    SUMMARY_RELEASED.clear()
+    service = ChatHistoryService(store="memory", max_turns=10, ttl=60, summarize=True, verbatim_turns=2,
+                                 llm=BlockingLLM(responses=["summary of the old conversation"]))
+    try:
+        for i in range(4):
+            service.append("a", f"old question {i}", f"old answer {i}")
+        # The compaction of the old turns is now blocked inside the LLM call.
+        service.clear("a")
+        for i in range(4):
+            service.append("a", f"new question {i}", f"new answer {i}")
+        SUMMARY_RELEASED.set()
+        _wait_for_summaries(service)
+
+        messages = service.get("a")
+        assert all("old" not in message.content for message in messages)
+        assert service.get_stats()["compaction"]["compactions"] == 0
+    finally:
+        SUMMARY_RELEASED.set()
+        ChatHistoryService._instance = None
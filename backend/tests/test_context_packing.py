@@ -0,0 +1,37 @@
+from app.core.models.document import Document
+from app.utils.context_packing import estimate_tokens, pack_context
+
+def _docs(*texts):
+    return [Document(page_content=text, metadata={"source": f"{i}.pdf"}) for i, text in enumerate(texts)]
+
+def test_estimate_tokens():
+    assert estimate_tokens("a" * 400) == 100
+    assert estimate_tokens("") == 1
+
+def test_near_duplicates_are_dropped():
+    docs = _docs("a" * 40, "b" * 40, "c" * 40)
+    kept, stats = pack_context(docs, [1.0, 0.0], [[1.0, 0.0], [0.99, 0.01], [0.6, 0.8]], token_budget=0)
+    assert [doc.page_content[0] for doc in kept] == ["a", "c"]
+    assert stats["duplicates_dropped"] == 1
+    assert stats["chunks_dropped"] == 1
+    assert stats["tokens_dropped"] == 10
+
+def test_budget_stops_packing_and_keeps_relevance_order():
+    docs = _docs("a" * 400, "b" * 400, "c" * 400)
+    embeddings = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+    kept, stats = pack_context(docs, [0.9, 0.1, 0.4], embeddings, token_budget=200)
+    assert [doc.page_content[0] for doc in kept] == ["a", "c"]
+    assert stats["chunks_kept"] == 2
+    assert stats["tokens_kept"] == 200
+    assert stats["chunks_dropped"] == 1
+    assert stats["tokens_dropped"] == 100
+
+def test_first_document_is_kept_even_over_budget():
+    kept, stats = pack_context(_docs("a" * 4000), [1.0], [[1.0]], token_budget=100)
+    assert len(kept) == 1
+    assert stats["chunks_dropped"] == 0
+
+def test_empty_input():
+    kept, stats = pack_context([], [], [], token_budget=100)
+    assert kept == []
+    assert stats["chunks_retrieved"] == 0
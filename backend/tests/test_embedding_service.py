@@ -0,0 +1,110 @@
+import threading
+import pytest
+from app.services import embedding_service as embedding_module
+from app.services.embedding_service import EmbeddingCache, CachedEmbeddings, EmbeddingEngine
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return [float(len(text)), 0.0]
+
+class FakeFastEmbed:
+    """Stands in for FastEmbedEmbeddings: embeds in `batch_size` batches and records every call."""
+    instances = []
+
+    def __init__(self, model_name="fake-model", batch_size=256, threads=None, parallel=None):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.threads = threads
+        self.parallel = parallel
+        self.document_batches = []
+        self.queries = []
+        self.gate = None
+        FakeFastEmbed.instances.append(self)
+
+    def embed_documents(self, texts):
+        if self.gate is not None:
+            assert self.gate.wait(timeout=5)
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            self.document_batches.append(batch)
+            vectors.extend([float(len(text)), float(start + offset)] for offset, text in enumerate(batch))
+        return vectors
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return [float(len(text)), -1.0]
+
+@pytest.fixture
+def engine(monkeypatch):
+    FakeFastEmbed.instances = []
+    monkeypatch.setattr(embedding_module, "FastEmbedEmbeddings", FakeFastEmbed)
+    return EmbeddingEngine(batch_size=2, threads=3, parallel=0, query_threads=1)
+
+def test_engine_returns_vectors_in_input_order(engine):
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+    vectors = engine.embed_documents(texts)
+
+    assert vectors == [[float(len(text)), float(index)] for index, text in enumerate(texts)]
+    assert engine.ingest_model.document_batches == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+    assert (engine.ingest_model.batch_size, engine.ingest_model.threads, engine.ingest_model.parallel) == (2, 3, 0)
+    assert engine.get_stats()["chunks_embedded"] == 5
+
+def test_queries_take_their_own_path(engine):
+    # A query is answered by the single-item query session even while a large ingest batch is running.
+    engine.ingest_model.gate = threading.Event()
+    ingest = threading.Thread(target=engine.embed_documents, args=(["long", "batch"],))
+    ingest.start()
+    try:
+        assert engine.embed_query("refunds?") == [8.0, -1.0]
+    finally:
+        engine.ingest_model.gate.set()
+        ingest.join()
+
+    query_model = engine.query_model
+    assert query_model is not engine.ingest_model
+    assert (query_model.model_name, query_model.batch_size, query_model.threads) == ("fake-model", 1, 1)
+    assert query_model.queries == ["refunds?"] and query_model.document_batches == []
+    assert engine.ingest_model.queries == []
+    stats = engine.get_stats()
+    assert stats["queries_embedded"] == 1 and stats["chunks_embedded"] == 2
+
+def test_cached_embeddings_only_embeds_misses(tmp_path):
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, "test-model", EmbeddingCache(str(tmp_path / "cache.sqlite3")))
+
+    first = embeddings.embed_documents(["alpha", "beta", "alpha"])
+    second = embeddings.embed_documents(["beta", "gamma"])
+
+    assert model.embedded == ["alpha", "beta", "gamma"]
+    assert first == [[5.0, 1.0], [4.0, 1.0], [5.0, 1.0]]
+    assert second == [[4.0, 1.0], [5.0, 1.0]]
+    stats = embeddings.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+    assert stats["entries"] == 3
+
+def test_cache_survives_reopen_and_evicts_by_size(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache(path, max_bytes=10 * 8)  # Room for ten 2-float vectors
+    cache.put_many("m", {f"h{i}": [float(i), 0.0] for i in range(12)})
+    assert cache.get_stats()["size_bytes"] <= 10 * 8
+    assert cache.evictions > 0
+
+    reopened = EmbeddingCache(path, max_bytes=10 * 8)
+    assert reopened.get_many("m", ["h11"]) == {"h11": [11.0, 0.0]}
+
+def test_rewriting_a_vector_does_not_grow_the_size(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024)
+    cache.put_many("m", {"h1": [1.0, 0.0], "h2": [2.0, 0.0]})
+    cache.put_many("m", {"h1": [1.5, 0.0], "h3": [3.0, 0.0]})
+    assert cache.get_stats()["size_bytes"] == 3 * 8
+    assert cache.evictions == 0
@@ -0,0 +1,16 @@
+import hashlib
+import io
+import os
+from app.utils.file_utils import stream_to_temp_file, commit_file
+
+def test_stream_to_temp_file_hashes_and_sizes_in_one_pass(tmp_path):
+    content = os.urandom(3 * 1024 * 1024 + 17)
+    temp_path, file_hash, size = stream_to_temp_file(io.BytesIO(content), str(tmp_path))
+    assert file_hash == hashlib.md5(content).hexdigest()
+    assert size == len(content)
+
+    final_path = str(tmp_path / "upload.pdf")
+    commit_file(temp_path, final_path)
+    assert not os.path.exists(temp_path)
+    with open(final_path, 'rb') as f:
+        assert f.read() == content
@@ -0,0 +1,55 @@
+import pytest
+from app.services.hash_index_service import HashIndexService
+
+@pytest.fixture
+def hash_index(tmp_path):
+    HashIndexService._instance = None
+    index = HashIndexService(str(tmp_path / "hash_index.sqlite3"))
+    yield index
+    HashIndexService._instance = None
+
+def test_find_after_add(hash_index):
+    hash_index.add("pdf", "abc123", "report.pdf")
+    assert hash_index.find("pdf", "abc123") == "report.pdf"
+    assert hash_index.find("docx", "abc123") is None
+
+def test_index_is_persisted(hash_index, tmp_path):
+    hash_index.add("pdf", "abc123", "report.pdf")
+    HashIndexService._instance = None
+    reloaded = HashIndexService(str(tmp_path / "hash_index.sqlite3"))
+    assert reloaded.find("pdf", "abc123") == "report.pdf"
+
+def test_remove_and_clear(hash_index):
+    hash_index.add("pdf", "abc123", "report.pdf")
+    hash_index.add("pdf", "def456", "other.pdf")
+    hash_index.remove("pdf", "report.pdf")
+    assert hash_index.find("pdf", "abc123") is None
+    hash_index.clear("pdf")
+    assert hash_index.find("pdf", "def456") is None
+
+def _second_worker(tmp_path):
+    # Another process has its own singleton and its own connection to the same file.
+    HashIndexService._instance = None
+    other = HashIndexService(str(tmp_path / "hash_index.sqlite3"))
+    HashIndexService._instance = None
+    return other
+
+def test_writes_from_another_worker_are_seen_and_kept(hash_index, tmp_path):
+    other = _second_worker(tmp_path)
+    hash_index.add("pdf", "abc123", "report.pdf")
+    other.add("pdf", "def456", "other.pdf")
+    assert other.find("pdf", "abc123") == "report.pdf"
+    assert hash_index.find("pdf", "def456") == "other.pdf"
+
+def test_claim_lets_only_one_worker_take_a_hash(hash_index, tmp_path):
+    other = _second_worker(tmp_path)
+    assert hash_index.claim("pdf", "abc123", "first.pdf") is None
+    assert other.claim("pdf", "abc123", "second.pdf") == "first.pdf"
+    assert other.find("pdf", "abc123") == "first.pdf"
+
+def test_claim_by_the_same_name_replaces_its_old_hash(hash_index):
+    hash_index.claim("pdf", "v1", "report.pdf")
+    assert hash_index.claim("pdf", "v1", "report.pdf") is None
+    assert hash_index.claim("pdf", "v2", "report.pdf") is None
+    assert hash_index.find("pdf", "v1") is None
+    assert hash_index.find("pdf", "v2") == "report.pdf"
@@ -0,0 +1,163 @@
+import threading
+import time
+import pytest
+from app.core.dtos import SavedUpload
+from app.core.enums import IngestJobStatus
+from app.core.models.document import Document
+from app.core.models.ingest_job import IngestJob
+from app.services.ingestion_service import IngestionService, LOST_JOB_ERROR
+
+class StubDetailModel:
+    def __init__(self):
+        self.inserted = []
+
+    def insert_document_details(self, details):
+        self.inserted.extend(details)
+
+class StubDocumentService:
+    def __init__(self, publish_error=None, parse_gate=None, fail_parse=(), fail_upload=()):
+        self.publish_error = publish_error
+        self.parse_gate = parse_gate
+        self.fail_parse = fail_parse
+        self.fail_upload = fail_upload
+        self.discarded = []
+        self.document_detail_model = StubDetailModel()
+
+    def iter_documents(self, saved, stats):
+        if self.parse_gate is not None:
+            assert self.parse_gate.wait(timeout=5)
+        if saved.filename in self.fail_parse:
+            raise ValueError(f"Cannot parse {saved.filename}")
+        docs = [Document(page_content=f"{saved.filename} text", metadata={"source": saved.filename})]
+        # Tabular files are streamed, like the real loaders do.
+        return (iter(docs) if saved.type == "csv" else docs), True
+
+    def upload_to_remote(self, saved):
+        if saved.filename in self.fail_upload:
+            raise RuntimeError("Uploadthing is down")
+        return {"name": saved.filename}
+
+    def publish_document(self, saved):
+        return self.publish_error
+
+    def discard_upload(self, saved):
+        self.discarded.append(saved.filename)
+
+class StubVectorStore:
+    def __init__(self, fail_sources=()):
+        self.fail_sources = fail_sources
+        self.added = []
+        self.deleted = []
+
+    def add_documents(self, docs, source):
+        docs = list(docs)
+        if source in self.fail_sources:
+            raise RuntimeError(f"Cannot embed {source}")
+        self.added.append(source)
+        return len(docs)
+
+    def add_document_batch(self, items):
+        for docs, source in items:
+            self.add_documents(docs, source)
+
+    def delete_documents_by_source(self, source):
+        self.deleted.append(source)
+
+def _saved(tmp_path, name="report.pdf"):
+    return SavedUpload(filename=name, type=name.rsplit(".", 1)[-1], path=str(tmp_path / name), file_hash="abc", size=4)
+
+@pytest.fixture
+def make_service(tmp_path):
+    services = []
+
+    def make(document_service=None, vector_store=None, heartbeat_interval=30):
+        service = IngestionService(document_service or StubDocumentService(), vector_store or StubVectorStore(),
+                                   max_workers=1, job_history=10, store_path=str(tmp_path / "jobs.sqlite3"),
+                                   heartbeat_interval=heartbeat_interval)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.close()
+
+def _wait_for(service, job_id, statuses, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = service.get_job(job_id)
+        if job is not None and job.status in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} never reached {statuses}")
+
+def test_job_state_is_visible_to_other_workers(tmp_path, make_service):
+    worker_a, worker_b = make_service(), make_service()
+    job = worker_a.submit(_saved(tmp_path))
+
+    finished = _wait_for(worker_b, job.id, {IngestJobStatus.COMPLETED})
+    assert finished.result["doc_len"] == 1
+    assert finished.result["published"] is True
+    assert [stage.status for stage in finished.stages] == [IngestJobStatus.COMPLETED] * 3
+    assert worker_b.get_job("unknown") is None
+
+def test_publish_failure_is_reported_on_the_job(tmp_path, make_service):
+    service = make_service(StubDocumentService(publish_error="Publishing failed: Uploadthing is down"))
+    job = service.submit(_saved(tmp_path))
+
+    finished = _wait_for(service, job.id, {IngestJobStatus.COMPLETED, IngestJobStatus.FAILED})
+    assert finished.status == IngestJobStatus.COMPLETED
+    assert finished.result["published"] is False
+    publish = finished.get_stage("publish")
+    assert publish.status == IngestJobStatus.FAILED
+    assert publish.error == "Publishing failed: Uploadthing is down"
+
+def test_job_of_a_dead_worker_is_rolled_back(tmp_path, make_service):
+    documents, vectors = StubDocumentService(), StubVectorStore()
+    service = make_service(documents, vectors, heartbeat_interval=0.05)
+    lost = IngestJob(filename="lost.pdf", file_type="pdf", status=IngestJobStatus.RUNNING)
+    saved = _saved(tmp_path, "lost.pdf")
+    service.model.insert(lost, vars(saved), owner="worker-that-died")
+
+    failed = _wait_for(service, lost.id, {IngestJobStatus.FAILED})
+    assert failed.error == LOST_JOB_ERROR
+    assert documents.discarded == ["lost.pdf"]
+    assert vectors.deleted == ["lost.pdf"]
+
+def test_running_job_of_a_live_worker_is_not_recovered(tmp_path, make_service):
+    gate = threading.Event()
+    worker_a = make_service(StubDocumentService(parse_gate=gate), heartbeat_interval=0.05)
+    worker_b = make_service(heartbeat_interval=0.05)
+    try:
+        job = worker_a.submit(_saved(tmp_path))
+        time.sleep(0.5)  # Ten heartbeats; the job is long past the lease if nobody refreshes it.
+        assert worker_b.recover_lost_jobs() == 0
+        assert worker_b.get_job(job.id).status == IngestJobStatus.RUNNING
+    finally:
+        gate.set()
+    assert _wait_for(worker_b, job.id, {IngestJobStatus.COMPLETED}).error is None
+
+def test_ingest_batch_reports_each_file_and_cleans_up_failures(tmp_path, make_service):
+    documents = StubDocumentService(fail_parse=("broken.pdf",), fail_upload=("offline.pdf",))
+    vectors = StubVectorStore(fail_sources=("bad-rows.csv",))
+    service = make_service(documents, vectors)
+    names = ["good.pdf", "broken.pdf", "rows.csv", "bad-rows.csv", "offline.pdf"]
+
+    manifest = service.ingest_batch([_saved(tmp_path, name) for name in names])
+
+    by_name = {entry["filename"]: entry for entry in manifest}
+    assert [entry["filename"] for entry in manifest] == names
+    assert {name: entry["status"] for name, entry in by_name.items()} == {
+        "good.pdf": "success", "broken.pdf": "failed", "rows.csv": "success",
+        "bad-rows.csv": "failed", "offline.pdf": "success",
+    }
+    assert by_name["broken.pdf"]["error"] == "Cannot parse broken.pdf"
+    assert by_name["bad-rows.csv"]["error"] == "Cannot embed bad-rows.csv"
+    assert by_name["good.pdf"]["doc_len"] == by_name["rows.csv"]["doc_len"] == 1
+    # An upload failure leaves the file indexed, just not published.
+    assert [name for name, entry in by_name.items() if entry["published"]] == ["good.pdf", "rows.csv"]
+    assert sorted(detail["name"] for detail in documents.document_detail_model.inserted) == ["good.pdf", "rows.csv"]
+
+    # Failed files are removed from disk and the hash index; only those that reached the store lose their chunks.
+    assert sorted(documents.discarded) == ["bad-rows.csv", "broken.pdf"]
+    assert vectors.deleted == ["bad-rows.csv"]
+    assert sorted(vectors.added) == ["good.pdf", "offline.pdf", "rows.csv"]
@@ -0,0 +1,77 @@
+import pytest
+from app.core.models.document import Document
+from app.services.lexical_index_service import LexicalIndexService, tokenize
+from app.services.hybrid_retriever import reciprocal_rank_fusion
+
+@pytest.fixture
+def lexical_index(tmp_path):
+    return LexicalIndexService(str(tmp_path / "lexical_index.sqlite3"))
+
+def _chunk(text, source):
+    return Document(page_content=text, metadata={"source": source})
+
+def test_tokenize_stems_words_and_joins_identifiers():
+    tokens = tokenize("Invoices INV-2024-0042")
+    assert "invoic" in tokens
+    assert "inv20240042" in tokens
+    assert "0042" in tokens
+
+def test_search_finds_exact_identifier(lexical_index):
+    lexical_index.add(["a-1", "b-1"], [
+        _chunk("Invoice INV-2024-0042 was paid in March.", "a.pdf"),
+        _chunk("Invoice INV-2024-0043 is still open.", "b.pdf"),
+    ])
+    results = lexical_index.search("INV-2024-0042", k=5)
+    assert results[0][0] == "a-1"
+
+def test_search_respects_sources(lexical_index):
+    lexical_index.add(["a-1", "b-1"], [
+        _chunk("Clause 4.2.1 covers termination.", "a.pdf"),
+        _chunk("Clause 4.2.1 covers renewal.", "b.pdf"),
+    ])
+    assert [chunk_id for chunk_id, _ in lexical_index.search("clause 4.2.1", k=5, sources=["b.pdf"])] == ["b-1"]
+
+def test_remove_sources_and_ids(lexical_index):
+    lexical_index.add(["a-1", "a-2", "b-1"], [
+        _chunk("alpha widgets", "a.pdf"),
+        _chunk("beta widgets", "a.pdf"),
+        _chunk("gamma widgets", "b.pdf"),
+    ])
+    assert lexical_index.remove_sources(["a.pdf"]) == 2
+    assert lexical_index.remove_ids(["b-1"]) == 1
+    assert lexical_index.search("widgets", k=5) == []
+
+def test_re_adding_an_id_replaces_it(lexical_index):
+    lexical_index.add(["a-1"], [_chunk("old text", "a.pdf")])
+    lexical_index.add(["a-1"], [_chunk("new text", "a.pdf")])
+    assert lexical_index.count() == 1
+    assert lexical_index.search("old", k=5) == []
+
+def test_source_counts_follow_every_write(lexical_index):
+    lexical_index.add(["a-1", "a-2", "b-1", "c-1"], [
+        _chunk("alpha", "a.pdf"), _chunk("beta", "a.pdf"), _chunk("gamma", "b.pdf"), _chunk("delta", "c.pdf"),
+    ])
+    # Re-adding an id moves it to its new source instead of counting it twice.
+    lexical_index.add(["a-2"], [_chunk("beta", "b.pdf")])
+    assert lexical_index.source_counts() == [("a.pdf", 1), ("b.pdf", 2), ("c.pdf", 1)]
+    assert lexical_index.source_counts(limit=2, offset=1) == [("b.pdf", 2), ("c.pdf", 1)]
+    assert lexical_index.source_counts(limit=0) == []
+
+    lexical_index.remove_ids(["a-1"])
+    lexical_index.remove_sources(["c.pdf"])
+    assert lexical_index.source_counts() == [("b.pdf", 2)]
+    lexical_index.clear()
+    assert lexical_index.source_counts() == []
+
+def test_source_counts_are_backfilled_for_existing_indexes(tmp_path):
+    path = str(tmp_path / "lexical_index.sqlite3")
+    LexicalIndexService(path).add(["a-1", "a-2"], [_chunk("alpha", "a.pdf"), _chunk("beta", "a.pdf")])
+    index = LexicalIndexService(path)
+    index._conn.execute("DROP TABLE source_counts")
+    index._conn.commit()
+    assert LexicalIndexService(path).source_counts() == [("a.pdf", 2)]
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "w"]], rrf_k=60)
+    assert fused[0][0] == "y"
+    assert {doc_id for doc_id, _ in fused} == {"x", "y", "z", "w"}
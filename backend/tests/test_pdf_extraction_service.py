@@ -0,0 +1,101 @@
+import os
+import runpy
+import threading
+import time
+import pytest
+from app.core.dtos import SavedUpload
+from app.core.exceptions import DocumentExtractionError
+from app.services import pdf_extraction_service as extraction_module
+from app.services.pdf_extraction_service import PdfExtractionService, extract_page_range
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def write_pdf(path, page_texts):
+    """Writes a minimal PDF with one line of Helvetica text per page."""
+    page_ids = [4 + 2 * index for index in range(len(page_texts))]
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        2: f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_texts)} >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for page_id, text in zip(page_ids, page_texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects[page_id] = ("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>")
+        objects[page_id + 1] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+
+    body, offsets = b"%PDF-1.4\n", {}
+    for number in sorted(objects):
+        offsets[number] = len(body)
+        body += f"{number} 0 obj\n{objects[number]}\nendobj\n".encode()
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    body += "".join(f"{offsets[number]:010d} 00000 n \n" for number in sorted(objects)).encode()
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(body)
+    return str(path)
+
+def slow_page_range(path, start, end, engine="pdfplumber"):
+    # Runs in a parser worker; only the document named "slow" hangs.
+    if "slow" in os.path.basename(path):
+        time.sleep(30)
+    return extract_page_range(path, start, end, engine)
+
+@pytest.fixture
+def extraction(monkeypatch):
+    monkeypatch.setattr(PdfExtractionService, "_instance", None)
+    service = PdfExtractionService(workers=2, pages_per_task=1, task_timeout=20)
+    yield service
+    PdfExtractionService._instance = None
+
+@pytest.mark.parametrize("engine", ["pdfplumber", "pdfium", "auto"])
+def test_pages_come_back_in_document_order(tmp_path, extraction, engine):
+    texts = [f"Page {number} text" for number in range(1, 6)]
+    pages = extraction.extract_pages(write_pdf(tmp_path / "five.pdf", texts), engine)
+    assert [page_number for page_number, _ in pages] == [1, 2, 3, 4, 5]
+    assert [text.strip() for _, text in pages] == texts
+
+def test_timeout_fails_only_the_slow_document(tmp_path, extraction, monkeypatch):
+    monkeypatch.setattr(extraction_module, "extract_page_range", slow_page_range)
+    monkeypatch.setattr(extraction, "task_timeout", 3)
+    slow = write_pdf(tmp_path / "slow.pdf", ["Stuck"])
+    fast = write_pdf(tmp_path / "fast.pdf", ["Quick"])
+
+    results = {}
+    def extract(path):
+        try:
+            results[path] = extraction.extract_pages(path, "pdfium")
+        except DocumentExtractionError as e:
+            results[path] = e
+
+    threads = [threading.Thread(target=extract, args=(path,)) for path in (slow, fast)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert isinstance(results[slow], DocumentExtractionError)
+    assert "timed out" in str(results[slow])
+    assert [(page_number, text.strip()) for page_number, text in results[fast]] == [(1, "Quick")]
+
+def test_loaded_pdf_documents_carry_page_metadata(tmp_path, api_services, extraction):
+    path = write_pdf(tmp_path / "paged.pdf", ["First page", "", "Third page"])
+    saved = SavedUpload(filename="paged.pdf", type="pdf", path=path, file_hash="abc", size=os.path.getsize(path))
+    document_service = api_services.document_service
+    original = document_service.pdf_extraction_service
+    document_service.pdf_extraction_service = extraction
+    try:
+        docs, is_structured = document_service.load_documents(saved)
+    finally:
+        document_service.pdf_extraction_service = original
+
+    assert is_structured
+    # The blank second page is dropped; the others keep their own page numbers.
+    assert [(doc.metadata["source"], doc.metadata["page"]) for doc in docs] == [("paged.pdf", 1), ("paged.pdf", 3)]
+    assert [doc.page_content for doc in docs] == ["First page", "Third page"]
+
+@pytest.mark.parametrize("entry_point", ["app.py", "asgi.py"])
+def test_entry_points_do_not_build_the_app_in_parser_workers(entry_point):
+    namespace = runpy.run_path(os.path.join(BACKEND_DIR, entry_point), run_name="__mp_main__")
+    assert "app" not in namespace
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from langchain_core.language_models.fake import FakeListLLM
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from app.services.query_rewrite_service import QueryRewriteService, looks_like_follow_up
+
+HISTORY = [HumanMessage(content="What is the refund policy?"), AIMessage(content="Refunds within 30 days.")]
+
+@pytest.fixture
+def rewriter():
+    return QueryRewriteService(FakeListLLM(responses=["refund policy exceptions"]), mode="heuristic",
+                               cache_size=10, history_turns=3)
+
+def test_looks_like_follow_up():
+    assert looks_like_follow_up("and for contractors?")
+    assert looks_like_follow_up("does it apply to them")
+    assert looks_like_follow_up("why?")
+    assert not looks_like_follow_up("What is the travel reimbursement limit for managers?")
+
+def test_no_history_never_calls_the_llm(rewriter):
+    assert rewriter.rewrite("why?", []) == "why?"
+    assert rewriter.get_stats()["modes"]["heuristic"]["skipped"] == 1
+
+def test_heuristic_rewrites_follow_ups_only(rewriter):
+    assert rewriter.rewrite("What is the travel reimbursement limit for managers?", HISTORY) == \
+        "What is the travel reimbursement limit for managers?"
+    assert rewriter.rewrite("are there exceptions to it?", HISTORY) == "refund policy exceptions"
+
+def test_rewrites_are_cached(rewriter):
+    rewriter.rewrite("are there exceptions to it?", HISTORY)
+    rewriter.rewrite("are there exceptions to it?", HISTORY)
+    stats = rewriter.get_stats()["modes"]["heuristic"]
+    assert stats["rewrites"] == 1
+    assert stats["cache_hits"] == 1
+
+def test_never_and_always_modes(rewriter):
+    query = "What is the travel reimbursement limit for managers?"
+    assert rewriter.rewrite(query, HISTORY, mode="never") == query
+    assert rewriter.rewrite(query, HISTORY, mode="always") == "refund policy exceptions"
+
+def test_unknown_mode_is_rejected(rewriter):
+    with pytest.raises(ValueError):
+        rewriter.rewrite("why?", HISTORY, mode="sometimes")
+
+def test_async_rewrite_shares_the_cache(rewriter):
+    assert asyncio.run(rewriter.arewrite("are there exceptions to it?", HISTORY)) == "refund policy exceptions"
+    assert rewriter.rewrite("are there exceptions to it?", HISTORY) == "refund policy exceptions"
+    assert rewriter.get_stats()["modes"]["heuristic"]["cache_hits"] == 1
+
+def test_summary_is_kept_ahead_of_recent_turns():
+    rewriter = QueryRewriteService(FakeListLLM(responses=["x"]), mode="always", cache_size=10, history_turns=1)
+    history = [SystemMessage(content="Summary")] + HISTORY * 2
+    assert [m.content for m in rewriter._recent(history)] == ["Summary", "What is the refund policy?",
+                                                             "Refunds within 30 days."]
@@ -0,0 +1,52 @@
+import pytest
+from app.config.config import Config
+from app.core.models.document import Document
+from app.services.prompt_service import PROMPTS
+from app.services.rerank_service import RerankService
+
+class StubCrossEncoder:
+    """Scores a text by how many of the query's words it contains."""
+
+    def __init__(self):
+        self.calls = []
+
+    def rerank(self, query, texts, batch_size):
+        self.calls.append((query, list(texts)))
+        words = set(query.lower().split())
+        return [len(words & set(text.lower().split())) for text in texts]
+
+def _reranker(top_k=2):
+    reranker = RerankService(model_name="stub", top_k=top_k, threads=1)
+    reranker._model = StubCrossEncoder()
+    return reranker
+
+def _docs(*texts):
+    return [Document(page_content=text, metadata={"source": f"{index}.pdf"}) for index, text in enumerate(texts)]
+
+def test_rerank_orders_by_score_and_keeps_top_k():
+    docs = _docs("office hours", "refund within thirty days", "refund policy")
+    ranked = _reranker(top_k=2).rerank("refund policy days", docs)
+    assert [doc.page_content for doc in ranked] == ["refund within thirty days", "refund policy"]
+
+def test_rerank_top_k_argument_overrides_default_and_stats_count_calls():
+    reranker = _reranker(top_k=2)
+    assert len(reranker.rerank("refund", _docs("a", "b", "refund"), top_k=1)) == 1
+    assert reranker.rerank("refund", []) == []
+    stats = reranker.get_stats()
+    assert stats["calls"] == 1
+    assert stats["candidates_scored"] == 3
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_vector_store_reranks_only_when_enabled(api_services, monkeypatch, enabled):
+    service = api_services.vector_store_service
+    service.add_documents(_docs("Invoices are payable within 14 days."), "invoices.pdf")
+    reranker = _reranker() if enabled else None
+    monkeypatch.setattr(service, "reranker", reranker)
+    monkeypatch.setattr(service, "_chains", {})
+
+    assert service._retrieval_k() == (Config.RERANK_CANDIDATES if enabled else service.search_k)
+    result = service.query_vector_store("When are invoices payable?", next(iter(PROMPTS)), retrieval_mode="hybrid")
+    assert "invoices.pdf" in {doc.metadata["source"] for doc in result["context"]}
+    if enabled:
+        assert len(reranker._model.calls) == 1
+        assert len(result["context"]) <= reranker.top_k
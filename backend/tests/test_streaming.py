@@ -0,0 +1,100 @@
+import json
+import pytest
+from app.config.config import Config
+from app.core.models.document import Document
+from app.services.prompt_service import PROMPTS
+from .conftest import FAKE_ANSWER
+
+PROMPT_TYPE = next(iter(PROMPTS))
+
+@pytest.fixture(scope='module', autouse=True)
+def indexed_warranty(api_services):
+    api_services.vector_store_service.add_documents(
+        [Document(page_content="The warranty covers repairs for two years.", metadata={"source": "warranty.pdf"})],
+        "warranty.pdf",
+    )
+
+@pytest.fixture
+def hybrid_by_default(monkeypatch):
+    # The fake embedding scores nothing as relevant; BM25 in hybrid mode still finds the warranty,
+    # and making hybrid the default mode keeps the answer cache in play.
+    monkeypatch.setattr(Config, "RETRIEVAL_MODE", "hybrid")
+
+def _events(chunks):
+    """Parses an SSE body, given as an iterable of text chunks, into (event, data) pairs as they arrive."""
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk.decode() if isinstance(chunk, bytes) else chunk
+        while "\n\n" in buffer:
+            message, buffer = buffer.split("\n\n", 1)
+            fields = dict(line.split(": ", 1) for line in message.splitlines())
+            yield fields["event"], json.loads(fields["data"])
+
+def test_stream_answer_yields_context_tokens_then_result(api_services, hybrid_by_default):
+    events = list(api_services.vector_store_service.stream_answer("What does the warranty cover?", PROMPT_TYPE))
+    names = [event for event, _ in events]
+    assert names[0] == "context" and names[-1] == "result"
+    assert set(names[1:-1]) == {"token"}
+
+    context, result = events[0][1], events[-1][1]
+    assert [doc.metadata["source"] for doc in context["context"]] == ["warranty.pdf"]
+    assert not context["cached"] and not result["cached"]
+    assert result["answer"] == "".join(token for event, token in events if event == "token") == FAKE_ANSWER
+
+def test_stream_answer_replays_cached_answer_as_one_token(api_services, hybrid_by_default):
+    service = api_services.vector_store_service
+    query = "How long is the warranty?"
+    list(service.stream_answer(query, PROMPT_TYPE))
+
+    events = list(service.stream_answer(query, PROMPT_TYPE))
+    assert [event for event, _ in events] == ["context", "token", "result"]
+    assert events[0][1]["cached"] and events[2][1]["cached"]
+    assert events[1][1] == events[2][1]["answer"] == FAKE_ANSWER
+
+def test_ask_document_stream_records_history_and_usage_after_done(flask_client, api_services, hybrid_by_default):
+    session_id = "stream-history"
+    usage_before = api_services.stats_service.document_usage_count.get("warranty.pdf", 0)
+    response = flask_client.post("/api/ask_document/stream", headers={"X-Session-Id": session_id},
+                                 json={"query": "Is the warranty two years?", "promptType": PROMPT_TYPE})
+    assert response.mimetype == "text/event-stream"
+
+    seen = []
+    for event, data in _events(response.response):
+        seen.append(event)
+        if event != "done":
+            # Nothing is recorded while the answer is still being generated.
+            assert api_services.chat_history_service.get(f"session:{session_id}") == []
+            assert api_services.stats_service.document_usage_count.get("warranty.pdf", 0) == usage_before
+        if event == "sources":
+            assert [source["source"] for source in data["sources"]] == ["warranty.pdf"]
+        if event == "done":
+            assert data["answer"] == FAKE_ANSWER
+
+    assert seen[0] == "sources" and seen[-1] == "done"
+    assert set(seen[1:-1]) == {"token"}
+    history = api_services.chat_history_service.get(f"session:{session_id}")
+    assert [message.content for message in history] == ["Is the warranty two years?", FAKE_ANSWER]
+    assert api_services.stats_service.document_usage_count["warranty.pdf"] == usage_before + 1
+
+def test_ask_document_stream_reports_errors_as_an_event(flask_client, api_services, monkeypatch):
+    def failing_stream(*args):
+        yield "context", {"context": [], "cached": False}
+        raise RuntimeError("generation failed")
+
+    monkeypatch.setattr(api_services.vector_store_service, "stream_answer", failing_stream)
+    response = flask_client.post("/api/ask_document/stream", headers={"X-Session-Id": "stream-error"},
+                                 json={"query": "Is the warranty transferable?", "promptType": PROMPT_TYPE})
+
+    events = list(_events(response.response))
+    assert [event for event, _ in events] == ["sources", "error"]
+    assert events[1][1] == {"error": "generation failed"}
+    assert api_services.chat_history_service.get("session:stream-error") == []
+
+def test_ai_stream_sends_tokens_then_done(flask_client):
+    response = flask_client.post("/api/ai/stream", json={"query": "Say something"})
+    events = list(_events(response.response))
+    assert {event for event, _ in events[:-1]} == {"token"}
+    event, done = events[-1]
+    assert event == "done"
+    assert done["answer"] == "".join(data["token"] for _, data in events[:-1]) == FAKE_ANSWER
+    assert done["chunks"] == len(events) - 1
@@ -0,0 +1,62 @@
+from openpyxl import Workbook
+from app.utils.tabular_loaders import pack_rows, iter_xlsx_documents, iter_csv_documents
+
+def test_pack_rows_repeats_header_and_tracks_row_ranges():
+    rows = [(n, f"row {n}") for n in range(1, 11)]
+    blocks = list(pack_rows(rows, "header", max_chars=30))
+    assert all(text.startswith("header\n") for text, _, _ in blocks)
+    assert all(len(text) <= 30 for text, _, _ in blocks)
+    assert blocks[0][1] == 1
+    assert blocks[-1][2] == 10
+    assert [n for _, start, end in blocks for n in range(start, end + 1)] == list(range(1, 11))
+
+def test_pack_rows_respects_max_rows():
+    rows = [(n, "x") for n in range(1, 8)]
+    blocks = list(pack_rows(rows, "h", max_chars=10_000, max_rows=3))
+    assert [(start, end) for _, start, end in blocks] == [(1, 3), (4, 6), (7, 7)]
+
+def test_iter_xlsx_documents_emits_row_groups(tmp_path):
+    path = str(tmp_path / "sheet.xlsx")
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Invoices"
+    sheet.append(["invoice", "amount"])
+    for n in range(1, 6):
+        sheet.append([f"INV-{n}", n * 10])
+    workbook.save(path)
+
+    docs = list(iter_xlsx_documents(path, "sheet.xlsx", max_chars=10_000, max_rows=2))
+    assert len(docs) == 3
+    assert docs[0].page_content == "invoice | amount\nINV-1 | 10\nINV-2 | 20"
+    assert docs[0].metadata == {
+        "source": "sheet.xlsx",
+        "sheet": "Invoices",
+        "header": "invoice | amount",
+        "row_start": 2,
+        "row_end": 3,
+    }
+    assert docs[-1].metadata["row_end"] == 6
+
+def test_iter_csv_documents_packs_rows_and_reports_throughput(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text("sku,qty\n" + "".join(f"SKU-{n},{n}\n" for n in range(1, 101)), encoding="utf-8")
+
+    stats = {}
+    docs = list(iter_csv_documents(str(path), "orders.csv", max_chars=200, stats=stats))
+    assert len(docs) > 1
+    assert all(doc.page_content.startswith("sku | qty\n") for doc in docs)
+    assert docs[0].metadata["row_start"] == 2
+    assert docs[-1].metadata["row_end"] == 101
+    assert "SKU-100 | 100" in docs[-1].page_content
+    assert stats["rows"] == 100
+    assert "rows_per_second" in stats
+
+def test_iter_csv_documents_numbers_records_not_lines(tmp_path):
+    path = tmp_path / "notes.csv"
+    path.write_text('id,note\n1,short\n2,"spans\nthree\nlines"\n3,after\n', encoding="utf-8")
+
+    docs = list(iter_csv_documents(str(path), "notes.csv", max_chars=25))
+    rows = {doc.page_content.split("\n", 1)[1].split(" | ")[0]: (doc.metadata["row_start"], doc.metadata["row_end"])
+            for doc in docs}
+    # Record 2 spans three physical lines; record 3 is still row 4, not row 6.
+    assert rows == {"1": (2, 2), "2": (3, 3), "3": (4, 4)}
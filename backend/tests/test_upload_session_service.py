@@ -0,0 +1,88 @@
+import hashlib
+import io
+import uuid
+import pytest
+from app.services.upload_session_service import MISSING_CHUNKS_LISTED, UploadSessionService
+
+CONTENT = b"0123456789"
+
+@pytest.fixture
+def sessions(tmp_path):
+    return UploadSessionService(str(tmp_path / "staging"), chunk_size=4, session_ttl=60, max_size=16,
+                                min_chunk_size=2)
+
+def test_init_rejects_sizes_over_the_limit_and_bool_values(sessions):
+    with pytest.raises(ValueError, match="upload limit"):
+        sessions.init_upload("big.pdf", 17, "abc")
+    with pytest.raises(ValueError):
+        sessions.init_upload("a.pdf", True, "abc")
+    with pytest.raises(ValueError):
+        sessions.init_upload("a.pdf", 8, "abc", chunk_size=True)
+    assert sessions.init_upload("a.pdf", 16, "abc")["total_chunks"] == 4
+
+def test_discard_unknown_session_raises_not_found(sessions):
+    session = sessions.init_upload("a.pdf", 8, "abc")
+    sessions.put_chunk(session["upload_id"], 0, io.BytesIO(b"1234"))
+    sessions.discard(session["upload_id"])
+    with pytest.raises(FileNotFoundError):
+        sessions.discard(session["upload_id"])
+    with pytest.raises(FileNotFoundError):
+        sessions.discard(uuid.uuid4().hex)
+
+def test_chunk_size_below_the_minimum_is_rejected_unless_the_file_is_smaller(sessions):
+    with pytest.raises(ValueError, match="at least 2 bytes"):
+        sessions.init_upload("a.pdf", 8, "abc", chunk_size=1)
+    assert sessions.init_upload("tiny.pdf", 1, "abc", chunk_size=1)["total_chunks"] == 1
+
+def test_chunks_in_any_order_assemble_the_file(sessions):
+    session = sessions.init_upload("a.pdf", len(CONTENT), hashlib.md5(CONTENT).hexdigest())
+    upload_id = session["upload_id"]
+    assert session["total_chunks"] == 3
+
+    status = sessions.put_chunk(upload_id, 2, io.BytesIO(CONTENT[8:]))
+    assert status["received_ranges"] == [[8, 10]]
+    assert status["missing_ranges"] == [[0, 2]]
+    assert status["missing_chunks"] == [0, 1]
+    assert not status["complete"]
+    with pytest.raises(ValueError, match="incomplete"):
+        sessions.finalize(upload_id)
+
+    sessions.put_chunk(upload_id, 0, io.BytesIO(CONTENT[:4]))
+    status = sessions.put_chunk(upload_id, 1, io.BytesIO(CONTENT[4:8]))
+    assert status["received_ranges"] == [[0, 10]]
+    assert status["missing_ranges"] == [] and status["missing_chunks"] == []
+    assert status["complete"]
+    assert sessions.get_status(upload_id) == status
+
+    path, filename, file_hash, size = sessions.finalize(upload_id)
+    assert (filename, file_hash, size) == ("a.pdf", hashlib.md5(CONTENT).hexdigest(), len(CONTENT))
+    with open(path, "rb") as f:
+        assert f.read() == CONTENT
+
+def test_finalize_rejects_a_checksum_mismatch(sessions):
+    upload_id = sessions.init_upload("a.pdf", 4, hashlib.md5(b"abcd").hexdigest())["upload_id"]
+    sessions.put_chunk(upload_id, 0, io.BytesIO(b"abce"))
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        sessions.finalize(upload_id)
+
+@pytest.mark.parametrize("index", [-1, 3])
+def test_out_of_range_chunk_index_is_rejected(sessions, index):
+    upload_id = sessions.init_upload("a.pdf", len(CONTENT), "abc")["upload_id"]
+    with pytest.raises(ValueError, match="out of range"):
+        sessions.put_chunk(upload_id, index, io.BytesIO(b"0123"))
+
+@pytest.mark.parametrize("index, data", [(0, b"012"), (0, b"01234"), (2, b"8"), (2, b"890")])
+def test_chunk_of_the_wrong_length_is_rejected(sessions, index, data):
+    upload_id = sessions.init_upload("a.pdf", len(CONTENT), "abc")["upload_id"]
+    with pytest.raises(ValueError, match="must be exactly"):
+        sessions.put_chunk(upload_id, index, io.BytesIO(data))
+    assert sessions.get_status(upload_id)["received_chunks"] == 0
+
+def test_status_lists_a_bounded_number_of_missing_chunks(tmp_path):
+    sessions = UploadSessionService(str(tmp_path / "staging"), chunk_size=2, session_ttl=60, max_size=1000,
+                                    min_chunk_size=2)
+    upload_id = sessions.init_upload("a.pdf", 1000, "abc")["upload_id"]
+    sessions.put_chunk(upload_id, 1, io.BytesIO(b"xx"))
+    status = sessions.get_status(upload_id)
+    assert status["missing_ranges"] == [[0, 1], [2, 500]]
+    assert status["missing_chunks"] == [0] + list(range(2, MISSING_CHUNKS_LISTED + 1))
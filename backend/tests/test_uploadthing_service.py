@@ -0,0 +1,53 @@
+import io
+import httpx
+import pytest
+from app.services import uploadthing_service as uploadthing_module
+from app.services.uploadthing_service import UploadthingService
+
+UPLOAD_URL = "https://uploads.example/presigned"
+
+class RecordingFile(io.BufferedReader):
+    """A real file handle that records the size of every read."""
+
+    def __init__(self, path):
+        super().__init__(io.FileIO(path))
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+@pytest.fixture
+def uploads(monkeypatch):
+    requests_seen = []
+
+    def handler(request):
+        requests_seen.append(request)
+        if str(request.url) == UPLOAD_URL:
+            return httpx.Response(204)
+        return httpx.Response(200, json={"data": [{
+            "url": UPLOAD_URL, "fields": {"key": "abc"}, "fileUrl": "https://utfs.io/f/abc",
+            "key": "abc", "fileName": "big.pdf", "fileType": "application/pdf",
+        }]})
+
+    client = httpx.Client
+    monkeypatch.setattr(uploadthing_module.httpx, "Client",
+                        lambda **kwargs: client(transport=httpx.MockTransport(handler), **kwargs))
+    return requests_seen
+
+def test_upload_streams_the_file_in_chunks(tmp_path, uploads):
+    path = tmp_path / "big.pdf"
+    content = bytes(range(256)) * 4096  # 1 MiB
+    path.write_bytes(content)
+    service = UploadthingService(secret_key="secret", upload_api_url="https://api.example/upload")
+
+    with RecordingFile(str(path)) as file:
+        result = service.upload(file, len(content))
+
+    assert result["url"] == "https://utfs.io/f/abc"
+    # Every read asks for a bounded chunk; none reads the rest of the file at once.
+    assert file.reads and all(0 < size <= 64 * 1024 for size in file.reads)
+    upload_request = uploads[-1]
+    assert str(upload_request.url) == UPLOAD_URL
+    assert int(upload_request.headers["Content-Length"]) > len(content)
+    assert content in upload_request.content
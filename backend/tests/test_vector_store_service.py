@@ -0,0 +1,36 @@
+from app.core.models.document import Document
+from app.services import vector_store_service as vector_store_module
+
+def _stored(vector_store_service, source):
+    return vector_store_service.vector_store.get(where={"source": source}, include=["documents"])
+
+def _no_rebuild(cls, *args, **kwargs):
+    raise AssertionError("add_documents built a new Chroma store")
+
+def test_re_adding_the_same_content_is_idempotent(api_services, monkeypatch):
+    service = api_services.vector_store_service
+    monkeypatch.setattr(vector_store_module.Chroma, "from_documents", classmethod(_no_rebuild))
+    handle, collection = service.vector_store, service.vector_store._collection
+    # The repeated chunk needs its own occurrence number to be stored twice.
+    documents = [Document(page_content=text, metadata={}) for text in ("Idempotent one", "Idempotent two", "Idempotent one")]
+
+    service.add_documents(documents, "idempotent.pdf")
+    first = _stored(service, "idempotent.pdf")
+    total = service.get_document_count()
+    service.add_documents(documents, "idempotent.pdf")
+    second = _stored(service, "idempotent.pdf")
+
+    assert len(first["ids"]) == 3
+    assert sorted(second["ids"]) == sorted(first["ids"])
+    assert sorted(second["documents"]) == ["Idempotent one", "Idempotent one", "Idempotent two"]
+    assert service.get_document_count() == total
+    assert ("idempotent.pdf", 3) in service.lexical_index.source_counts()
+    assert service.vector_store is handle and service.vector_store._collection is collection
+
+def test_chunk_ids_are_deterministic_per_source():
+    chunks = [Document(page_content="same", metadata={"source": source, "chunk_hash": "ab" * 32})
+              for source in ("a.pdf", "a.pdf", "b.pdf")]
+    ids = vector_store_module.VectorStoreService._chunk_ids(chunks)
+    assert ids == vector_store_module.VectorStoreService._chunk_ids(chunks)
+    assert ids[0].endswith("-0") and ids[1].endswith("-1") and ids[2].endswith("-0")
+    assert len(set(ids)) == 3